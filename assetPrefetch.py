@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 19:48:03 2026
+@author: tao_jingfen
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from hplcPage import extractHplc, HPLC_PICTURE_SIZE
+from sdsPage import GEL_PICTURE_SIZE
+from slideImage import optimizeImage, IMAGE_DPI, JPEG_QUALITY
+from reportProfile import count
+
+def readFile(path: str) -> bytes:
+    with open(path, 'rb') as f:
+        return f.read()
+
+def loadHplc(path: str, dpi: int = IMAGE_DPI, jpegQuality: int = JPEG_QUALITY) -> tuple:
+    """
+    extract one HPLC file and optimize its chromatograms for the slide
+
+    --Returns:
+        (picList, bytesIn, bytesOut): the (sampleName, picture bytes) list,
+        the picture bytes before and after optimizeImage
+    """
+    picList = extractHplc(path)
+    bytesIn = sum(len(blob) for _, blob in picList)
+    picList = [(sampleName, optimizeImage(blob, *HPLC_PICTURE_SIZE, dpi, jpegQuality))
+               for sampleName, blob in picList]
+    return picList, bytesIn, sum(len(blob) for _, blob in picList)
+
+def loadGel(path: str, dpi: int = IMAGE_DPI, jpegQuality: int = JPEG_QUALITY) -> tuple:
+    """
+    read one SDS gel picture and optimize it for the slide
+
+    --Returns:
+        (picture, bytesIn, bytesOut)
+    """
+    blob = readFile(path)
+    picture = optimizeImage(blob, *GEL_PICTURE_SIZE, dpi, jpegQuality)
+    return picture, len(blob), len(picture)
+
+class AssetPrefetch(object):
+    """
+    extract the HPLC files and load the SDS pictures of a report in a process
+    pool, while the cover, final, process and step pages are being built
+
+    the page makers ask for an asset by its excel file name and wait for the
+    result, an asset that was not prefetched is loaded in the calling process,
+    with jobs=0 nothing runs in parallel, e.g. inside a batchReport worker
+
+    every picture is resampled to its size on the slide at dpi and
+    recompressed, the bytes before and after are counted into the active
+    RunProfile as 'imageBytesIn' and 'imageBytesOut'
+
+    --Args:
+        assetRoot: the folder that the file names are relative to
+        jobs: the number of worker processes, by default one per file up to
+        the cpus left besides the calling process
+        dpi: the pixels per inch of the placed pictures, None to keep them
+        jpegQuality: the quality of jpeg pictures, other pictures become png
+    """
+    def __init__(self, assetRoot: str = '', jobs: int = None, dpi: int = IMAGE_DPI,
+                 jpegQuality: int = JPEG_QUALITY):
+        self.assetRoot = assetRoot
+        self.jobs = jobs
+        self.dpi = dpi
+        self.jpegQuality = jpegQuality
+        self.bytesIn = 0
+        self.bytesOut = 0
+        self._pool = None
+        self._hplc = {}
+        self._sds = {}
+
+    def start(self, hplcRuns: list, sdsRuns: list):
+        """
+        submit every HPLC file and SDS picture referenced by the runs
+        """
+        hplcFiles = list(dict.fromkeys(hplcRun.file for hplcRun in hplcRuns
+                                       if hplcRun.file.strip() != ''))
+        pictures = list(dict.fromkeys(sdsRun.picture for sdsRun in sdsRuns
+                                      if sdsRun.hasPicture()))
+        jobs = self.jobs
+        if jobs is None:
+            jobs = min((os.cpu_count() or 1) - 1, len(hplcFiles) + len(pictures))
+        if jobs < 1:
+            return self
+        self._pool = ProcessPoolExecutor(max_workers=jobs)
+        ## the HPLC files are the slow ones, submit them first
+        for hplcFile in hplcFiles:
+            self._hplc[hplcFile] = self._pool.submit(
+                loadHplc, self._path(hplcFile), self.dpi, self.jpegQuality)
+        for picture in pictures:
+            self._sds[picture] = self._pool.submit(
+                loadGel, self._path(picture), self.dpi, self.jpegQuality)
+        return self
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.assetRoot, name)
+
+    def _result(self, futures: dict, name: str, loader):
+        """
+        the result of the prefetched asset, or load it now, the bytes are counted once
+        """
+        future = futures.get(name)
+        if isinstance(future, _Done):
+            return future.value
+        if future is None:
+            result = loader(self._path(name), self.dpi, self.jpegQuality)
+        else:
+            result = future.result()
+        futures[name] = _Done(result[0])
+        self.bytesIn += result[1]
+        self.bytesOut += result[2]
+        count('imageBytesIn', result[1])
+        count('imageBytesOut', result[2])
+        return result[0]
+
+    def hplc(self, hplcFile: str) -> list:
+        """
+        the (sampleName, picture bytes) list of the HPLC file
+        """
+        return self._result(self._hplc, hplcFile, loadHplc)
+
+    def sdsPicture(self, picture: str) -> bytes:
+        """
+        the bytes of the SDS picture
+        """
+        return self._result(self._sds, picture, loadGel)
+
+    def close(self):
+        """
+        stop the workers, the unfinished assets are cancelled
+        """
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class _Done(object):
+    """
+    an asset already taken, kept for the steps that share the file
+    """
+    __slots__ = ('value',)
+    def __init__(self, value):
+        self.value = value
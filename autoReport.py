@@ -6,19 +6,15 @@
 '''
 
 import os
+import queue
+import threading
 import tkinter
 from tkinter import messagebox
 from tkinter import ttk
 import tkinter.filedialog
-from pptx import Presentation
 
-from readExcel import excel2Dict
-from coverPage import purificationCoverPageMake
-from finalPage import purificationFinalPageMake
-from processPage import purificationProcessPageMake
-from stepPage import purificationStepPageMake
-from sdsPage import purificationSdsPageMake
-from hplcPage import purificationHplcPageMake
+from reportPipeline import purificationReport
+from reportTask import ReportCancelled
 
 import warnings
 warnings.filterwarnings("ignore")
@@ -26,7 +22,7 @@ warnings.filterwarnings("ignore")
 class AutoReport(object):
     def __init__(self):
         self.tk = tkinter.Tk()
-        self.tk.geometry("400x200")
+        self.tk.geometry("400x260")
         self.tk.resizable(0, 0)
         self.filePath = os.path.abspath(os.path.dirname(__file__))
         self.tadPic = os.path.join(self.filePath,'bid.ico')
@@ -44,9 +40,24 @@ class AutoReport(object):
         self.path_button = ttk.Button(self.tk, text="...",command=self._select_path,width=3)
 
         self.start_button = tkinter.Button(self.tk,  text="Generate Report", font=('Calibri', '12', 'bold'), command=self.generate_report)
+        self.cancel_button = ttk.Button(self.tk, text="Cancel", command=self.cancel_report, state='disabled')
+        self.progress_bar = ttk.Progressbar(self.tk, orient='horizontal', mode='determinate')
+        self.status_label = tkinter.Label(self.tk, text='', font=('Calibri', '10'), anchor=tkinter.W)
         self.copyright_label = tkinter.Label(self.tk, text='Copyright ©2020. Powered by BID BioIT.', font=('Times New Roman', '10'))
         self.filePath = os.getcwd()
-        
+        self.excelList = []
+
+        ## the reports run one after another in a worker thread, it sends
+        ## (kind, excelPath, ...) events back that the main loop polls for
+        self.jobs = queue.Queue()
+        self.events = queue.Queue()
+        self.batches = []       # the cancel Event of every unfinished Generate click
+        self.pending = 0
+        self.results = []
+        self.worker = threading.Thread(target=self._work, daemon=True)
+        self.worker.start()
+        self.tk.after(100, self._poll)
+
     def item_pack(self):
         self.type_label.grid(row = 0, ipadx=2, ipady=3, pady=5,sticky = tkinter.W)
         self.type_combobox.grid(row = 0, column = 1, columnspan=2,padx=2,ipady=2,sticky = tkinter.W + tkinter.E)
@@ -54,7 +65,10 @@ class AutoReport(object):
         self.path_text.grid(row = 1, column = 1, padx=2, ipady=3, pady=5, sticky = tkinter.W + tkinter.E)
         self.path_button.grid(row = 1, column = 2,padx=3,sticky = tkinter.W + tkinter.E)
         self.start_button.grid(row = 2,column = 1, pady=3)
-        self.copyright_label.grid(row = 3,column = 0,columnspan=3,pady=3,sticky = tkinter.W + tkinter.E)
+        self.cancel_button.grid(row = 2,column = 2, padx=3, sticky = tkinter.W + tkinter.E)
+        self.progress_bar.grid(row = 3,column = 0,columnspan=3,padx=5,sticky = tkinter.W + tkinter.E)
+        self.status_label.grid(row = 4,column = 0,columnspan=3,padx=5,sticky = tkinter.W + tkinter.E)
+        self.copyright_label.grid(row = 5,column = 0,columnspan=3,pady=3,sticky = tkinter.W + tkinter.E)
 
     @staticmethod
     def mess(mes: str):
@@ -64,41 +78,105 @@ class AutoReport(object):
         messagebox.showwarning('Warnings:', mes)
         
     def generate_report(self):
+        """
+        queue every selected excel, the reports are built by the worker thread
+        """
         try:
-            self.workdir = os.path.dirname(self.excelPath)
-            if self.report_type.get() == 'Purification Report':
-                self.purification_report()
-                tkinter.messagebox.showinfo('Success','Generate Report Finished!')
+            if self.report_type.get() != 'Purification Report':
+                return
+            if not self.excelList:
+                raise ValueError('请先选择Excel文件')
+            self.template_path = os.path.join(self.filePath,'purificationTemplate.pptx')
+            cancel = threading.Event()
+            self.batches.append(cancel)
+            for excelPath in self.excelList:
+                self.pending += 1
+                self.jobs.put((excelPath, cancel))
+            self.cancel_button['state'] = 'normal'
+            self._status('%d queued' % self.pending)
         except Exception as mes:
-            self.mess(mes)  
-
-    def purification_report(self):
-        self.template_path = os.path.join(self.filePath,'purificationTemplate.pptx')
-        prs = Presentation(self.template_path)
-        os.chdir(self.workdir)
-        (projectName,
-         date),finalDict,processList,stepsDict,(supernatant,
-             sdsList,sdsTableDict),hplcList,proDict = excel2Dict(self.excelPath)
-        prs = purificationCoverPageMake(prs, projectName, date)
-        prs = purificationFinalPageMake(prs, finalDict)
-        prs = purificationProcessPageMake(prs, processList)
-        prs = purificationStepPageMake(prs, stepsDict)
-        prs = purificationSdsPageMake(prs, supernatant,sdsList,sdsTableDict)
-        prs = purificationHplcPageMake(prs, hplcList, proDict)
-        numPlaceholder = prs.slide_layouts[1].placeholders[0]
-        for num in range(1,len(prs.slides)):
-            slide = prs.slides[num]
-            slide.shapes.clone_placeholder(numPlaceholder)
-            slide.shapes[-1].text = str(num + 1)
-        prs.save(''.join([date.split('/')[-1]]+date.split('/')[0:2]) + ' ' + 
-                 projectName + ' Purification report.pptx')
-        #prs.save(projectName + '_' + ''.join([date.split('/')[-1]]+date.split('/')[0:2]) + '.pptx')
+            self.mess(mes)
+
+    def cancel_report(self):
+        """
+        stop the running report after its current section and drop the queued ones
+        """
+        for cancel in self.batches:
+            cancel.set()
+        self._status('Cancelling...')
+
+    def purification_report(self, excelPath: str, cancel: threading.Event) -> str:
+        """
+        build one report in the worker thread, every section start is sent
+        as a progress event, a set cancel stops it with ReportCancelled,
+        a report that reached 'finished' is saved and counts as done
+        """
+        def progress(label, done, total):
+            if cancel.is_set() and label != 'finished':
+                raise ReportCancelled(excelPath)
+            self.events.put(('progress', excelPath, label, done, total))
+        return purificationReport(excelPath, self.template_path, progress=progress)
+
+    def _work(self):
+        while True:
+            excelPath, cancel = self.jobs.get()
+            try:
+                if cancel.is_set():
+                    raise ReportCancelled(excelPath)
+                self.events.put(('done', excelPath, self.purification_report(excelPath, cancel)))
+            except ReportCancelled:
+                self.events.put(('cancelled', excelPath, 'Cancelled'))
+            except Exception as mes:
+                self.events.put(('failed', excelPath, str(mes)))
+
+    def _poll(self):
+        """
+        apply the worker events in the main thread, tkinter is not thread safe
+        """
+        try:
+            while True:
+                event = self.events.get_nowait()
+                kind, excelPath = event[0], event[1]
+                name = os.path.basename(excelPath)
+                if kind == 'progress':
+                    label, done, total = event[2:]
+                    self.progress_bar['maximum'] = max(total, 1)
+                    self.progress_bar['value'] = done
+                    self._status('%s: %s (%d queued)' % (name, label, self.pending - 1))
+                    continue
+                self.pending -= 1
+                self.results.append(event)
+                self.progress_bar['value'] = 0
+                self._status('%s: %s' % (name, kind))
+                if self.pending == 0:
+                    self._finished()
+        except queue.Empty:
+            pass
+        self.tk.after(100, self._poll)
+
+    def _finished(self):
+        """
+        every queued report is done, show what happened to them
+        """
+        results, self.results, self.batches = self.results, [], []
+        self.cancel_button['state'] = 'disabled'
+        failList = [event for event in results if event[0] != 'done']
+        if not failList:
+            self._status('Finished')
+            tkinter.messagebox.showinfo('Success','Generate Report Finished!')
+            return
+        self._status('%d of %d reports not generated' % (len(failList), len(results)))
+        self.mess('\n'.join('%s: %s' % (os.path.basename(excelPath), message)
+                             for _, excelPath, message in failList))
+
+    def _status(self, text: str):
+        self.status_label['text'] = text
 
     def _select_path(self):
-        self.excelPath = tkinter.filedialog.askopenfilename()
-        self.excelPath = self.excelPath.replace("/","\\\\")
+        excelList = tkinter.filedialog.askopenfilenames()
+        self.excelList = [excelPath.replace("/","\\\\") for excelPath in excelList]
         self.path_text.delete(0.0, tkinter.END)
-        self.path_text.insert('0.0', self.excelPath)
+        self.path_text.insert('0.0', '\n'.join(self.excelList))
 
 if __name__ == "__main__":
     tmp = AutoReport()
@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 15:42:08 2026
+@author: tao_jingfen
+
+Generate purification reports of many excels without the GUI, e.g.
+    python batchReport.py "D:\\reports\\2020" "D:\\other\\*.xlsx" -j 4
+"""
+import os
+import sys
+import glob
+import argparse
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+from reportPipeline import TEMPLATE_PATH, purificationReport
+from reportProfile import RunProfile
+from slideImage import IMAGE_DPI, JPEG_QUALITY
+
+def findWorkbooks(patterns: list) -> list:
+    """
+    expand the directories and glob patterns to the excel path list,
+    a directory means every .xlsx in it, excel lock files '~$*' are skipped
+    """
+    excelList = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            pattern = os.path.join(pattern, '*.xlsx')
+        for path in sorted(glob.glob(pattern)):
+            if os.path.basename(path).startswith('~$'):
+                continue
+            path = os.path.abspath(path)
+            if path not in excelList:
+                excelList.append(path)
+    return excelList
+
+def _reportJob(excelPath: str, templatePath: str, profileDir: str = None,
+               cprofile: bool = False, prefetchJobs: int = 0,
+               imageDpi: int = IMAGE_DPI, jpegQuality: int = JPEG_QUALITY,
+               incremental: bool = True) -> tuple:
+    """
+    run one report in the worker process, return (ok, reportPath or error)
+    with profileDir the run report '<excel name>.profile.json' and the
+    cProfile stats '<excel name>.prof' are written into it
+    """
+    warnings.filterwarnings("ignore")
+    profile = RunProfile(excelPath, cprofile=cprofile) if profileDir else None
+    try:
+        return True, purificationReport(excelPath, templatePath, profile, prefetchJobs,
+                                        imageDpi, jpegQuality, incremental)
+    except Exception as mes:
+        return False, '%s: %s' % (type(mes).__name__, mes)
+    finally:
+        if profile is not None:
+            baseName = os.path.join(profileDir, os.path.splitext(os.path.basename(excelPath))[0])
+            profile.save(baseName + '.profile.json', baseName + '.prof')
+
+def batchReport(excelList: list, templatePath: str = TEMPLATE_PATH, jobs: int = None,
+                profileDir: str = None, cprofile: bool = False,
+                imageDpi: int = IMAGE_DPI, jpegQuality: int = JPEG_QUALITY,
+                incremental: bool = True) -> list:
+    """
+    Generate the purification reports of excelList in a process pool
+
+    --Args:
+        excelList: the excel path list
+        templatePath: the purification template pptx path
+        jobs: the number of worker processes, the cpu count by default
+        profileDir: the folder to write the stage timing and memory reports to
+        cprofile: also write the cProfile stats of every excel to profileDir
+        imageDpi: the resolution of the embedded pictures, None to keep them
+        jpegQuality: the quality of recompressed jpeg pictures
+        incremental: only rebuild the slides whose inputs changed since the
+        report next to the excel was generated, False to rebuild every slide
+    --Returns:
+        resultList: [(excelPath, ok, reportPath or error), ...] in excelList order
+    """
+    jobs = jobs or os.cpu_count() or 1
+    jobs = max(1, min(jobs, len(excelList)))
+    ## the workers only prefetch the assets in parallel when there are spare cpus
+    prefetchJobs = (os.cpu_count() or 1) // jobs
+    prefetchJobs = prefetchJobs if prefetchJobs > 1 else 0
+    if profileDir:
+        os.makedirs(profileDir, exist_ok=True)
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = [pool.submit(_reportJob, excelPath, templatePath, profileDir,
+                               cprofile, prefetchJobs, imageDpi, jpegQuality, incremental)
+                   for excelPath in excelList]
+        return [(excelPath,) + future.result()
+                for excelPath, future in zip(excelList, futures)]
+
+def main(argv: list = None) -> int:
+    parser = argparse.ArgumentParser(description='Generate purification reports of many excels.')
+    parser.add_argument('paths', nargs='+', help='excel files, directories or glob patterns')
+    parser.add_argument('-j', '--jobs', type=int, default=None,
+                        help='number of worker processes, default the cpu count')
+    parser.add_argument('--template', default=TEMPLATE_PATH, help='purification template pptx')
+    parser.add_argument('--profile', metavar='DIR', default=None,
+                        help='write the stage timing and memory json of every excel to DIR')
+    parser.add_argument('--cprofile', action='store_true',
+                        help='with --profile, also write the cProfile stats')
+    parser.add_argument('--dpi', type=int, default=IMAGE_DPI,
+                        help='resample the pictures to DPI on the slide, 0 to embed them unchanged')
+    parser.add_argument('--jpeg-quality', type=int, default=JPEG_QUALITY,
+                        help='quality of recompressed jpeg pictures')
+    parser.add_argument('--full', action='store_true',
+                        help='rebuild every slide instead of only the ones whose inputs changed')
+    args = parser.parse_args(argv)
+    excelList = findWorkbooks(args.paths)
+    if not excelList:
+        print('No excel found in: ' + ', '.join(args.paths), file=sys.stderr)
+        return 2
+    resultList = batchReport(excelList, args.template, args.jobs, args.profile,
+                             args.cprofile, args.dpi or None, args.jpeg_quality,
+                             not args.full)
+    failNumber = 0
+    for excelPath, ok, message in resultList:
+        if not ok:
+            failNumber += 1
+        print('%-4s %s\n     %s' % ('OK' if ok else 'FAIL', excelPath, message))
+    print('%d succeeded, %d failed' % (len(resultList) - failNumber, failNumber))
+    return 1 if failNumber else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,189 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 18:40:12 2026
+@author: tao_jingfen
+
+Time the report pipeline on synthetic excels of growing scale, e.g.
+    python benchmark.py --scales 10x4x2 50x6x4 200x8x6 --repeat 3
+every run is appended to benchmarkResults.jsonl and compared with the last
+run of the same scale, stages slower than before or growing faster than the
+number of rows are reported
+"""
+import os
+import io
+import sys
+import json
+import math
+import time
+import argparse
+import platform
+import tempfile
+import warnings
+
+## the benchmark times cold runs, its caches are kept away from the user's ones
+os.environ['AUTOREPORT_CACHE'] = os.path.join(tempfile.gettempdir(), 'autoReportBenchmarkCache')
+
+from makeDemoData import makeWorkbook
+from templateCache import templateCache
+from reportProfile import RunProfile, stage
+from readExcel import excel2Dict
+from hplcPage import hplcCache
+from reportPipeline import TEMPLATE_PATH, purificationPresentation
+
+RESULTS_PATH = 'benchmarkResults.jsonl'
+DEFAULT_SCALES = ['10x4x2', '50x6x4', '200x8x6']
+STAGES = ('excel2Dict', 'prefetch', 'template', 'purificationCoverPageMake', 'purificationFinalPageMake',
+          'purificationProcessPageMake', 'purificationStepPageMake',
+          'purificationSdsPageMake', 'purificationHplcPageMake', 'numbering', 'save', 'total')
+
+def parseScale(scale: str) -> tuple:
+    """
+    'NxMxK' to (proteins, steps, sdsTables)
+    """
+    try:
+        proteins, steps, sdsTables = (int(i) for i in scale.lower().split('x'))
+    except ValueError:
+        raise ValueError('规模格式必须是NxMxK: ' + scale)
+    return proteins, steps, sdsTables
+
+def benchmarkOnce(excelPath: str, templatePath: str = TEMPLATE_PATH,
+                  prefetchJobs: int = None, renderBackend: str = 'xml') -> dict:
+    """
+    build one report of excelPath in memory without the excel and HPLC cache
+
+    --Returns:
+        {stage name: wall seconds} of the stages in STAGES
+    """
+    hplcCache.clear()
+    profile = RunProfile(excelPath, memory=False)
+    with profile.activate():
+        with stage('excel2Dict'):
+            data = excel2Dict(excelPath, cache=None)
+        prs = purificationPresentation(data, os.path.dirname(excelPath), templatePath,
+                                       prefetchJobs, renderBackend=renderBackend)
+        with stage('save'):
+            prs.save(io.BytesIO())
+    summary = profile.report()['summary']
+    return {name: summary[name]['wall'] for name in STAGES if name in summary}
+
+def benchmarkScale(scale: str, workdir: str, repeat: int = 3, hplcFormat: str = 'mixed',
+                   templatePath: str = TEMPLATE_PATH, prefetchJobs: int = None,
+                   renderBackend: str = 'xml') -> dict:
+    """
+    Generate the excel of one scale and time the pipeline repeat times
+
+    --Args:
+        scale: 'NxMxK', N proteins, M steps and K SDS tables
+        workdir: the folder to generate the excel and its pictures in
+        repeat: the number of timed runs, the minimum of each stage is kept
+        hplcFormat: the HPLC file format passed to makeWorkbook
+        prefetchJobs: the asset prefetch processes, 0 to extract in the main process
+        renderBackend: 'xml' or 'pptx', see purificationPresentation
+    --Returns:
+        result: {'scale', 'proteins', 'steps', 'sdsTables', 'rows', 'stages'}
+    """
+    proteins, steps, sdsTables = parseScale(scale)
+    folder = os.path.join(workdir, scale)
+    excelPath = makeWorkbook(folder, proteins, steps, sdsTables, hplcFormat)
+    templateCache.presentation(templatePath)
+    stages = {}
+    for _ in range(max(1, repeat)):
+        for name, wall in benchmarkOnce(excelPath, templatePath, prefetchJobs,
+                                        renderBackend).items():
+            stages[name] = min(stages.get(name, wall), wall)
+    return {'scale': scale, 'proteins': proteins, 'steps': steps, 'sdsTables': sdsTables,
+            'rows': proteins * steps, 'stages': stages}
+
+def superLinear(results: list, threshold: float = 1.3, minWall: float = 0.01) -> list:
+    """
+    the stages whose time grows faster than rows**threshold between two scales,
+    stages faster than minWall seconds are too noisy to judge
+
+    --Returns:
+        [(stage name, smaller scale, larger scale, exponent), ...]
+    """
+    warnList = []
+    results = sorted(results, key=lambda x: x['rows'])
+    for small, large in zip(results, results[1:]):
+        if large['rows'] <= small['rows']:
+            continue
+        for name, wall in large['stages'].items():
+            base = small['stages'].get(name)
+            if not base or max(base, wall) < minWall:
+                continue
+            exponent = math.log(wall / base) / math.log(large['rows'] / small['rows'])
+            if exponent > threshold:
+                warnList.append((name, small['scale'], large['scale'], exponent))
+    return warnList
+
+def regressions(results: list, history: list, tolerance: float = 1.25,
+                minWall: float = 0.01) -> list:
+    """
+    the stages slower than tolerance times the last recorded run of the same scale
+
+    --Returns:
+        [(stage name, scale, last wall, wall), ...]
+    """
+    lastRun = {}
+    for run in history:
+        for result in run['results']:
+            lastRun[result['scale']] = result['stages']
+    warnList = []
+    for result in results:
+        previous = lastRun.get(result['scale'], {})
+        for name, wall in result['stages'].items():
+            base = previous.get(name)
+            if base and wall > minWall and wall > base * tolerance:
+                warnList.append((name, result['scale'], base, wall))
+    return warnList
+
+def loadHistory(resultsPath: str) -> list:
+    if not os.path.exists(resultsPath):
+        return []
+    with open(resultsPath, encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def main(argv: list = None) -> int:
+    parser = argparse.ArgumentParser(description='Benchmark the report pipeline at several scales.')
+    parser.add_argument('--scales', nargs='+', default=DEFAULT_SCALES,
+                        help='NxMxK: N proteins, M steps, K SDS tables')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--hplc', default='mixed', choices=['docx', 'pdf', 'mixed', 'none'])
+    parser.add_argument('--template', default=TEMPLATE_PATH)
+    parser.add_argument('--prefetch-jobs', type=int, default=None,
+                        help='asset prefetch processes, 0 to extract in the main process')
+    parser.add_argument('--backend', default='xml', choices=['xml', 'pptx'],
+                        help='render the slides from xml skeletons or shape by shape')
+    parser.add_argument('--workdir', default=None,
+                        help='keep the generated excels here, a temporary folder by default')
+    parser.add_argument('--results', default=RESULTS_PATH, help='the jsonl file to append the run to')
+    parser.add_argument('--label', default='', help='a note stored with the run, e.g. the commit')
+    args = parser.parse_args(argv)
+    warnings.filterwarnings("ignore")
+    history = loadHistory(args.results)
+    with tempfile.TemporaryDirectory() as tempdir:
+        workdir = args.workdir or tempdir
+        results = []
+        for scale in args.scales:
+            result = benchmarkScale(scale, workdir, args.repeat, args.hplc, args.template,
+                                    args.prefetch_jobs, args.backend)
+            results.append(result)
+            print('%-10s ' % scale + '  '.join('%s %.3fs' % (name.replace('purification', '')
+                  .replace('PageMake', ''), wall) for name, wall in result['stages'].items()))
+    run = {'time': time.strftime('%Y-%m-%d %H:%M:%S'), 'label': args.label,
+           'python': platform.python_version(), 'machine': platform.machine(),
+           'repeat': args.repeat, 'hplc': args.hplc, 'prefetchJobs': args.prefetch_jobs,
+           'backend': args.backend, 'results': results}
+    with open(args.results, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(run, ensure_ascii=False) + '\n')
+    warnList = []
+    for name, small, large, exponent in superLinear(results):
+        warnList.append('super-linear %s: %s -> %s grows as rows^%.2f' % (name, small, large, exponent))
+    for name, scale, base, wall in regressions(results, history):
+        warnList.append('regression %s at %s: %.3fs -> %.3fs' % (name, scale, base, wall))
+    for warn in warnList:
+        print(warn)
+    return 1 if warnList else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -6,6 +6,11 @@ Created on Wed Jun 10 16:46:15 2020
 from pptx import Presentation
 import os
 
+from templateCache import slideLayout
+from slideSkeleton import addSkeletonSlide
+from reportProfile import timed
+
+@timed()
 def purificationCoverPageMake(prs: str, projectName: str, date: str) -> str:
     """
     Create the cover page of purification auto-report PPT
@@ -17,13 +22,20 @@ def purificationCoverPageMake(prs: str, projectName: str, date: str) -> str:
     --Returns:
         prs: presentation object could be used to save pptx
     """
-    slide = prs.slides.add_slide(prs.slide_layouts[0])
+    addSkeletonSlide(prs, coverSlide, None, [projectName, date])
+    return prs
+
+def coverSlide(prs, structure, texts, pictures):
+    """
+    the cover slide builder, texts is [projectName, date]
+    """
+    projectName, date = texts
+    slide = prs.slides.add_slide(slideLayout(prs,0))
     shapes = slide.shapes
     shapes.placeholders[0].text =  projectName + ' Purification Report'
     shapes.placeholders[1].text = 'BID_PE'
     date_paragraph = shapes.placeholders[1].text_frame.add_paragraph()
     date_paragraph.text = date
-    return prs
 
 if __name__ == '__main__':
     filePath = os.path.abspath(os.path.dirname(__file__))
@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 14:05:12 2026
+@author: tao_jingfen
+"""
+import os
+import pickle
+import getpass
+import hashlib
+import tempfile
+
+def _userName() -> str:
+    try:
+        return getpass.getuser()
+    except (KeyError, OSError):
+        return str(os.getuid()) if hasattr(os, 'getuid') else 'default'
+
+## memoize unpickles the cache entries, so every user gets an own cache
+## directory created with mode 0o700, see DiskCache.memoize
+CACHE_ROOT = os.path.join(os.environ.get('AUTOREPORT_CACHE',
+                                         os.path.join(os.path.expanduser('~'), '.autoReport', 'cache')),
+                          _userName())
+
+def contentHash(content: bytes, *salt: str) -> str:
+    """
+    sha256 hex digest of the content, salt strings are hashed before it
+    """
+    digest = hashlib.sha256()
+    for text in salt:
+        digest.update(text.encode('utf-8'))
+        digest.update(b'\0')
+    digest.update(content)
+    return digest.hexdigest()
+
+class DiskCache(object):
+    """
+    size-bounded on-disk cache of bytes values keyed by content hash
+
+    every value is one file named by its key, the file modification time is
+    the last use time, when the total size exceeds maxBytes the least
+    recently used files are removed
+
+    --Args:
+        name: sub directory name under CACHE_ROOT, e.g. 'excel'
+        maxBytes: the size cap of the cache directory
+        root: the cache root directory, CACHE_ROOT by default
+    """
+    def __init__(self, name: str, maxBytes: int = 256 * 1024 * 1024, root: str = None):
+        self.root = root or CACHE_ROOT
+        self.directory = os.path.join(self.root, name)
+        self.maxBytes = maxBytes
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + '.bin')
+
+    def get(self, key: str):
+        """
+        return the cached bytes of key, None if not cached
+        """
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                value = f.read()
+        except OSError:
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return value
+
+    def put(self, key: str, value: bytes):
+        """
+        store value under key and evict the least recently used entries
+        a value larger than maxBytes is not stored
+        """
+        if len(value) > self.maxBytes:
+            return
+        os.makedirs(self.root, mode=0o700, exist_ok=True)
+        os.makedirs(self.directory, mode=0o700, exist_ok=True)
+        fd, tempPath = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(value)
+            os.replace(tempPath, self._path(key))
+        except OSError:
+            if os.path.exists(tempPath):
+                os.remove(tempPath)
+            raise
+        self.evict()
+
+    def memoize(self, key: str, build):
+        """
+        return the value cached under key, or build() it and cache it
+
+        the value is pickled, an entry that does not unpickle is built again
+        and a cache that cannot be written is skipped
+
+        unpickling runs whatever the entry says, so the cache directory must
+        only be writable by the current user: CACHE_ROOT is per user and is
+        created with mode 0o700, a root given to DiskCache or set by
+        AUTOREPORT_CACHE must not be a directory other users can write
+
+        --Args:
+            key: the content hash key of the value
+            build: the function without arguments that computes the value
+        """
+        cached = self.get(key)
+        if cached is not None:
+            try:
+                return pickle.loads(cached)
+            except Exception:
+                pass
+        value = build()
+        try:
+            self.put(key, pickle.dumps(value, pickle.HIGHEST_PROTOCOL))
+        except OSError:
+            pass
+        return value
+
+    def evict(self):
+        """
+        remove the least recently used entries until the cache fits maxBytes
+        """
+        entries = []
+        total = 0
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if not entry.name.endswith('.bin'):
+                    continue
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.maxBytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+
+    def clear(self):
+        """
+        remove every entry of the cache
+        """
+        if not os.path.isdir(self.directory):
+            return
+        for name in os.listdir(self.directory):
+            if name.endswith('.bin'):
+                os.remove(os.path.join(self.directory, name))
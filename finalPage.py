@@ -4,130 +4,77 @@ Created on Wed Jun 30 10:46:15 2020
 @author: tao_jingfen
 """
 from pptx import Presentation
-import math
 from pptx.util import Cm
-from pptx.util import Pt
-from pptx.enum.text import PP_ALIGN
 import os
 
-def purificationFinalPageMake(prs: str, finalDict: dict) -> str:
+from reportModel import StepTable
+from templateCache import slideLayout, placeholderTop, pageBottom
+from slideSkeleton import addSkeletonSlide
+from reportProfile import timed
+from tableXml import writeTable, tableFrames, setRowHeights
+from pageLayout import rowHeight, paginate
+from tableSchema import FINAL_SCHEMA
+
+FINAL_HEADER_HEIGHT, FINAL_ROW_HEIGHT = Cm(1.92), Cm(1.2)
+## the table placeholder of the final layout, the table fills it from its
+## top down to the bottom of the slide number, see pageBottom
+FINAL_TABLE_PLACEHOLDER = 13
+
+@timed()
+def purificationFinalPageMake(prs: str, final: StepTable) -> str:
     """
     Create the final protein purification summary page of purification auto-report PPT
     
     --Args:
         prs: presentation object loaded from *pptx* by template pptx
-        finalDict: the final step protein info dict,
-        e.g. { 
-        'WXXX-hPro1.His - P1': 
-        {
-            'No':'1',
-            'Concentration': 'XXX',
-            'Volume': 'XXX',
-            'Amount': 'XXX',
-            'Yield': 'XXX',
-            'Buffer': 'XXX',
-            'Purity by SEC-HPLC': 'XXX',
-            'Supernatant':'XXX',
-            'MW':'XXX',
-            'PI': 'XXX',
-            'Comments': 'XXX'
-        },
-        'WXXX-hPro1.His - P2': 
-        {
-            'No':'1',
-            'Concentration': 'XXX',
-            'Volume': 'XXX',
-            'Amount': 'XXX',
-            'Yield': 'XXX',
-            'Buffer': 'XXX',
-            'Purity by SEC-HPLC': 'XXX',
-            'Supernatant':'XXX',
-            'MW':'XXX',
-            'PI': 'XXX',
-            'Comments': 'XXX'
-        },
-        'WXXX-BMK1': 
-        {
-            'No':'2',
-            'Concentration': 'XXX',
-            'Volume': 'XXX',
-            'Amount': 'XXX',
-            'Yield': 'XXX',
-            'Buffer': 'XXX',
-            'Purity by SEC-HPLC': 'XXX',
-            'Supernatant':'XXX',
-            'MW':'XXX',
-            'PI': 'XXX',
-            'Comments': 'XXX'
-        },
-         ...}
+        final: StepTable of the final step of every protein, see reportModel
+        e.g. StepTable('', 'Final'):
+        [StepResult(Protein('1', 'WXXX-hPro1.His - P1'), 
+                    ('0.32', '1.50', '0.48', '12.06', 'PBS', '99.62%', 
+                     'NA', '40', '147', '6.32', 'Three steps')),
+         StepResult(Protein('2', 'WXXX-BMK1'), (...)),
+         ...]
     --Returns:
         prs：presentation object could be used to save pptx
-        10 samples each page at most
-        more samples will generate another page
+        the rows fill a page from the table placeholder down to the bottom
+        of the slide number, 12 samples when no text wraps, rows with
+        wrapping names or comments are taller
     """
-    sampleNumber = len(finalDict.keys())
-    #for page in range(1,max(math.ceil(sampleNumber/10)+1,2)):
-    for page in range(1,math.ceil(sampleNumber/10)+1):
-        slide = prs.slides.add_slide(prs.slide_layouts[1])
-        shapes = slide.shapes
-        shapes.title.text = 'Characterization'
-        subtitle = shapes.title.text_frame.add_paragraph()
-        subtitle.text = 'Final '
-        subtitle.font.italic = True
-        subtitle1 = subtitle.add_run()
-        subtitle1.text = '- Protein Purification Summary'
-        subtitle1.font.italic = True
-        subtitle1.font.bold = False
-        if page * 10 < sampleNumber:
-            rowNumber = 10
-        else:
-            rowNumber = sampleNumber-(page-1)*10
-        table = shapes[1].insert_table(rows=rowNumber+1, cols=12).table
-        table.rows[0].height = Cm(1.92)
-        table.columns[0].width = Cm(1.23)
-        table.columns[1].width = Cm(6.18)
-        table.columns[2].width = Cm(3.58)
-        table.columns[3].width = Cm(2.17)
-        table.columns[4].width = Cm(2.37)
-        table.columns[5].width = Cm(1.99)
-        table.columns[6].width = Cm(1.88)
-        table.columns[7].width = Cm(3.85)
-        table.columns[8].width = Cm(3.21)
-        table.columns[9].width = Cm(1.78)
-        table.columns[10].width = Cm(1.47)
-        table.columns[11].width = Cm(3.89)
-        table.cell(0, 0).text = 'No'
-        table.cell(0, 1).text = 'Protein Name'
-        table.cell(0, 2).text = 'Concentration (mg/ml)'
-        table.cell(0, 3).text = 'Volume (ml)'
-        table.cell(0, 4).text = 'Amount (mg)'
-        table.cell(0, 5).text = 'Yield (mg/L)'
-        table.cell(0, 6).text = 'Buffer'
-        table.cell(0, 7).text = 'Purity by SEC-HPLC (%)'
-        table.cell(0, 8).text = 'Supernatant (mL)'
-        table.cell(0, 9).text = 'MW (kDa)'
-        table.cell(0, 10).text = 'PI'
-        table.cell(0, 11).text = 'Comments'
-        for row in range(0,rowNumber):
-            table.rows[row+1].height = Cm(1.2)
-            proteinName = list(finalDict.keys())[(page-1)*10+row]
-            table.cell(row+1,0).text = str(finalDict[proteinName].get('No',''))
-            table.cell(row+1,1).text = str(proteinName)
-            for col in range(2,12):
-                colName = table.cell(0, col).text.split('(')[0].strip()
-                table.cell(row+1,col).text = str(finalDict[proteinName].get(colName,''))
-        for cell in table.iter_cells():
-            cell.margin_left = 0
-            cell.margin_right = 0
-            cell.margin_top = 0
-            cell.margin_bottom = 0
-            cell.vertical_anchor = 3 ## 垂直居中
-            for paragraph in cell.text_frame.paragraphs:
-                paragraph.font.size = Pt(14)
-                paragraph.alignment = PP_ALIGN.CENTER ## 2  水平居中 
+    rows = FINAL_SCHEMA.stepRows(final)
+    if not rows:
+        return prs
+    widths = FINAL_SCHEMA.widths
+    headerHeight = rowHeight(FINAL_SCHEMA.labels, widths, FINAL_HEADER_HEIGHT)
+    heights = [rowHeight(row, widths, FINAL_ROW_HEIGHT) for row in rows]
+    capacity = pageBottom(prs, 1) - placeholderTop(prs, 1, FINAL_TABLE_PLACEHOLDER) - headerHeight
+    for start, stop in paginate(heights, capacity):
+        ## the skeleton only depends on the row count, the heights are set here
+        slide = addSkeletonSlide(prs, finalSlide, None, rows[start:stop])
+        setRowHeights(tableFrames(slide)[0], [headerHeight] + heights[start:stop])
     return prs
 
+def finalSlide(prs, structure, texts, pictures):
+    """
+    the final summary slide builder, texts is the cell list of every table
+    row, the rows are one line high until setRowHeights
+    """
+    slide = prs.slides.add_slide(slideLayout(prs,1))
+    shapes = slide.shapes
+    shapes.title.text = 'Characterization'
+    subtitle = shapes.title.text_frame.add_paragraph()
+    subtitle.text = 'Final '
+    subtitle.font.italic = True
+    subtitle1 = subtitle.add_run()
+    subtitle1.text = '- Protein Purification Summary'
+    subtitle1.font.italic = True
+    subtitle1.font.bold = False
+    rowNumber = len(texts)
+    graphicFrame = shapes[1].insert_table(rows=rowNumber+1, cols=len(FINAL_SCHEMA))
+    rows = [FINAL_SCHEMA.labels] + list(texts)
+    ## 14pt, centered in both directions, no margins
+    writeTable(graphicFrame, FINAL_SCHEMA.widths,
+               [FINAL_HEADER_HEIGHT] + [FINAL_ROW_HEIGHT] * rowNumber, rows)
+
 if __name__ == '__main__':
     filePath = os.path.abspath(os.path.dirname(__file__))
     template_path = os.path.join(filePath,'purificationTemplate.pptx')
@@ -289,5 +236,5 @@ if __name__ == '__main__':
     'Recovery': 'NA',
     'MW': '147',
     'Comments': 'Two steps'}}
-    prs = purificationFinalPageMake(prs, finalDict)
+    prs = purificationFinalPageMake(prs, StepTable.fromDict('', finalDict, 'Final'))
     prs.save('purificationFinalPageTest.pptx')
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 21:52:09 2026
+@author: tao_jingfen
+"""
+import copy
+from pptx.util import Cm
+from pptx.util import Pt
+from pptx.enum.shapes import MSO_SHAPE
+from pptx.enum.text import PP_ALIGN
+from pptx.dml.color import RGBColor
+from pptx.oxml.shapes.autoshape import CT_Shape
+from pptx.shapes.autoshape import AutoShapeType, Shape
+
+class FlowDiagram(object):
+    """
+    the step arrow of the process and SDS pages, a light RIGHT_ARROW with a
+    row of blue ROUNDED_RECTANGLE boxes on it, one box for every step
+
+    the arrow and an empty box are styled through python-pptx once, every
+    diagram deep-copies their xml and only sets the shape ids, positions and
+    box texts, the shapes are the same as add_shape followed by the fill,
+    line, shadow and font settings of every shape
+    """
+    left, width, height = Cm(2.3), Cm(31.5), Cm(4.28)
+    boxLeft, boxTop, boxWidth, boxHeight = Cm(3), Cm(1.05), Cm(3.6), Cm(2.1)
+
+    def __init__(self):
+        self._arrow = self._prototype(MSO_SHAPE.RIGHT_ARROW, self.width, self.height)
+        shape = Shape(self._arrow._element, None)
+        shape.shadow.inherit = False
+        shape.fill.solid()  ##实色填充
+        shape.fill.fore_color.rgb = RGBColor(208,216,232)
+        shape.line.fill.background()  ##透明边缘
+        self._box = self._prototype(MSO_SHAPE.ROUNDED_RECTANGLE, self.boxWidth, self.boxHeight)
+        shape = Shape(self._box._element, None)
+        shape.fill.solid()
+        shape.fill.fore_color.rgb = RGBColor(79,129,189)
+        shape.line.color.rgb = RGBColor(255,255,255)
+        shape.line.width = Cm(0.07)
+        shape.shadow.inherit = False
+        shape.text = ''
+        shape.text_frame.paragraphs[0].font.size = Pt(14)
+        shape.text_frame.paragraphs[0].alignment = PP_ALIGN.CENTER
+
+    @staticmethod
+    def _prototype(autoShape, width, height):
+        shapeType = AutoShapeType(autoShape)
+        sp = CT_Shape.new_autoshape_sp(0, '', shapeType.prst, 0, 0, width, height)
+        return _Prototype(sp, shapeType.basename)
+
+    def draw(self, shapes, texts: list, top: int):
+        """
+        Add the arrow at top with one box for every text
+
+        --Args:
+            shapes: the slide shapes to add the diagram to
+            texts: the box texts from left to right, at least 2,
+            e.g. ['Protein # 1, 3', 'Protein A', 'Dialysis', 'Filtration & Storage']
+            top: the top of the arrow, e.g. Cm(3)
+        """
+        spTree = shapes._spTree
+        shapeId = shapes._next_shape_id
+        spTree.insert_element_before(self._arrow.clone(shapeId, self.left, top), 'p:extLst')
+        typeNumber = len(texts)
+        margin = round((27.9-typeNumber*3.6)/(typeNumber-1),2)
+        small_left, small_top = self.boxLeft, top + self.boxTop
+        for n, text in enumerate(texts):
+            sp = self._box.clone(shapeId + n + 1, small_left, small_top)
+            ## like shape.text, lines after the first are paragraphs without the font and alignment
+            txBody = sp.txBody
+            lines = str(text).split('\n')
+            txBody.p_lst[0].append_text(lines[0])
+            for line in lines[1:]:
+                txBody.add_p().append_text(line)
+            spTree.insert_element_before(sp, 'p:extLst')
+            small_left = small_left + self.boxWidth + Cm(margin)
+
+class _Prototype(object):
+    """
+    one styled shape and the base of its shape names, e.g. 'Right Arrow'
+    """
+    __slots__ = ('_element', 'basename')
+    def __init__(self, element, basename: str):
+        self._element = element
+        self.basename = basename
+
+    def clone(self, shapeId: int, left: int, top: int):
+        """
+        a copy of the shape named as python-pptx names an added shape
+        """
+        sp = copy.deepcopy(self._element)
+        cNvPr = sp.nvSpPr.cNvPr
+        cNvPr.id = shapeId
+        cNvPr.name = '%s %d' % (self.basename, shapeId - 1)
+        sp.x, sp.y = left, top
+        return sp
+
+flowDiagram = FlowDiagram()
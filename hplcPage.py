@@ -7,213 +7,337 @@
 '''
 
 import os
-import docx
+import io
+import zipfile
+import posixpath
 import math
 import fitz
-import re
+from lxml import etree
 from pptx import Presentation
 from pptx.util import Cm
 from pptx.util import Pt
 from pptx.enum.text import PP_ALIGN
 from pptx.dml.color import RGBColor
-from pdfminer.pdfparser import PDFParser, PDFDocument
-from pdfminer.converter import PDFPageAggregator
-from pdfminer.layout import LAParams, LTTextBoxHorizontal
-from pdfminer.pdfinterp import PDFTextExtractionNotAllowed, PDFResourceManager, PDFPageInterpreter
 
+from reportModel import HplcRun
+from templateCache import slideLayout
+from slideImage import addPicture
+from slideSkeleton import addSkeletonSlide
+from pageLayout import paginate
+from reportProfile import timed
+from diskCache import DiskCache, contentHash
 
-def purificationHplcPageMake(prs: str, hplcList: list, proDict: dict) -> str:
+## the size of every chromatogram on the slide
+HPLC_PICTURE_SIZE = (Cm(12), Cm(4))
+## the chromatograms of one page in a 2x2 grid
+HPLC_PAGE_PICTURES = 4
+
+@timed()
+def purificationHplcPageMake(prs: str, hplcRuns: list, assetRoot: str = '', assets=None) -> str:
     """
     Create protein SEC-HPLC page of purification auto-report PPT
 
     --Args:
         prs: presentation object loaded from *pptx* by template pptx
-        supernatant: the supernatant volume(ml), e.g. "40"
-        hplcList: the list of every SEC-HPLC step info,
-        [stepName, HPLCfileName, HPLCelnInfo,HPLCconclusionInfo]
+        hplcRuns: HplcRun list of every SEC-HPLC step, see reportModel
+        HplcRun(stepNo, step, file, eln, conclusion, purity)
+        purity is the protein No and protein purity dict of the step,
+        {proteinName:(proteinNo,purity),...}
         e.g. [
-            ['1','Protein A', 'Protein A.docx','HPLC_ELN','HPLC_Conclusion'],
-            ['2','Dialysis', 'SEC.pdf', HPLC_ELN','HPLC_Conclusion']
+            HplcRun('1','Protein A', 'Protein A.docx','HPLC_ELN','HPLC_Conclusion',
+            {
+                'WXXX-T6U9.E17-1.uIgG1': ('1','59.77%'),
+                'WXXX-U9T6.E17-1.uIgG1': ('2','86.79%'),
+                'WXXX-T6U9.E17R-1.uIgG1': ('3','85.68%'),
+                'WXXX-U9T6.E17R-1.uIgG1': ('4','75.10%')
+            }),
+            HplcRun('2','Dialysis', 'SEC.pdf', 'HPLC_ELN','HPLC_Conclusion',{...})
             ...
             ]
-        proDict: the protein No and protein purity Dict,
-        {stepName:{proteinName:[proteinNo,purity],...}}
-        e.g.{
-            '1_Protein_A':{
-                'WXXX-T6U9.E17-1.uIgG1': [1,'59.77%'],
-                'WXXX-U9T6.E17-1.uIgG1': [2,'86.79%'],
-                'WXXX-T6U9.E17R-1.uIgG1': [3,'85.68%'],
-                'WXXX-U9T6.E17R-1.uIgG1': [4,'75.10%']
-            },
-            '2_Dialysis':{
-                'WXXX-T6U9.E17-1.uIgG1': [1,'88.57%'],
-                'WXXX-U9T6.E17-1.uIgG1': [2,'86.34%'],
-                'WXXX-T6U9.E17R-1.uIgG1': [3,'87.80%'],
-                'WXXX-U9T6.E17R-1.uIgG1': [4,'85.81%']
-            },
-            ...}
+        assetRoot: the folder that the HPLC files are relative to, e.g. the excel folder
+        assets: AssetPrefetch that already extracts the HPLC files, see assetPrefetch
     --Returns:
         prs：presentation object could be used to save pptx
         4 pictures in HPLC each page at most
         more samples will generate another page
     """
-    for stepHplc in hplcList:
-        stepName = '_'.join((stepHplc[0],stepHplc[1].replace(' ','_')))
-        stepProDict = proDict.get(stepName,{})
-        prs = hplcMake(prs,stepProDict,*stepHplc[1:])
+    for hplcRun in hplcRuns:
+        prs = hplcMake(prs,hplcRun,assetRoot,assets)
     return prs
 
-def hplcMake(prs,stepProDict,step,HPLC_File,HPLC_ELN,HPLC_Conclusion):
+@timed()
+def hplcMake(prs,hplcRun,assetRoot='',assets=None):
     """
     Create single protein SEC-HPLC page
     
     --Args:
         prs: presentation object loaded from *pptx* by template pptx
-        step: the step name that also show in the title, e.g. "Protein A "
-        stepProDict: dict, the protein No and protein purity of the corresponding protein name
+        hplcRun: HplcRun of this step, see reportModel
+        hplcRun.step: the step name that also show in the title, e.g. "Protein A "
+        hplcRun.purity: dict, the protein No and protein purity of the corresponding protein name
         e.g. {
-            'WXXX-T6U9.E17-1.uIgG1': [1,'59.77%'],
-            'WXXX-U9T6.E17-1.uIgG1': [2,'86.79%'],
-            'WXXX-T6U9.E17R-1.uIgG1': [3,'85.68%'],
-            'WXXX-U9T6.E17R-1.uIgG1': [4,'75.10%']
+            'WXXX-T6U9.E17-1.uIgG1': ('1','59.77%'),
+            'WXXX-U9T6.E17-1.uIgG1': ('2','86.79%'),
+            'WXXX-T6U9.E17R-1.uIgG1': ('3','85.68%'),
+            'WXXX-U9T6.E17R-1.uIgG1': ('4','75.10%')
             }
-        HPLC_File: the word file or pdf file that contain HPLC picture of this step, e.g. "SupernatantDialysis_SEC_HPLC.docx"
-        HPLC_ELN: the ELN info of SEC-HPLC setp, e.g. "WXBIOXXX/XXXX/20200103"
-        HPLC_Conclusion: the conclusion of SEC-HPLC that split by '|',
+        hplcRun.file: the word file or pdf file that contain HPLC picture of this step, e.g. "SupernatantDialysis_SEC_HPLC.docx"
+        hplcRun.eln: the ELN info of SEC-HPLC setp, e.g. "WXBIOXXX/XXXX/20200103"
+        hplcRun.conclusion: the conclusion of SEC-HPLC that split by '|',
         e.g. Expected reducing and non-reducing bands were visible from the gel.|Minor bands were observed in Lane # 1, 2, 3, 4. 
+        assetRoot: the folder that hplcRun.file is relative to, e.g. the excel folder
+        assets: AssetPrefetch to take the extracted pictures from, None to extract here
     --Returns:
         prs：presentation object could be used to save pptx
         4 pictures in HPLC each page at most
         more samples will generate another page
     """
+    step, HPLC_File = hplcRun.step, hplcRun.file
     if HPLC_File.strip() != '':
-        if HPLC_File.split('.')[-1] == 'docx':
-            picList = word2pic(HPLC_File)
-        elif HPLC_File.split('.')[-1] == 'pdf':
-            picList = pdf2pic(HPLC_File)
+        ## pictures are extracted in memory and never touch the disk
+        if assets is not None:
+            picList = assets.hplc(HPLC_File)
         else:
-            raise ValueError("HPLC文件必须是docx或PDF")
+            picList = extractHplc(os.path.join(assetRoot, HPLC_File))
         sampleNumber = len(picList)
-        for page in range(1,max(math.ceil(sampleNumber/10)+1,2)):
-            slide = prs.slides.add_slide(prs.slide_layouts[3])
-            shapes = slide.shapes
-            title_shape = shapes.title
-            title_shape.text = 'Characterization'
-            subtitle = title_shape.text_frame.add_paragraph()
-            subtitle.text = 'SEC-HPLC Results – '+ step
-            subtitle.font.italic = True
-            subtitle.font.bold = False
-            if page * 4 < sampleNumber:
-                rowNumber = 4
-            else:
-                rowNumber = sampleNumber-(page-1)*4
-            leftList = [Cm(5.2),Cm(18.5)]
-            topList = [Cm(3.2), Cm(8.8)] 
-            for n in range(rowNumber):
-                sampleIndex = (page-1)*4+n
-                sampleName = picList[sampleIndex].rsplit(".", 1)[0]
-                sampleNo = stepProDict.get(sampleName,['1','100%'])[0]
-                purity = stepProDict.get(sampleName,['1','100%'])[1]
-                top = topList[math.ceil((n+1)/2)-1]
-                left = leftList[n%2]
-                shape = shapes.add_textbox(left, top, Cm(12), Cm(0.6))
-                shape.text = str(sampleNo) + '.' + sampleName + \
-                        ', ' + purity
-                shape.text_frame.paragraphs[0].font.size = Pt(14)
-                shape.text_frame.paragraphs[0].alignment = PP_ALIGN.CENTER
-                shape = shapes.add_picture(picList[sampleIndex],left,top + Cm(0.8),Cm(12),Cm(4))
-                shape.line.color.rgb = RGBColor(79,129,189)
-                os.remove(picList[sampleIndex])
-            shape = shapes[0]
-            shape.left,shape.top,shape.width,shape.height = Cm(2.3),Cm(14.2),Cm(31.5),Cm(3) 
-            shape.text = 'Conclusion'
-            shape.text_frame.paragraphs[0].font.size = Pt(18)
-            shape.text_frame.paragraphs[0].font.bold = True
-            for text in HPLC_Conclusion.split('|'):
-                new_paragraph = shape.text_frame.add_paragraph()
-                new_paragraph.text = text
-                new_paragraph.font.bold = False
-                new_paragraph.font.size = Pt(14)
-                new_paragraph.level = 1
-            shape = shapes.add_textbox(Cm(28.5), Cm(18.8), Cm(3), Cm(1.11))
-            shape.text = HPLC_ELN
-            shape.text_frame.paragraphs[0].font.size = Pt(10)
+        ## every chromatogram takes one place of the grid, a file without
+        ## pictures still gets its page with the conclusion
+        for start, stop in paginate([1] * sampleNumber, HPLC_PAGE_PICTURES):
+            samples, pictures = [], []
+            for sampleName, blob in picList[start:stop]:
+                sampleNo, purity = hplcRun.purity.get(sampleName,('1','100%'))
+                samples.append([str(sampleNo) + '.' + sampleName + ', ' + purity, sampleName])
+                pictures.append(blob)
+            texts = [step, samples, hplcRun.conclusion.split('|'), hplcRun.eln]
+            addSkeletonSlide(prs, hplcSlide, None, texts, pictures)
     return prs
 
+def hplcSlide(prs, structure, texts, pictures):
+    """
+    the SEC-HPLC slide builder, texts is [step, [label, sample name] of every
+    picture, conclusions, eln], pictures is the chromatogram of every sample
+    """
+    step, samples, conclusions, eln = texts
+    slide = prs.slides.add_slide(slideLayout(prs,3))
+    shapes = slide.shapes
+    title_shape = shapes.title
+    title_shape.text = 'Characterization'
+    subtitle = title_shape.text_frame.add_paragraph()
+    subtitle.text = 'SEC-HPLC Results – '+ step
+    subtitle.font.italic = True
+    subtitle.font.bold = False
+    leftList = [Cm(5.2),Cm(18.5)]
+    topList = [Cm(3.2), Cm(8.8)] 
+    for n, ((label, sampleName), blob) in enumerate(zip(samples, pictures)):
+        top = topList[math.ceil((n+1)/2)-1]
+        left = leftList[n%2]
+        shape = shapes.add_textbox(left, top, Cm(12), Cm(0.6))
+        shape.text = label
+        shape.text_frame.paragraphs[0].font.size = Pt(14)
+        shape.text_frame.paragraphs[0].alignment = PP_ALIGN.CENTER
+        shape = addPicture(shapes,blob,sampleName,left,top + Cm(0.8),*HPLC_PICTURE_SIZE)
+        shape.line.color.rgb = RGBColor(79,129,189)
+    shape = shapes[0]
+    shape.left,shape.top,shape.width,shape.height = Cm(2.3),Cm(14.2),Cm(31.5),Cm(3) 
+    shape.text = 'Conclusion'
+    shape.text_frame.paragraphs[0].font.size = Pt(18)
+    shape.text_frame.paragraphs[0].font.bold = True
+    for text in conclusions:
+        new_paragraph = shape.text_frame.add_paragraph()
+        new_paragraph.text = text
+        new_paragraph.font.bold = False
+        new_paragraph.font.size = Pt(14)
+        new_paragraph.level = 1
+    shape = shapes.add_textbox(Cm(28.5), Cm(18.8), Cm(3), Cm(1.11))
+    shape.text = eln
+    shape.text_frame.paragraphs[0].font.size = Pt(10)
+
+WORD_NS = {
+    'w': 'http://schemas.openxmlformats.org/wordprocessingml/2006/main',
+    'wp': 'http://schemas.openxmlformats.org/drawingml/2006/wordprocessingDrawing',
+    'a': 'http://schemas.openxmlformats.org/drawingml/2006/main',
+    'r': 'http://schemas.openxmlformats.org/officeDocument/2006/relationships',
+    'rel': 'http://schemas.openxmlformats.org/package/2006/relationships'}
+W_TBL = '{%s}tbl' % WORD_NS['w']
+W_BODY = '{%s}body' % WORD_NS['w']
+WP_INLINE = '{%s}inline' % WORD_NS['wp']
+R_EMBED = '{%s}embed' % WORD_NS['r']
+W_VAL = '{%s}val' % WORD_NS['w']
+
+def _cellText(tc) -> str:
+    """
+    the text of a table cell as python-docx gives it, paragraphs joined by new lines
+    """
+    return '\n'.join(''.join(p.itertext()) for p in tc.iterfind('w:p', WORD_NS))
+
+def _gridRows(tbl, rowCount: int) -> list:
+    """
+    the cells of the first rows of the table by grid column as python-docx
+    row.cells gives them, a cell spanning columns is repeated and a
+    vertically merged cell is the cell above it
+    """
+    rows, above = [], []
+    for tr in tbl.findall('w:tr', WORD_NS)[:rowCount]:
+        cells = []
+        for tc in tr.findall('w:tc', WORD_NS):
+            span = tc.find('w:tcPr/w:gridSpan', WORD_NS)
+            merge = tc.find('w:tcPr/w:vMerge', WORD_NS)
+            continued = merge is not None and merge.get(W_VAL, 'continue') == 'continue'
+            if continued and len(cells) < len(above):
+                tc = above[len(cells)]
+            cells.extend([tc] * (1 if span is None else int(span.get(W_VAL))))
+        rows.append(cells)
+        above = cells
+    return rows
+
+def _tableSampleName(tbl):
+    """
+    the cell right of 'Sample name:' in the first 5 rows and 5 grid columns of the table
+    """
+    sampleName = None
+    for cells in _gridRows(tbl, 5):
+        for n, tc in enumerate(cells[:5]):
+            if n + 1 < len(cells) and _cellText(tc) == 'Sample name:':
+                sampleName = _cellText(cells[n + 1])
+    return sampleName
+
+def _partName(target: str) -> str:
+    """
+    the zip name of the part a relationship of word/document.xml targets,
+    a target starting with '/' is relative to the package root
+    """
+    if target.startswith('/'):
+        return posixpath.normpath(target[1:])
+    return posixpath.normpath(posixpath.join('word', target))
+
+@timed()
 def word2pic(wordPath):
     """
-    extract picture from HPLC word file
-    return the priture name list
+    extract picture from HPLC word file path or bytes in memory
+    return the (sampleName, picture bytes) list
+
+    word/document.xml is walked once, every body table holds one sample name
+    and the first of every two inline pictures is its chromatogram, the
+    pictures are read from the zip by their relationship target
     """
-    picList = []
-    doc = docx.Document(wordPath)
-    proNum = len(doc.tables)
-    for i in range(proNum):
-        for row in range(5):
-            for cell in range(5):
-                if doc.tables[i].rows[row].cells[cell].text == 'Sample name:':
-                    sampleName = doc.tables[i].rows[row].cells[cell + 1].text
-        blip = doc.inline_shapes[2*i]._inline.graphic.graphicData.pic.blipFill.blip
-        rID = blip.embed
-        image_part = doc.part.related_parts[rID]
-        with open(sampleName+'.bin', "wb") as f:
-            f.write(image_part.blob)
-        picList.append(sampleName+'.bin')
+    if isinstance(wordPath, (bytes, bytearray)):
+        wordPath = io.BytesIO(wordPath)
+    with zipfile.ZipFile(wordPath) as wordZip:
+        document = etree.fromstring(wordZip.read('word/document.xml'))
+        rels = etree.fromstring(wordZip.read('word/_rels/document.xml.rels'))
+        targets = {rel.get('Id'): _partName(rel.get('Target'))
+                   for rel in rels.iterfind('rel:Relationship', WORD_NS)
+                   if rel.get('TargetMode') != 'External'}
+        sampleNames = []
+        blips = []
+        sampleName = None
+        for element in document.iter(W_TBL, WP_INLINE):
+            if element.tag == W_TBL:
+                if element.getparent().tag == W_BODY:
+                    sampleName = _tableSampleName(element) or sampleName
+                    sampleNames.append(sampleName)
+            else:
+                blip = element.find('a:graphic/a:graphicData/*/*/a:blip', WORD_NS)
+                blips.append(None if blip is None else blip.get(R_EMBED))
+        picList = []
+        for i, sampleName in enumerate(sampleNames):
+            if sampleName is None:
+                raise ValueError('HPLC Word第%d个表格找不到Sample name' % (i + 1))
+            if 2 * i >= len(blips) or blips[2 * i] not in targets:
+                raise ValueError('HPLC Word找不到第%d个样品的图片' % (i + 1))
+            picList.append((sampleName, wordZip.read(targets[blips[2 * i]])))
     return picList
 
+def _isImage(doc, xref: int) -> bool:
+    """
+    whether the pdf object xref is an image XObject
+    """
+    return (doc.xref_get_key(xref, 'Type') == ('name', '/XObject') and
+            doc.xref_get_key(xref, 'Subtype') == ('name', '/Image'))
+
+def _pdfSampleName(page) -> str:
+    """
+    the sample name of one HPLC pdf page, the first line of the third text
+    block as the exports have always been read
+    """
+    blocks = [block[4] for block in page.get_text('blocks') if block[6] == 0]
+    if len(blocks) < 3:
+        raise ValueError('HPLC PDF第%d页找不到样品名' % (page.number + 1))
+    return blocks[2].split('\n')[0].strip()
+
+@timed()
 def pdf2pic(pdfPath):
     """
-    extract picture from HPLC pdf file
-    return the priture name list
+    extract picture from HPLC pdf file path or bytes in memory
+    return the (sampleName, picture bytes) list
+
+    the pdf is opened once, the image XObjects are counted in object order
+    and every second one is a chromatogram, the one before it is the logo
+    of its report, the sample name is read from the page that shows the
+    chromatogram, pages without pictures are skipped, jpeg pictures are
+    kept as stored
     """
     picList = []
-    fp = open(pdfPath,'rb')
-    with open(pdfPath,'rb') as fp:
-        praser = PDFParser(fp)
-        doc = PDFDocument()
-        praser.set_document(doc)
-        doc.set_parser(praser)
-        doc.initialize()
-        if not doc.is_extractable:
-            raise PDFTextExtractionNotAllowed
-        else:
-            rsrcmgr = PDFResourceManager()
-            laparams = LAParams()
-            device = PDFPageAggregator(rsrcmgr, laparams=laparams)
-            interpreter = PDFPageInterpreter(rsrcmgr, device)
-            results = []
-            for page in doc.get_pages():
-                interpreter.process_page(page)
-                layout = device.get_result()
-                for x in layout:
-                    if isinstance(x, LTTextBoxHorizontal):
-                        results.append(x.get_text())
-    sampleName = [results[i*18 + 2].split('\n')[0] for i in range(int(len(results)/18))]
-    
-    checkXO = r"/Type(?= */XObject)"
-    checkIM = r"/Subtype(?= */Image)"
-    doc = fitz.open(pdfPath)
-    lenXREF = doc._getXrefLength()
-    picOrder = 0
-    for i in range(1, lenXREF):
-        text = doc._getXrefString(i)
-        isXObject = re.search(checkXO, text)
-        isImage = re.search(checkIM, text)
-        if isXObject and isImage:
-            picOrder += 1
-            if picOrder % 2 == 0:
-                pix = fitz.Pixmap(doc, i)
-                picName = sampleName[int(picOrder // 2)-1] + '.png'
-                picList.append(picName)
-                if pix.n < 5:
-                    pix.writePNG(picName)
-                else:
-                    pix0 = fitz.Pixmap(fitz.csRGB, pix)
-                    pix0.writePNG(picName)
-                    pix0 = None
-                pix = None
+    if isinstance(pdfPath, (bytes, bytearray)):
+        doc = fitz.open(stream=pdfPath, filetype='pdf')
+    else:
+        doc = fitz.open(pdfPath)
+    with doc:
+        ## the first page that shows every image
+        pages = {}
+        for page in doc:
+            for image in page.get_images(full=True):
+                pages.setdefault(image[0], page.number)
+        images = [xref for xref in range(1, doc.xref_length()) if _isImage(doc, xref)]
+        for n, xref in enumerate(images[1::2]):
+            if xref not in pages:
+                raise ValueError('HPLC PDF第%d张色谱图不在任何页面上' % (n + 1))
+            sampleName = _pdfSampleName(doc[pages[xref]])
+            image = doc.extract_image(xref)
+            blob = image['image']
+            if image['ext'] not in ('png', 'jpeg', 'jpg') or image.get('smask'):
+                pix = fitz.Pixmap(doc, xref)
+                if pix.n - pix.alpha >= 4:
+                    pix = fitz.Pixmap(fitz.csRGB, pix)
+                blob = pix.tobytes('png')
+            picList.append((sampleName, blob))
     return picList
 
+## the version of word2pic, pdf2pic and their helpers, it is part of the
+## HPLC cache key, bump it by hand whenever the extraction result changes
+EXTRACTOR_VERSION = '3'
+## the extracted (sampleName, picture bytes) lists keyed by the HPLC file bytes,
+## the size cap in MB can be set by the AUTOREPORT_HPLC_CACHE_MB environment
+hplcCache = DiskCache('hplc', maxBytes=int(os.environ.get('AUTOREPORT_HPLC_CACHE_MB', 512)) * 1024 * 1024)
+
+@timed()
+def extractHplc(hplcPath: str, cache: DiskCache = hplcCache) -> list:
+    """
+    extract the sample names and chromatograms of one HPLC docx or pdf file
+    the file bytes are hashed, when the cache already has the result of the
+    same bytes and EXTRACTOR_VERSION the file is not parsed at all,
+    pass cache=None to always parse
+
+    --Args:
+        hplcPath: the HPLC docx or pdf file path
+        cache: DiskCache of the extracted results
+    --Returns:
+        picList: [(sampleName, picture bytes), ...] in the file order
+    """
+    fileType = hplcPath.split('.')[-1]
+    if fileType == 'docx':
+        extractor = word2pic
+    elif fileType == 'pdf':
+        extractor = pdf2pic
+    else:
+        raise ValueError("HPLC文件必须是docx或PDF")
+    with open(hplcPath, 'rb') as f:
+        content = f.read()
+    if cache is None:
+        return extractor(content)
+    return cache.memoize(contentHash(content, EXTRACTOR_VERSION, fileType),
+                         lambda: extractor(content))
+
 if __name__ == '__main__':
     filePath = os.path.abspath(os.path.dirname(__file__))
     template_path = os.path.join(filePath,'purificationTemplate.pptx')
@@ -238,5 +362,10 @@ if __name__ == '__main__':
             'W308031-T6U9.E17R-1.uIgG1': [3,'99.30%']
             }
             }
-    prs = purificationHplcPageMake(prs,hplcList,proDict)
+    hplcRuns = []
+    for stepHplc in hplcList:
+        hplcRun = HplcRun(*stepHplc)
+        hplcRun.purity = proDict.get(hplcRun.key(), {})
+        hplcRuns.append(hplcRun)
+    prs = purificationHplcPageMake(prs,hplcRuns)
     prs.save('purificationHplcPageTest.pptx')
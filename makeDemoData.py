@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 18:02:47 2026
+@author: tao_jingfen
+
+Generate synthetic purification excels with SDS pictures and HPLC files, e.g.
+    python makeDemoData.py D:\\demo --proteins 100 --steps 6 --sds 4
+"""
+import os
+import io
+import random
+import argparse
+import fitz
+import docx
+from docx.shared import Cm as DocxCm
+from openpyxl import Workbook
+from PIL import Image, ImageDraw
+
+SHEET1_TITLE = ['ProjectName','Date','PurificationStepNo','PurificationStep',
+                'ProteinNo','ProteinName','Concentration (mg/ml)','Volume (ml)',
+                'Amount (mg)','Yield (mg/L)','Buffer','Purity by SEC-HPLC (%)',
+                'Recovery(%)','Supernatant (mL)','MW (kDa)','PI','Comments']
+SHEET2_TITLE = ['PurificationStepNo','PurificationStep','SDS_Picture','SDS_Table',
+                'SDS_ELN','SDS_Conclusion','HPLC_Picture','HPLC_ELN','HPLC_Conclusion']
+SHEET3_TITLE = ['Table','Lane','Protein name','MW(kDa)']
+STEP_NAMES = ['Dialysis','SEC','CEX','Dialysis','Filtration']
+
+def _image(width: int, height: int, seed: int, fmt: str = 'PNG') -> bytes:
+    """
+    a chromatogram like picture, the curve depends on seed so every picture differs
+    """
+    rnd = random.Random(seed)
+    image = Image.new('RGB', (width, height), (255, 255, 255))
+    draw = ImageDraw.Draw(image)
+    for x in range(0, width, max(1, width // 12)):
+        draw.line([(x, 0), (x, height)], fill=(225, 225, 225))
+    peaks = [(rnd.uniform(0.1, 0.9) * width, rnd.uniform(0.1, 0.9) * height,
+              rnd.uniform(0.005, 0.03) * width) for _ in range(rnd.randint(1, 4))]
+    points = []
+    for x in range(0, width, 2):
+        y = sum(h * 2.718 ** (-((x - c) / w) ** 2) for c, h, w in peaks)
+        points.append((x, height - 10 - min(y, height - 20) - rnd.random() * 2))
+    draw.line(points, fill=(20, 40, 160), width=2)
+    draw.text((10, 10), 'Sample %d' % seed, fill=(0, 0, 0))
+    stream = io.BytesIO()
+    image.save(stream, fmt)
+    return stream.getvalue()
+
+def _gel(width: int, height: int, lanes: int, seed: int) -> bytes:
+    """
+    an SDS-PAGE like picture with a marker lane and one lane for each protein
+    """
+    rnd = random.Random(seed)
+    image = Image.new('RGB', (width, height), (200, 205, 215))
+    draw = ImageDraw.Draw(image)
+    laneWidth = width / (lanes + 2)
+    for lane in range(lanes + 1):
+        x = (lane + 0.5) * laneWidth
+        bands = range(8) if lane == 0 else rnd.sample(range(8), rnd.randint(1, 3))
+        for band in bands:
+            y = height * (0.1 + 0.1 * band)
+            draw.rectangle([x, y, x + laneWidth * 0.8, y + height * 0.015], fill=(40, 50, 90))
+    stream = io.BytesIO()
+    image.save(stream, 'PNG')
+    return stream.getvalue()
+
+def makeHplcDocx(path: str, sampleNames: list, imageSize: tuple = (1200, 400), seed: int = 0):
+    """
+    HPLC word export: for each sample a 5x5 info table with 'Sample name:'
+    followed by the chromatogram picture and the peak table picture
+    """
+    doc = docx.Document()
+    for i, sampleName in enumerate(sampleNames):
+        table = doc.add_table(rows=5, cols=5)
+        table.cell(0, 0).text = 'Sample name:'
+        table.cell(0, 1).text = sampleName
+        table.cell(1, 0).text = 'Injection:'
+        table.cell(1, 1).text = str(i + 1)
+        for n in range(2):
+            doc.add_picture(io.BytesIO(_image(*imageSize, seed=seed * 1000 + 2 * i + n)),
+                            width=DocxCm(12))
+    doc.save(path)
+
+def makeHplcPdf(path: str, sampleNames: list, imageSize: tuple = (1200, 400), seed: int = 0):
+    """
+    HPLC pdf export: one page for each sample, 18 text lines with the sample
+    name on the third one, then the logo picture and the chromatogram picture
+    """
+    doc = fitz.open()
+    for i, sampleName in enumerate(sampleNames):
+        page = doc.new_page(width=595, height=900)
+        lines = ['Report %d' % (i + 1), 'Sample Name:', sampleName, 'Injection: %d' % (i + 1)]
+        lines += ['Field %d: %d' % (n, n * i) for n in range(len(lines), 18)]
+        for n, text in enumerate(lines):
+            page.insert_text((40, 40 + n * 48), text, fontsize=10)
+        page.insert_image(fitz.Rect(450, 20, 550, 60),
+                          stream=_image(100, 40, seed=seed * 1000 + 2 * i))
+        page.insert_image(fitz.Rect(200, 300, 560, 420),
+                          stream=_image(*imageSize, seed=seed * 1000 + 2 * i + 1))
+    doc.save(path, garbage=3, deflate=True)
+    doc.close()
+
+def makeWorkbook(folder: str, proteins: int = 10, steps: int = 4, sdsTables: int = 2,
+                 hplcFormat: str = 'mixed', gelSize: tuple = (1600, 1000),
+                 chromSize: tuple = (1200, 400), seed: int = 1) -> str:
+    """
+    Generate a purification excel and its pictures in folder
+
+    --Args:
+        folder: the output folder, created if missing
+        proteins: the number of proteins N
+        steps: the number of purification steps M, the first is Protein A
+        sdsTables: the number of steps K with SDS-PAGE picture and table
+        hplcFormat: 'docx', 'pdf', 'mixed' or 'none' for the HPLC files
+        gelSize, chromSize: the pixel size of the SDS and HPLC pictures
+        seed: the random seed
+    --Returns:
+        excelPath: the generated excel path
+    """
+    os.makedirs(folder, exist_ok=True)
+    rnd = random.Random(seed)
+    stepNames = ['Protein A'] + [STEP_NAMES[i % len(STEP_NAMES)] for i in range(steps - 1)]
+    proteinNames = ['W%04d-hPro%d.His' % (seed, n) for n in range(1, proteins + 1)]
+    wb = Workbook()
+    ws = wb.active
+    ws.append(SHEET1_TITLE)
+    for stepNo, step in enumerate(stepNames, 1):
+        for n, proteinName in enumerate(proteinNames, 1):
+            ## later steps drop some proteins like a real campaign
+            if stepNo > 2 and rnd.random() < 0.15:
+                continue
+            amount = rnd.uniform(0.1, 20)
+            ws.append(['WBP%04d' % seed, '04/13/2020', stepNo, step, n, proteinName,
+                       rnd.uniform(0.1, 5), rnd.uniform(0.5, 5), amount,
+                       '' if rnd.random() < 0.05 else amount * 25,
+                       rnd.choice(['PBS', '20mM His, pH6.0']),
+                       '%.2f%%' % rnd.uniform(85, 99.9),
+                       'NA' if stepNo == 1 else '%.1f' % rnd.uniform(50, 95),
+                       40, rnd.choice(['147', '148', '22+53+49+23']),
+                       rnd.uniform(5.5, 9), rnd.choice(['', 'Two steps', 'Low yield'])])
+    ws2 = wb.create_sheet('SDS_HPLC')
+    ws2.append(SHEET2_TITLE)
+    ws3 = wb.create_sheet('SDS_Table')
+    ws3.append(SHEET3_TITLE)
+    sdsSteps = set(range(1, steps + 1)[-sdsTables:]) if sdsTables else set()
+    for stepNo, step in enumerate(stepNames, 1):
+        picture = table = '-'
+        if stepNo in sdsSteps:
+            picture = 'gel_%d.png' % stepNo
+            table = 'Table%d' % stepNo
+            with open(os.path.join(folder, picture), 'wb') as f:
+                f.write(_gel(*gelSize, lanes=proteins, seed=seed * 100 + stepNo))
+            for lane, proteinName in enumerate(proteinNames, 1):
+                ws3.append([table, str(lane), proteinName, '147'])
+        hplcFile = ' '
+        fmt = hplcFormat if hplcFormat != 'mixed' else ('docx', 'pdf')[stepNo % 2]
+        if fmt in ('docx', 'pdf'):
+            hplcFile = 'hplc_%d.%s' % (stepNo, fmt)
+            maker = makeHplcDocx if fmt == 'docx' else makeHplcPdf
+            maker(os.path.join(folder, hplcFile), proteinNames, chromSize, seed * 100 + stepNo)
+        ws2.append([stepNo, step, picture, table, 'WXBIO%04d/%03d' % (seed, stepNo),
+                    'Expected bands were visible from the gel.|Minor bands were observed.',
+                    hplcFile, 'WXBIO%04d/H%03d' % (seed, stepNo),
+                    'The purities of the proteins were above 90%.|Monomer peak at 7.7 mins.'])
+    excelPath = os.path.join(folder, 'demo_%dx%dx%d.xlsx' % (proteins, steps, sdsTables))
+    wb.save(excelPath)
+    return excelPath
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Generate a synthetic purification excel.')
+    parser.add_argument('folder')
+    parser.add_argument('--proteins', type=int, default=10)
+    parser.add_argument('--steps', type=int, default=4)
+    parser.add_argument('--sds', type=int, default=2)
+    parser.add_argument('--hplc', default='mixed', choices=['docx', 'pdf', 'mixed', 'none'])
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+    print(makeWorkbook(args.folder, args.proteins, args.steps, args.sds, args.hplc, seed=args.seed))
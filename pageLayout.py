@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 22:14:36 2026
+@author: tao_jingfen
+"""
+import unicodedata
+from pptx.util import Pt
+
+## the advance widths in em of the template fonts (Calibri, Arial), the widths
+## only need to be close enough to tell how many lines a table cell wraps to
+_NARROW = set("iljtfI.,;:!|'\"()[]{} ")
+_WIDE = set('mwMW@%&')
+NARROW_EM, NORMAL_EM, UPPER_EM, WIDE_EM, FULL_EM = 0.28, 0.5, 0.62, 0.85, 1.0
+## the line height of a paragraph as a multiple of the font size
+LINE_SPACING = 1.2
+
+def charWidth(char: str) -> float:
+    """
+    the estimated advance width of char in em
+    """
+    if char in _NARROW:
+        return NARROW_EM
+    if char in _WIDE:
+        return WIDE_EM
+    if char.isascii():
+        return UPPER_EM if char.isupper() or char.isdigit() else NORMAL_EM
+    if unicodedata.east_asian_width(char) in ('W', 'F'):
+        return FULL_EM
+    return NORMAL_EM
+
+def textWidth(text: str, fontSize: int = Pt(14)) -> int:
+    """
+    the estimated width of one line of text in EMU
+    """
+    return int(sum(charWidth(char) for char in text) * fontSize)
+
+def lineCount(text: str, width: int, fontSize: int = Pt(14)) -> int:
+    """
+    the number of lines text wraps to in a box of width EMU, words are
+    wrapped at spaces and words wider than the box are broken anywhere
+
+    --Args:
+        text: the text, '\\n' and '\\v' start a new line
+        width: the width of the text box in EMU
+        fontSize: the font size in EMU, e.g. Pt(14)
+    """
+    space = charWidth(' ') * fontSize
+    lines = 0
+    for paragraph in str(text).replace('\v', '\n').split('\n'):
+        lines += 1
+        used = 0
+        for word in paragraph.split(' '):
+            wordWidth = textWidth(word, fontSize)
+            if used and used + space + wordWidth <= width:
+                used += space + wordWidth
+                continue
+            if used:
+                lines += 1
+            ## a word wider than the box fills whole lines
+            while wordWidth > width > 0:
+                lines += 1
+                wordWidth -= width
+            used = wordWidth
+    return lines
+
+def rowHeight(cells: list, widths: list, minHeight: int, fontSize: int = Pt(14)) -> int:
+    """
+    the estimated height of a table row without cell margins, PowerPoint
+    grows a row beyond its height until the longest cell fits
+
+    --Args:
+        cells: the cell texts of the row, None for a merged cell
+        widths: the column widths in EMU
+        minHeight: the row height set in the table
+        fontSize: the font size of the cells
+    --Returns:
+        height: the row height in EMU, at least minHeight
+    """
+    lines = max([lineCount(text, width, fontSize) for text, width in zip(cells, widths)
+                 if text is not None] or [1])
+    return max(minHeight, int(lines * fontSize * LINE_SPACING))
+
+def paginate(heights: list, capacity: int, maxRows: int = None) -> list:
+    """
+    Split rows into the fewest pages that keep their order and fit capacity
+
+    a row taller than capacity gets a page of its own, filling every page
+    before starting the next one gives the fewest pages for rows in order
+
+    --Args:
+        heights: the height of every row in EMU
+        capacity: the height available for the rows of one page in EMU
+        maxRows: the most rows on one page, e.g. the lanes of one gel
+    --Returns:
+        pages: [(start, stop), ...] the row slice of every page, at least one
+    """
+    pages = []
+    start, used = 0, 0
+    for n, height in enumerate(heights):
+        if n > start and (used + height > capacity or
+                          (maxRows is not None and n - start >= maxRows)):
+            pages.append((start, n))
+            start, used = n, 0
+        used += height
+    pages.append((start, len(heights)))
+    return pages
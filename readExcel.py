@@ -3,15 +3,199 @@
 Created on Wed Jun 10 11:02:19 2020
 @author: tao_jingfen
 """
-import os
+import io
+import numpy as np
 import pandas as pd
 from collections import defaultdict
+from openpyxl import load_workbook
 import time
 
-def excel2Dict(excelPath : str):
+from reportModel import (RESULT_FIELDS, Protein, StepResult, StepTable,
+                         SdsTable, SdsRun, HplcRun, PurificationData)
+from diskCache import DiskCache, contentHash
+
+## the version of parseWorkbook and the record classes of reportModel, it is
+## part of the excel cache key, bump it by hand whenever the parsed result changes
+PARSER_VERSION = '2'
+## the parsed PurificationData of the workbooks, keyed by the workbook bytes
+excelCache = DiskCache('excel', maxBytes=64 * 1024 * 1024)
+
+def readWorkbook(excelPath : str, sheetNumber : int = 3) -> list:
+    """
+    read the first sheets of the workbook in one pass
+    the xlsx is opened once in read-only streaming mode, every sheet is
+    collected into column buffers and turned into a str DataFrame, the same
+    as pd.read_excel(excelPath,sheet_name=i,keep_default_na=False,dtype=str)
+    blank rows are skipped, so the worksheet row number of every DataFrame
+    row is kept in frame.attrs['excelRows']
+
+    --Args:
+        excelPath: excel file path or file-like object
+        sheetNumber: the number of sheets to read, start from the first one
+    --Returns:
+        sheetList: [sheet1, sheet2, sheet3] DataFrame list
+    """
+    wb = load_workbook(excelPath, read_only=True, data_only=True)
+    try:
+        sheetList = []
+        for ws in wb.worksheets[:sheetNumber]:
+            rows = ws.iter_rows(values_only=True)
+            header = next(rows, ())
+            header = [str(value) if value is not None else 'Unnamed: %d' % i
+                      for i, value in enumerate(header)]
+            columns = [[] for _ in header]
+            excelRows = []
+            for rowNumber, row in enumerate(rows, 2):
+                if all(value is None or value == '' for value in row):
+                    continue
+                excelRows.append(rowNumber)
+                for i, buffer in enumerate(columns):
+                    buffer.append(_cell2Str(row[i] if i < len(row) else None))
+            frame = pd.DataFrame(dict(zip(header, columns)), columns=header, dtype=str)
+            frame.attrs['excelRows'] = excelRows
+            sheetList.append(frame)
+    finally:
+        wb.close()
+    return sheetList
+
+def _cell2Str(value) -> str:
+    """
+    convert one openpyxl cell value to the string pd.read_excel gives with dtype=str
+    """
+    if value is None:
+        return ''
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+NUMERIC_COLUMNS = ['Concentration (mg/ml)','Volume (ml)','Amount (mg)',
+                   'Yield (mg/L)','PI']
+
+def normalizeNumeric(sheet, columns : list = NUMERIC_COLUMNS):
+    """
+    convert, validate and format the numeric columns of sheet1 column by column
+    blank cells stay blank, other cells are written back as '%.2f' strings
+
+    --Args:
+        sheet: sheet1 DataFrame read with dtype=str, changed in place
+        columns: the numeric column names
+    --Returns:
+        values: float DataFrame of the same columns, blank cells are NaN
+    --Raises:
+        ValueError: some cells are not numbers, with the column and the
+        worksheet row from sheet.attrs['excelRows'] of readWorkbook
+    """
+    text = sheet[columns]
+    blank = text.eq('').to_numpy()
+    values = text.apply(pd.to_numeric, errors='coerce').astype(float)
+    bad = np.isnan(values.to_numpy()) & ~blank
+    if bad.any():
+        rowIndex, colIndex = np.nonzero(bad)
+        excelRows = sheet.attrs.get('excelRows') or [index + 2 for index in sheet.index]
+        badList = ['%s (row %d): %s' % (columns[col], excelRows[row],
+                   text.iat[row, col]) for row, col in zip(rowIndex, colIndex)]
+        raise ValueError('数值格式错误: ' + '; '.join(badList))
+    formatted = np.char.mod('%.2f', values.to_numpy())
+    sheet[columns] = np.where(blank, '', formatted)
+    return values
+
+def groupSteps(df1, values=None):
+    """
+    build the final table, processList and the step tables in one ordered
+    traversal of sheet1, every structure is grouped by hashing instead of
+    masking the DataFrame once per step or protein, so the cost is linear in
+    the rows
+
+    --Args:
+        df1: sheet1 DataFrame from column 'PurificationStepNo' on
+        values: float DataFrame of the numeric columns from normalizeNumeric
+    --Returns:
+        final: StepTable of the highest PurificationStepNo row of each
+        protein, sorted by protein No
+        processList: [['Protein # 1, 3', step, ..., 'Filtration & Storage'], ...]
+        steps: StepTable list in the order the steps first appear
+    """
+    valueCols = df1.columns.tolist()[4:]
+    colNames = [col.split("(")[0].strip() for col in valueCols]
+    fieldPos = [colNames.index(field) if field in colNames else None
+                for field in RESULT_FIELDS]
+    if values is not None:
+        numberCols = [values[col].tolist() for col in values.columns]
+        numberRows = list(zip(*numberCols)) if numberCols else None
+    else:
+        numberRows = None
+    stepTables = {}                   # stepNo: StepTable
+    stepNames = defaultdict(dict)     # stepNo: {step: None} in appearance order
+    proteinSteps = defaultdict(list)  # proteinNo: steps without repeats
+    lastRows = {}                     # proteinName: (stepNo, result, numbers)
+    columns = [df1[col].tolist() for col in df1.columns]
+    for row, (stepNo, step, proteinNo, proteinName, *cells) in \
+            enumerate(zip(*columns)):
+        result = StepResult(Protein(str(proteinNo), proteinName),
+                            tuple('' if pos is None else str(cells[pos])
+                                  for pos in fieldPos))
+        numbers = numberRows[row] if numberRows else ()
+        stepTable = stepTables.get(stepNo)
+        if stepTable is None:
+            stepTable = stepTables[stepNo] = StepTable(stepNo, '')
+        stepTable.append(result, numbers)
+        stepNames[stepNo][step] = None
+        steps = proteinSteps[proteinNo]
+        if not steps or steps[-1] != step:
+            steps.append(step)
+        last = lastRows.get(proteinName)
+        if last is None or stepNo >= last[0]:
+            lastRows[proteinName] = (stepNo, result, numbers)
+
+    ### stepPage
+    for stepNo, stepTable in stepTables.items():
+        stepTable.name = ' & '.join(stepNames[stepNo])
+
+    ### finalPage, sorted by protein No
+    final = StepTable('', 'Final')
+    for _, result, numbers in sorted(lastRows.values(), key=lambda last:
+            (last[1].protein.no, last[1].protein.name)):
+        final.append(result, numbers)
+
+    ### processPage
+    processDict = defaultdict(list)
+    for proteinNo, steps in proteinSteps.items():
+        processDict[tuple(steps)].append(proteinNo)
+    processList = [['Protein # ' + ', '.join(value)] + list(key) +
+                   ['Filtration & Storage'] for key, value in processDict.items()]
+    return final,processList,list(stepTables.values())
+
+def loadTimeCompare(excelPath : str, repeat : int = 5) -> dict:
+    """
+    compare the loading time of readWorkbook with three pd.read_excel calls
+
+    --Args:
+        excelPath: excel file path
+        repeat: the times to run each loader, the best one is kept
+    --Returns:
+        timeDict: {'read_excel': seconds, 'readWorkbook': seconds}
+    """
+    def readExcel3():
+        return [pd.read_excel(excelPath, sheet_name=i, keep_default_na=False,
+                              dtype=str) for i in range(3)]
+    timeDict = {}
+    for name, loader in [('read_excel', readExcel3),
+                         ('readWorkbook', lambda: readWorkbook(excelPath))]:
+        best = float('inf')
+        for _ in range(repeat):
+            start = time.perf_counter()
+            loader()
+            best = min(best, time.perf_counter() - start)
+        timeDict[name] = best
+    return timeDict
+
+def excel2Dict(excelPath, cache : DiskCache = excelCache) -> PurificationData:
     """
-    read excel data into dict
-    ::input excel file path 
+    read excel data into PurificationData
+    ::input excel file path or bytes
+    the workbook bytes are hashed, when the cache already has the result of
+    the same bytes and PARSER_VERSION the excel is not parsed at all,
+    pass cache=None to always parse
     excel with three sheets
     -------------------------------------------------------------------------
     sheet1: protein each purification step infomation
@@ -45,47 +229,49 @@ def excel2Dict(excelPath : str):
     HPLC_ELN
     HPLC_Conclusion ]
     ------------------------------------------------------------------------
-    sheet2: SDS-PAGE table
-    sheet2 title:
+    sheet3: SDS-PAGE table
+    sheet3 title:
     [ Table
     Lane
     Protein name
     MW(kDa) ]
-    ::output proteinInfoDict,sdsTableDict
+    ::output PurificationData, see reportModel
     -------------------------------------------------------------------------
-    1. proteinInfoDict: 
-    {
-        'ProjectName': 'WBPXXX','Date': '04/13/2020','Purification': 
-        {
-            1:{
-            'ProteinName':,
-            'PurificationStepsType':,
-            1: {'PurificationStep': 'Protein A',
-            'Concentration':,
-            ...,
-            'HPLC_Conclusion':},
-            'Dialysis':{}
-            },
-            2:{},3:{},4:{}                                               }
-        }
-    }
+    1. data.steps: StepTable list, one for each PurificationStepNo
+        StepTable('1', 'Protein A & Ni'): 
+        [StepResult(Protein('1', 'WXXX-hPro1.His - P1'),
+                    ('0.32', '1.50', ..., 'Three steps')), ...]
     -------------------------------------------------------------------------
-    2. sdsTableDict: 
+    2. data.sdsTables: 
     {
-        'SupernatantDialysis': {'Lane': [],'Protein name': [],'MW(kDa)': []},
-        'SEC':                 {'Lane': [],'Protein name': [],'MW(kDa)': []},
-        'CEX':                 {'Lane': [],'Protein name': [],'MW(kDa)': []}
+        'SupernatantDialysis': SdsTable(lanes, proteinNames, mws),
+        'SEC':                 SdsTable(lanes, proteinNames, mws),
+        'CEX':                 SdsTable(lanes, proteinNames, mws)
     }
     --------------------------------------------------------------------------
     """
-    # -------------------read sheet1 to proteinInfoDict-----------------------
-    sheet1 = pd.read_excel(excelPath,keep_default_na=False,dtype=str)
-    for col in ['Concentration (mg/ml)','Volume (ml)','Amount (mg)',
-                'Yield (mg/L)','PI']:
-        for index in sheet1.index:
-            if sheet1[col][index] != '':
-                sheet1[col][index] = pd.to_numeric(sheet1[col][index])
-                sheet1[col][index] = ('%.2f')% (sheet1[col][index])
+    if isinstance(excelPath, (bytes, bytearray)):
+        content = bytes(excelPath)
+    else:
+        with open(excelPath, 'rb') as f:
+            content = f.read()
+    if cache is None:
+        data = parseWorkbook(content)
+    else:
+        data = cache.memoize(contentHash(content, PARSER_VERSION), lambda: parseWorkbook(content))
+    ## the default date is today's, it is filled in after the cache lookup
+    if data.date is None:
+        data.date = time.strftime("%m/%d/%Y", time.localtime())
+    return data
+
+def parseWorkbook(content : bytes) -> PurificationData:
+    """
+    parse the workbook bytes into PurificationData without cache,
+    see excel2Dict, the date is None when sheet1 has no rows
+    """
+    # -------------------read sheet1 to step tables-----------------------
+    sheet1, sheet2, sheet3 = readWorkbook(io.BytesIO(content))
+    values = normalizeNumeric(sheet1)
     
     ### coverPage
     if len(sheet1['ProjectName']) != 0:
@@ -93,109 +279,55 @@ def excel2Dict(excelPath : str):
         date = sheet1['Date'][0]
     else:
         projectName = 'project'
-        date = time.strftime("%m/%d/%Y", time.localtime())
+        date = None
     
-    ### finalPage
-    finalDict = defaultdict(dict)
-    if len(sheet1['PurificationStepNo']) != 0:
-        df1 = sheet1.iloc[:,2:]
-        df_group = df1[['PurificationStepNo','ProteinName']].groupby(by='ProteinName',as_index=False).max()
-        df_merge = pd.merge(df_group,df1,on=['PurificationStepNo','ProteinName'],how='left')
-        df_merge = df_merge.sort_values(by='ProteinNo')
-        for index in df_merge.index:
-            proteinName = df_merge['ProteinName'][index]
-            finalDict[proteinName]['No'] = str(df_merge['ProteinNo'][index])
-            for col in df_merge.columns.tolist()[4:]:
-                colName = col.split("(")[0].strip()
-                finalDict[proteinName][colName] = str(df_merge[col][index])
-        
-    ### processPage
-    processList = []
-    if len(sheet1['ProteinNo']) != 0:
-        processDict = defaultdict(list)
-        for i in df1['ProteinNo'].drop_duplicates():
-            a = list(df1[['ProteinNo','PurificationStep']][df1['ProteinNo'] == i]['PurificationStep'])
-            PurificationStepOnly =  [a[0]]+[a[i] for i in range(1,len(a)) if a[i] != a[i-1]]
-            process = '_'.join(PurificationStepOnly)
-            processDict[process].append(i)
-        for key,value in processDict.items():
-            oneProcessList = []
-            oneProcessList.append('Protein # '+ ', '.join(value))
-            oneProcessList.extend(key.split('_'))
-            oneProcessList.append('Filtration & Storage')
-            processList.append(oneProcessList) 
-
-    ### stepPage
-    stepsDict = defaultdict(dict)
-    if len(sheet1['PurificationStepNo']) != 0:
-        for i in df1['PurificationStepNo'].drop_duplicates():
-            tempDf = df1[df1['PurificationStepNo'] == i]
-            step = ' & '.join(tempDf['PurificationStep'].drop_duplicates())
-            stepsDict[i]['PurificationStep'] = step
-            for index in tempDf.index:
-                proteinName = tempDf['ProteinName'][index]
-                stepsDict[i][proteinName] = {}
-                stepsDict[i][proteinName]['No'] = str(tempDf['ProteinNo'][index])
-                for col in tempDf.columns.tolist()[4:]:
-                    colName = col.split("(")[0].strip()
-                    stepsDict[i][proteinName][colName] = str(tempDf[col][index])
+    ### finalPage, processPage and stepPage
+    df1 = sheet1.iloc[:,2:]
+    final,processList,steps = groupSteps(df1, values)
 
     ### sdsPage
     if len(sheet1['Supernatant (mL)']) != 0:
         supernatant = str(df1['Supernatant (mL)'][0])
     else:
         supernatant = '0'
-    sdsList = []
-    sdsTableDict = defaultdict(dict)
-    sheet2 = pd.read_excel(excelPath,sheet_name=1,keep_default_na=False,dtype=str)
-    sheet3 = pd.read_excel(excelPath,sheet_name=2,keep_default_na=False,dtype=str)
-    for index in sheet2.index:
-        sdsStepList = []
-        for col in sheet2.columns.tolist()[1:6]:
-            sdsStepList.append(sheet2[col][index])
-        sdsList.append(sdsStepList)
-    for index in sheet3.index:
-        for col in sheet3.columns[1:]:
-            if col not in sdsTableDict[sheet3['Table'][index]].keys():
-                sdsTableDict[sheet3['Table'][index]][col] = [sheet3[col][index]]
-            else:  
-                sdsTableDict[sheet3['Table'][index]][col].append(sheet3[col][index]) 
+    sheet2Cols = [sheet2[col].tolist() for col in sheet2.columns]
+    sdsRuns = [SdsRun(*row) for row in zip(*sheet2Cols[1:6])]
+    sdsTables = {}
+    sheet3Cols = {col: sheet3[col].tolist() for col in sheet3.columns}
+    for row, tableName in enumerate(sheet3Cols.get('Table', [])):
+        sdsTable = sdsTables.get(tableName)
+        if sdsTable is None:
+            sdsTable = sdsTables[tableName] = SdsTable(tableName)
+        for column, header in zip(sdsTable.columns(), SdsTable.headers):
+            column.append(sheet3Cols[header][row] if header in sheet3Cols else '')
     
-    ### hplcPage                
-    hplcList = []
-    proDict = defaultdict(dict)
-    for index in sheet2.index:
-        hplcStepList = []
-        for col in sheet2.columns.tolist()[0:2] + sheet2.columns.tolist()[6:]:
-            hplcStepList.append(sheet2[col][index])
-        hplcList.append(hplcStepList)  
-    if len(sheet1['PurificationStepNo']) != 0:
-        df1 = sheet1.iloc[:,2:]                     
-        for i in df1['PurificationStepNo'].drop_duplicates():
-            tempDf = df1[df1['PurificationStepNo'] == i]
-            step = ' & '.join(tempDf['PurificationStep'].drop_duplicates())
-            step = '_'.join((i, step.replace(' ','_')))
-            proDict[step] = {}
-            for index in tempDf.index:
-                proteinName = tempDf['ProteinName'][index]
-                proDict[step][proteinName] = [str(tempDf['ProteinNo'][index])]
-                proDict[step][proteinName].append(tempDf['Purity by SEC-HPLC (%)'][index])
-
-    return (projectName,
-            date),finalDict,processList,stepsDict,(supernatant,
-                sdsList,sdsTableDict),hplcList,proDict
+    ### hplcPage
+    purityIndex = RESULT_FIELDS.index('Purity by SEC-HPLC')
+    purityDict = {}
+    for stepTable in steps:
+        purityDict['_'.join((stepTable.no, stepTable.name.replace(' ','_')))] = \
+            {result.protein.name: (result.protein.no, result.values[purityIndex])
+             for result in stepTable}
+    hplcRuns = []
+    for row in zip(*(sheet2Cols[0:2] + sheet2Cols[6:9])):
+        hplcRun = HplcRun(*row)
+        hplcRun.purity = purityDict.get(hplcRun.key(), {})
+        hplcRuns.append(hplcRun)
+
+    return PurificationData(projectName, date, supernatant, final, processList,
+                            steps, sdsRuns, sdsTables, hplcRuns)
 
 if __name__ == '__main__':
     excelPath = 'D:\\2.PS work\\2020\\3.auto report\\example\\Demo2\\demo2.xlsx'
-    (projectName,date),finalDict,processList,stepsDict,(supernatant,sdsList,
-    sdsTableDict),hplcList,proDict = excel2Dict(excelPath)
-    print(projectName)
-    print(date)
-    print(finalDict)
-    print(processList)
-    print(stepsDict)
-    print(supernatant)
-    print(sdsList)
-    print(sdsTableDict)
-    print(hplcList)
-    print(proDict)
\ No newline at end of file
+    data = excel2Dict(excelPath)
+    print(data.projectName)
+    print(data.date)
+    print(data.final.results)
+    print(data.process)
+    for stepTable in data.steps:
+        print(stepTable.no, stepTable.name, stepTable.results)
+    print(data.supernatant)
+    for sdsRun in data.sdsRuns:
+        print(sdsRun.step, sdsRun.picture, sdsRun.tableName)
+    for hplcRun in data.hplcRuns:
+        print(hplcRun.key(), hplcRun.file, hplcRun.purity)
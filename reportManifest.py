@@ -0,0 +1,228 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 23:31:20 2026
+@author: tao_jingfen
+"""
+import os
+import io
+import json
+import glob
+import threading
+from lxml import etree
+from pptx import Presentation
+from pptx.oxml import parse_xml
+from pptx.oxml.ns import qn
+from pptx.opc.constants import CONTENT_TYPE as CT, RELATIONSHIP_TYPE as RT
+from pptx.parts.slide import SlidePart
+
+from diskCache import DiskCache, contentHash
+from templateCache import slideLayout
+from slideImage import mediaRegistry
+
+filePath = os.path.abspath(os.path.dirname(__file__))
+
+## the modules and the pictures and template the pages are drawn with,
+## e.g. the marker.jpg and arrow.png of the step flow diagram
+VERSION_PATTERNS = ('*.py', '*.jpg', '*.png', '*.pptx')
+
+def _reportVersion() -> str:
+    """
+    the hash of every module and asset of autoReport, a changed page maker
+    or picture changes every fingerprint so no slide of an older version is
+    reused
+    """
+    contents = []
+    paths = [path for pattern in VERSION_PATTERNS
+             for path in glob.glob(os.path.join(filePath, pattern))]
+    for path in sorted(paths):
+        with open(path, 'rb') as f:
+            contents.append(contentHash(f.read(), os.path.basename(path)))
+    return contentHash('\n'.join(contents).encode('utf-8'))
+
+REPORT_VERSION = _reportVersion()
+## the slide groups of every saved report keyed by the hash of its bytes
+manifestCache = DiskCache('manifest', maxBytes=16 * 1024 * 1024)
+
+_fileHashes = {}
+_lock = threading.Lock()
+
+def fileHash(path: str) -> str:
+    """
+    the content hash of a referenced file, hashed again only when its
+    modification time or size changed, '' for a missing file
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return ''
+    key = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+    with _lock:
+        digest = _fileHashes.get(key)
+    if digest is None:
+        with open(path, 'rb') as f:
+            digest = contentHash(f.read())
+        with _lock:
+            _fileHashes[key] = digest
+    return digest
+
+def fingerprint(kind: str, inputs, *salt: str) -> str:
+    """
+    the fingerprint of the inputs of one slide group
+
+    --Args:
+        kind: the kind of the group, e.g. 'hplc'
+        inputs: the json serializable texts the slides are built from,
+        including the hashes of the referenced files
+        salt: what every group depends on, e.g. the template hash
+    """
+    content = json.dumps([kind, inputs], ensure_ascii=False, default=str)
+    return contentHash(content.encode('utf-8'), REPORT_VERSION, *salt)
+
+class ReportGroup(object):
+    """
+    the slides of a report that are built from their own inputs, e.g. the
+    cover or the pages of one HPLC run
+
+    --Attributes:
+        name: the group name, e.g. 'hplc 2'
+        fingerprint: the fingerprint of everything the slides depend on
+        build: build(prs, assets) adds the slides of the group
+        hplcRuns, sdsRuns: the runs whose files the group reads, only the
+        groups that are built have their files prefetched
+    """
+    __slots__ = ('name', 'fingerprint', 'build', 'hplcRuns', 'sdsRuns')
+
+    def __init__(self, name: str, fingerprint: str, build, hplcRuns: list = (),
+                 sdsRuns: list = ()):
+        self.name = name
+        self.fingerprint = fingerprint
+        self.build = build
+        self.hplcRuns = list(hplcRuns)
+        self.sdsRuns = list(sdsRuns)
+
+    def __repr__(self):
+        return 'ReportGroup(%r, %r)' % (self.name, self.fingerprint)
+
+class ReportManifest(object):
+    """
+    the [name, fingerprint, slide count] of every group of a saved report,
+    stored in a DiskCache under the content hash of the report, a report
+    changed or saved by anyone else has no manifest and is not reused
+
+    --Args:
+        cache: the DiskCache of the manifests
+    """
+    def __init__(self, cache: DiskCache = manifestCache):
+        self.cache = cache
+
+    def load(self, deck: bytes):
+        """
+        the group list of the report bytes, None if it was not saved with one
+        """
+        value = self.cache.get(contentHash(deck, REPORT_VERSION))
+        if value is None:
+            return None
+        try:
+            return [(name, fingerprint, int(slideCount))
+                    for name, fingerprint, slideCount in json.loads(value.decode('utf-8'))]
+        except (ValueError, TypeError):
+            return None
+
+    def save(self, deck: bytes, groups: list):
+        """
+        store the [(name, fingerprint, slide count), ...] of the report bytes
+        """
+        value = json.dumps([list(group) for group in groups], ensure_ascii=False)
+        self.cache.put(contentHash(deck, REPORT_VERSION), value.encode('utf-8'))
+
+reportManifest = ReportManifest()
+
+## the relationship attributes of the slide xml, e.g. r:embed of a picture
+_R_NAMESPACE = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}'
+
+class SlideSplicer(object):
+    """
+    copy the slides of the unchanged groups from the previous report
+
+    a group is copied when the previous report has a group of the same
+    fingerprint, wherever it was, its slides only relate to their layout and
+    their pictures, the slide xml is copied as it is, the pictures are added
+    through the MediaRegistry and the slide number is left to the numbering
+
+    --Args:
+        deck: the bytes of the previous report
+        groups: its manifest, see ReportManifest.load
+    """
+    def __init__(self, deck: bytes, groups: list):
+        self.deck = deck
+        self._slides = {}
+        start = 0
+        for _, fingerprint, slideCount in groups:
+            self._slides.setdefault(fingerprint, (start, start + slideCount))
+            start += slideCount
+        self._prs = None
+        self._layouts = None
+        self._plain = {}
+
+    def _previous(self):
+        if self._prs is None:
+            self._prs = Presentation(io.BytesIO(self.deck))
+            self._layouts = [layout.part for layout in self._prs.slide_layouts]
+        return self._prs
+
+    def has(self, fingerprint: str) -> bool:
+        """
+        whether the group of fingerprint can be copied from the previous report
+        """
+        if fingerprint not in self._slides:
+            return False
+        plain = self._plain.get(fingerprint)
+        if plain is None:
+            start, stop = self._slides[fingerprint]
+            slides = self._previous().slides
+            plain = self._plain[fingerprint] = stop <= len(slides) and all(
+                not rel.is_external and rel.reltype in (RT.SLIDE_LAYOUT, RT.IMAGE)
+                for n in range(start, stop) for rel in slides[n].part.rels.values())
+        return plain
+
+    def splice(self, prs, fingerprint: str) -> int:
+        """
+        append the slides of the group of fingerprint to prs
+
+        --Returns:
+            slideCount: the number of slides copied
+        """
+        start, stop = self._slides[fingerprint]
+        slides = self._previous().slides
+        for n in range(start, stop):
+            self._copySlide(prs, slides[n])
+        return stop - start
+
+    def _copySlide(self, prs, slide):
+        presentationPart = prs.part
+        registry = mediaRegistry(presentationPart.package)
+        oldPart = slide.part
+        ## the new parts in the order python-pptx relates them, rId1 first
+        partIds, relTypes, rIds = {}, {}, {}
+        for rId, rel in sorted(oldPart.rels.items(), key=lambda item: int(item[0][3:])):
+            if rel.reltype == RT.SLIDE_LAYOUT:
+                part = slideLayout(prs, self._layouts.index(rel.target_part)).part
+            else:
+                part = registry.imagePart(rel.target_part.blob)
+            rIds[rId] = partIds.setdefault(part, 'rId%d' % (len(partIds) + 1))
+            relTypes[part] = rel.reltype
+        sld = parse_xml(etree.tostring(slide._element))
+        for element in sld.iter():
+            for name, value in element.attrib.items():
+                if name.startswith(_R_NAMESPACE) and value in rIds:
+                    element.set(name, rIds[value])
+        ## the slide number is added again by the numbering of the new report
+        for ph in list(sld.iter(qn('p:ph'))):
+            if ph.get('type') == 'sldNum':
+                sp = ph.getparent().getparent().getparent()
+                sp.getparent().remove(sp)
+        slidePart = SlidePart(presentationPart._next_slide_partname, CT.PML_SLIDE,
+                              presentationPart.package, sld)
+        for part in partIds:
+            slidePart.relate_to(part, relTypes[part])
+        prs.slides._sldIdLst.add_sldId(presentationPart.relate_to(slidePart, RT.SLIDE))
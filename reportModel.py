@@ -0,0 +1,203 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 10:12:40 2026
+@author: tao_jingfen
+"""
+from array import array
+
+RESULT_FIELDS = ('Concentration','Volume','Amount','Yield','Buffer',
+                 'Purity by SEC-HPLC','Recovery','Supernatant','MW','PI',
+                 'Comments')
+NUMERIC_FIELDS = ('Concentration','Volume','Amount','Yield','PI')
+
+class Protein(object):
+    """
+    one protein of the project, e.g. Protein('1', 'WXXX-hPro1.His - P1')
+    """
+    __slots__ = ('no', 'name')
+
+    def __init__(self, no: str, name: str):
+        self.no = no
+        self.name = name
+
+    def __repr__(self):
+        return 'Protein(%r, %r)' % (self.no, self.name)
+
+class StepResult(object):
+    """
+    the purification result of one protein in one step
+    values is a str tuple in the order of the fields of its StepTable
+    """
+    __slots__ = ('protein', 'values')
+
+    def __init__(self, protein: Protein, values: tuple):
+        self.protein = protein
+        self.values = values
+
+    def __repr__(self):
+        return 'StepResult(%r, %r)' % (self.protein, self.values)
+
+class StepTable(object):
+    """
+    columnar container of every protein result of one purification step
+
+    --Attributes:
+        no: the number of the step, e.g. '1'
+        name: the step name, e.g. 'Protein A & Ni'
+        fields: the field names of StepResult.values, e.g. RESULT_FIELDS
+        results: StepResult list in the order of the excel rows
+        numbers: {numeric field: array('d')} float copy of the numeric
+        columns, blank cells are nan
+    """
+    __slots__ = ('no', 'name', 'fields', 'results', 'numbers', '_index')
+
+    def __init__(self, no: str, name: str, fields: tuple = RESULT_FIELDS):
+        self.no = no
+        self.name = name
+        self.fields = fields
+        self.results = []
+        self.numbers = {field: array('d') for field in NUMERIC_FIELDS}
+        self._index = {field: i for i, field in enumerate(fields)}
+
+    def __len__(self):
+        return len(self.results)
+
+    def __iter__(self):
+        return iter(self.results)
+
+    def append(self, result: StepResult, numbers: tuple = ()):
+        """
+        append one result, numbers is the float tuple in NUMERIC_FIELDS order
+        """
+        self.results.append(result)
+        for column, number in zip(self.numbers.values(),
+                                  numbers or (float('nan'),)*len(self.numbers)):
+            column.append(number)
+
+    def fieldIndex(self, field: str):
+        """
+        return the index of field in StepResult.values, None if not exist
+        """
+        return self._index.get(field)
+
+    def isAffinity(self) -> bool:
+        """
+        Protein A and Ni steps use the 11 columns step table
+        """
+        return 'Protein A' in self.name or 'Ni' in self.name
+
+    @classmethod
+    def fromDict(cls, no: str, stepDict: dict, name: str = ''):
+        """
+        build StepTable from the old dict form
+        {'PurificationStep': step, proteinName: {'No':, field: , ...}, ...}
+        """
+        table = cls(no, stepDict.get('PurificationStep', name))
+        for proteinName, info in stepDict.items():
+            if proteinName == 'PurificationStep':
+                continue
+            protein = Protein(str(info.get('No','')), proteinName)
+            table.append(StepResult(protein, tuple(str(info.get(field,''))
+                                                   for field in table.fields)))
+        return table
+
+class SdsTable(object):
+    """
+    columnar SDS-PAGE lane table, three equal length str lists
+    """
+    __slots__ = ('name', 'lanes', 'proteinNames', 'mws')
+    headers = ('Lane', 'Protein name', 'MW(kDa)')
+
+    def __init__(self, name: str):
+        self.name = name
+        self.lanes = []
+        self.proteinNames = []
+        self.mws = []
+
+    def __len__(self):
+        return len(self.lanes)
+
+    def columns(self) -> tuple:
+        """
+        return the columns in the order of SdsTable.headers
+        """
+        return (self.lanes, self.proteinNames, self.mws)
+
+    @classmethod
+    def fromDict(cls, name: str, tableDict: dict):
+        """
+        build SdsTable from {'Lane': [], 'Protein name': [], 'MW(kDa)': []}
+        """
+        table = cls(name)
+        for column, header in zip(table.columns(), cls.headers):
+            column.extend(tableDict.get(header, []))
+        return table
+
+class SdsRun(object):
+    """
+    the SDS-PAGE info of one purification step
+    """
+    __slots__ = ('step', 'picture', 'tableName', 'eln', 'conclusion')
+
+    def __init__(self, step: str, picture: str, tableName: str, eln: str,
+                 conclusion: str):
+        self.step = step
+        self.picture = picture
+        self.tableName = tableName
+        self.eln = eln
+        self.conclusion = conclusion
+
+    def hasPicture(self) -> bool:
+        return self.picture not in ('-', '')
+
+class HplcRun(object):
+    """
+    the SEC-HPLC info of one purification step
+    purity is {proteinName: (proteinNo, purity)} of the proteins in this step
+    """
+    __slots__ = ('stepNo', 'step', 'file', 'eln', 'conclusion', 'purity')
+
+    def __init__(self, stepNo: str, step: str, file: str, eln: str,
+                 conclusion: str, purity: dict = None):
+        self.stepNo = stepNo
+        self.step = step
+        self.file = file
+        self.eln = eln
+        self.conclusion = conclusion
+        self.purity = {} if purity is None else purity
+
+    def key(self) -> str:
+        """
+        the step key used to match the step of sheet1, e.g. '1_Protein_A'
+        """
+        return '_'.join((self.stepNo, self.step.replace(' ','_')))
+
+class PurificationData(object):
+    """
+    everything read from the purification excel
+
+    --Attributes:
+        projectName, date: the cover page info
+        supernatant: the supernatant volume(ml), e.g. '40'
+        final: StepTable of the last step of every protein
+        process: every protein process list,
+        e.g. [['Protein # 1, 3', 'Protein A', 'SEC', 'Filtration & Storage']]
+        steps: StepTable list in step order
+        sdsRuns: SdsRun list, one for each row of sheet2
+        sdsTables: {tableName: SdsTable}
+        hplcRuns: HplcRun list, one for each row of sheet2
+    """
+    __slots__ = ('projectName', 'date', 'supernatant', 'final', 'process',
+                 'steps', 'sdsRuns', 'sdsTables', 'hplcRuns')
+
+    def __init__(self, projectName, date, supernatant, final, process, steps,
+                 sdsRuns, sdsTables, hplcRuns):
+        self.projectName = projectName
+        self.date = date
+        self.supernatant = supernatant
+        self.final = final
+        self.process = process
+        self.steps = steps
+        self.sdsRuns = sdsRuns
+        self.sdsTables = sdsTables
+        self.hplcRuns = hplcRuns
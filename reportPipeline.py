@@ -0,0 +1,270 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 15:20:31 2026
+@author: tao_jingfen
+"""
+import os
+import io
+import contextlib
+from pptx import Presentation
+
+from reportModel import PurificationData
+from templateCache import templateCache
+from assetPrefetch import AssetPrefetch
+from slideImage import IMAGE_DPI, JPEG_QUALITY
+from slideSkeleton import setRenderBackend
+from reportProfile import RunProfile, stage, count
+from reportTask import ReportProgress, reportProgress
+from reportManifest import ReportGroup, SlideSplicer, reportManifest, fileHash, fingerprint
+from tableSchema import SDS_SCHEMA
+from readExcel import excel2Dict
+from coverPage import purificationCoverPageMake
+from finalPage import purificationFinalPageMake
+from processPage import purificationProcessPageMake
+from stepPage import purificationStepPageMake
+from sdsPage import purificationSdsPageMake, sdsFlows
+from hplcPage import purificationHplcPageMake
+
+filePath = os.path.abspath(os.path.dirname(__file__))
+TEMPLATE_PATH = os.path.join(filePath,'purificationTemplate.pptx')
+
+def reportFileName(projectName: str, date: str) -> str:
+    """
+    the report file name, e.g. '20200413 WBPXXX Purification report.pptx'
+    """
+    return ''.join([date.split('/')[-1]]+date.split('/')[0:2]) + ' ' + \
+        projectName + ' Purification report.pptx'
+
+def reportGroups(data: PurificationData, assetRoot: str, templatePath: str = TEMPLATE_PATH,
+                 imageDpi: int = IMAGE_DPI, jpegQuality: int = JPEG_QUALITY) -> list:
+    """
+    the slide groups of the report in slide order, the cover, final, process
+    and step pages and the pages of every SDS-PAGE and SEC-HPLC run, every
+    group with the fingerprint of the excel rows and files it is built from
+
+    the step tables share their slides, so all step pages are one group
+
+    --Returns:
+        groups: ReportGroup list, see reportManifest
+    """
+    salt = (fileHash(templatePath), str(imageDpi), str(jpegQuality))
+    groups = [
+        ReportGroup('cover', fingerprint('cover', [data.projectName, data.date], *salt),
+                    lambda prs, assets: purificationCoverPageMake(prs, data.projectName, data.date)),
+        ReportGroup('final', fingerprint('final', _stepInputs(data.final), *salt),
+                    lambda prs, assets: purificationFinalPageMake(prs, data.final)),
+        ReportGroup('process', fingerprint('process', data.process, *salt),
+                    lambda prs, assets: purificationProcessPageMake(prs, data.process)),
+        ReportGroup('steps', fingerprint('steps', [_stepInputs(step) for step in data.steps], *salt),
+                    lambda prs, assets: purificationStepPageMake(prs, data.steps))]
+    for n, (textList, sdsRun, sdsTable) in enumerate(
+            sdsFlows(data.supernatant, data.sdsRuns, data.sdsTables)):
+        inputs = [textList, sdsRun.step, sdsRun.picture, fileHash(os.path.join(assetRoot, sdsRun.picture)),
+                  sdsRun.eln, sdsRun.conclusion, SDS_SCHEMA.laneRows(sdsTable)]
+        build = lambda prs, assets, n=n: purificationSdsPageMake(
+            prs, data.supernatant, data.sdsRuns, data.sdsTables, assetRoot, assets, [n])
+        groups.append(ReportGroup('sds %d' % (n + 1), fingerprint('sds', inputs, *salt), build,
+                                  sdsRuns=[sdsRun]))
+    for n, hplcRun in enumerate(data.hplcRuns):
+        hplcFile = hplcRun.file
+        inputs = [hplcRun.step, hplcFile,
+                  fileHash(os.path.join(assetRoot, hplcFile)) if hplcFile.strip() != '' else '',
+                  hplcRun.eln, hplcRun.conclusion, sorted(hplcRun.purity.items())]
+        build = lambda prs, assets, hplcRun=hplcRun: purificationHplcPageMake(
+            prs, [hplcRun], assetRoot, assets)
+        groups.append(ReportGroup('hplc %d' % (n + 1), fingerprint('hplc', inputs, *salt), build,
+                                  hplcRuns=[hplcRun]))
+    return groups
+
+def _stepInputs(stepTable) -> list:
+    return [stepTable.no, stepTable.name, list(stepTable.fields),
+            [[result.protein.no, result.protein.name, list(result.values)] for result in stepTable]]
+
+def purificationPresentation(data: PurificationData, assetRoot: str,
+                             templatePath: str = TEMPLATE_PATH,
+                             prefetchJobs: int = None, imageDpi: int = IMAGE_DPI,
+                             jpegQuality: int = JPEG_QUALITY,
+                             renderBackend: str = 'xml', previous=None,
+                             progress=None) -> Presentation:
+    """
+    Build the purification report presentation of the parsed excel data
+
+    --Args:
+        data: PurificationData from excel2Dict
+        assetRoot: the folder that SDS pictures and HPLC files are relative to
+        templatePath: the purification template pptx path, parsed once and
+        copied for every report by templateCache
+        prefetchJobs: the number of processes that extract the HPLC files and
+        load the SDS pictures while the table pages are built, 0 to load them
+        in this process, one per file up to the spare cpus by default
+        imageDpi: the SDS and HPLC pictures are resampled to their size on the
+        slide at imageDpi pixels per inch, None to embed them unchanged
+        jpegQuality: the quality of recompressed jpeg pictures
+        renderBackend: 'xml' fills the slides into xml skeletons recorded once
+        for each kind of slide, 'pptx' builds every shape through python-pptx,
+        both give the same slides, see slideSkeleton
+        previous: the path or bytes of the report of an earlier run, the slide
+        groups whose inputs did not change are copied from it instead of being
+        built and their HPLC files are not extracted, a report saved without
+        saveReport or changed since is not used
+        progress: ReportProgress or callback(label, done, total) that is
+        told when every slide group and the numbering starts, it may raise
+        ReportCancelled to stop, see reportTask
+    --Returns:
+        prs: presentation object could be used to save pptx, saveReport also
+        records its slide groups for the next run
+    """
+    finish = not isinstance(progress, ReportProgress)
+    progress = reportProgress(progress)
+    groups = reportGroups(data, assetRoot, templatePath, imageDpi, jpegQuality)
+    progress.expect(len(groups) + 1)
+    splicer = _splicer(previous)
+    reused = [splicer is not None and splicer.has(group.fingerprint) for group in groups]
+    built = [group for group, reuse in zip(groups, reused) if not reuse]
+    manifest = []
+    with AssetPrefetch(assetRoot, prefetchJobs, imageDpi, jpegQuality) as assets:
+        with stage('prefetch'):
+            assets.start([hplcRun for group in built for hplcRun in group.hplcRuns],
+                         [sdsRun for group in built for sdsRun in group.sdsRuns])
+        with stage('template'):
+            prs = templateCache.presentation(templatePath)
+        setRenderBackend(prs, renderBackend)
+        for group, reuse in zip(groups, reused):
+            progress.section(group.name)
+            slideNumber = len(prs.slides)
+            if reuse:
+                with stage('splice'):
+                    splicer.splice(prs, group.fingerprint)
+                count('groupsReused')
+            else:
+                prs = group.build(prs, assets)
+            manifest.append((group.name, group.fingerprint, len(prs.slides) - slideNumber))
+    prs._reportManifest = manifest
+    progress.section('numbering')
+    with stage('numbering'):
+        numPlaceholder = templateCache.numberPlaceholder(templatePath)
+        for num in range(1,len(prs.slides)):
+            slide = prs.slides[num]
+            slide.shapes.clone_placeholder(numPlaceholder)
+            slide.shapes[-1].text = str(num + 1)
+    if finish:
+        progress.finish()
+    return prs
+
+def _splicer(previous):
+    """
+    the SlideSplicer of the previous report, None without its manifest
+    """
+    if previous is None:
+        return None
+    if not isinstance(previous, bytes):
+        try:
+            with open(previous, 'rb') as f:
+                previous = f.read()
+        except OSError:
+            return None
+    groups = reportManifest.load(previous)
+    return None if groups is None else SlideSplicer(previous, groups)
+
+def saveReport(prs: Presentation, output=None):
+    """
+    Save the report and record its slide groups, so that the next run with
+    the report as previous only builds the groups whose inputs changed
+
+    --Args:
+        prs: the presentation from purificationPresentation
+        output: the pptx path or file-like object to save to, None to return bytes
+    --Returns:
+        the pptx bytes if output is None, otherwise output
+    """
+    stream = io.BytesIO()
+    prs.save(stream)
+    deck = stream.getvalue()
+    manifest = getattr(prs, '_reportManifest', None)
+    if manifest is not None:
+        reportManifest.save(deck, manifest)
+    if output is None:
+        return deck
+    if isinstance(output, (str, os.PathLike)):
+        with open(output, 'wb') as f:
+            f.write(deck)
+    else:
+        output.write(deck)
+    return output
+
+def buildPurificationReport(workbook, assetRoot: str, output=None,
+                            templatePath: str = TEMPLATE_PATH,
+                            profile: RunProfile = None, prefetchJobs: int = None,
+                            imageDpi: int = IMAGE_DPI, jpegQuality: int = JPEG_QUALITY,
+                            previous=None, progress=None):
+    """
+    Generate the purification report without touching the process cwd,
+    safe to call from threads or a server
+
+    --Args:
+        workbook: the purification excel path or bytes
+        assetRoot: the folder that SDS pictures and HPLC files are relative to
+        output: the pptx path or file-like object to save to, None to return bytes
+        templatePath: the purification template pptx path
+        profile: RunProfile to record the stage timing and memory into
+        prefetchJobs, imageDpi, jpegQuality, previous: see purificationPresentation
+        progress: callback(label, done, total) of the parse, every slide
+        group, the numbering and the save, see purificationPresentation
+    --Returns:
+        the pptx bytes if output is None, otherwise output
+    """
+    progress = ReportProgress(progress, 2)
+    with _activate(profile):
+        progress.section('parse')
+        with stage('parse'):
+            data = excel2Dict(workbook)
+        prs = purificationPresentation(data, assetRoot, templatePath, prefetchJobs,
+                                       imageDpi, jpegQuality, previous=previous,
+                                       progress=progress)
+        progress.section('save')
+        with stage('save'):
+            output = saveReport(prs, output)
+    progress.finish()
+    return output
+
+def purificationReport(excelPath: str, templatePath: str = TEMPLATE_PATH,
+                       profile: RunProfile = None, prefetchJobs: int = None,
+                       imageDpi: int = IMAGE_DPI, jpegQuality: int = JPEG_QUALITY,
+                       incremental: bool = True, progress=None) -> str:
+    """
+    Generate the purification report of one excel, the report is saved next to the excel
+
+    --Args:
+        excelPath: the purification excel path, pictures and HPLC files in it
+        are relative to the excel folder
+        templatePath: the purification template pptx path
+        profile: RunProfile to record the stage timing and memory into
+        prefetchJobs, imageDpi, jpegQuality: see purificationPresentation
+        incremental: only build the slide groups whose inputs changed since
+        the report was last saved here, False to build every slide
+        progress: callback(label, done, total), see buildPurificationReport
+    --Returns:
+        reportPath: the path of the saved report pptx
+    """
+    workdir = os.path.dirname(os.path.abspath(excelPath))
+    progress = ReportProgress(progress, 2)
+    with _activate(profile):
+        progress.section('parse')
+        with stage('parse'):
+            data = excel2Dict(excelPath)
+        reportPath = os.path.join(workdir, reportFileName(data.projectName, data.date))
+        prs = purificationPresentation(data, workdir, templatePath, prefetchJobs,
+                                       imageDpi, jpegQuality,
+                                       previous=reportPath if incremental else None,
+                                       progress=progress)
+        progress.section('save')
+        with stage('save'):
+            saveReport(prs, reportPath)
+    progress.finish()
+    return reportPath
+
+def _activate(profile: RunProfile = None):
+    """
+    activate profile for the run, nothing to do without one
+    """
+    return contextlib.nullcontext() if profile is None else profile.activate()
@@ -0,0 +1,224 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 17:08:26 2026
+@author: tao_jingfen
+
+Opt-in timing and memory instrumentation of the report pipeline, e.g.
+    profile = RunProfile('demo.xlsx', cprofile=True)
+    buildPurificationReport('demo.xlsx', 'D:\\demo', profile=profile)
+    profile.save('demo.profile.json', 'demo.prof')
+"""
+import json
+import time
+import threading
+import cProfile
+import functools
+import tracemalloc
+import contextlib
+import contextvars
+
+_activeProfile = contextvars.ContextVar('activeProfile', default=None)
+
+class _Frame(object):
+    __slots__ = ('record', 'wall', 'cpu', 'memory', 'peak')
+
+class _MemoryTracer(object):
+    """
+    the tracemalloc tracing shared by every profile of the process
+
+    tracemalloc is process wide, it is started by the first profile that
+    traces memory and stopped after the last one, the peak is folded into
+    every open stage of every thread before it is reset, so concurrent runs
+    do not lose each other's peaks, the figures are still those of the
+    whole process and include what a concurrent run allocates
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._users = 0
+        self._started = False
+        self._frames = set()
+
+    def acquire(self):
+        """
+        start tracing for one more profile
+        """
+        with self._lock:
+            if self._users == 0 and not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started = True
+            self._users += 1
+
+    def release(self):
+        """
+        stop tracing after the last profile, unless it was started by someone else
+        """
+        with self._lock:
+            self._users -= 1
+            if self._users == 0 and self._started:
+                tracemalloc.stop()
+                self._started = False
+
+    def _fold(self) -> int:
+        current, peak = tracemalloc.get_traced_memory()
+        for frame in self._frames:
+            frame.peak = max(frame.peak, peak)
+        tracemalloc.reset_peak()
+        return current
+
+    def enter(self, frame: _Frame):
+        """
+        start following the peak memory of a stage
+        """
+        with self._lock:
+            frame.memory = frame.peak = self._fold()
+            self._frames.add(frame)
+
+    def exit(self, frame: _Frame) -> int:
+        """
+        stop following a stage, frame.peak is its peak memory
+
+        --Returns:
+            current: the traced memory at the end of the stage
+        """
+        with self._lock:
+            current = self._fold()
+            self._frames.discard(frame)
+            return current
+
+_memoryTracer = _MemoryTracer()
+
+class RunProfile(object):
+    """
+    record wall time, cpu time and peak traced memory of every stage
+
+    a profile records the run of one thread, the cpu time is the time of
+    that thread, the traced memory is shared with every concurrent run of
+    the process, see _MemoryTracer
+
+    --Args:
+        name: the run name written to the report, e.g. the excel path
+        memory: trace memory with tracemalloc, it slows the run down
+        cprofile: also run cProfile over the whole run
+    """
+    def __init__(self, name: str = '', memory: bool = True, cprofile: bool = False):
+        self.name = name
+        self.memory = memory
+        self.records = []
+        self.counters = {}
+        self.profiler = cProfile.Profile() if cprofile else None
+        self._stack = []
+        self._tracing = False
+
+    @contextlib.contextmanager
+    def activate(self):
+        """
+        make this profile the active one, stage() and @timed record into it
+        """
+        token = _activeProfile.set(self)
+        self._tracing = self.memory
+        if self._tracing:
+            _memoryTracer.acquire()
+        if self.profiler is not None:
+            self.profiler.enable()
+        try:
+            with self.stage('total'):
+                yield self
+        finally:
+            if self.profiler is not None:
+                self.profiler.disable()
+            if self._tracing:
+                _memoryTracer.release()
+                self._tracing = False
+            _activeProfile.reset(token)
+
+    @contextlib.contextmanager
+    def stage(self, name: str):
+        """
+        record one stage, stages can be nested
+        """
+        frame = _Frame()
+        frame.record = {'name': name, 'depth': len(self._stack),
+                        'parent': self._stack[-1].record['name'] if self._stack else None}
+        tracing = self._tracing
+        if tracing:
+            _memoryTracer.enter(frame)
+        self._stack.append(frame)
+        self.records.append(frame.record)
+        frame.wall = time.perf_counter()
+        frame.cpu = time.thread_time()
+        try:
+            yield
+        finally:
+            record = frame.record
+            record['wall'] = time.perf_counter() - frame.wall
+            record['cpu'] = time.thread_time() - frame.cpu
+            self._stack.pop()
+            if tracing:
+                current = _memoryTracer.exit(frame)
+                record['peakMemory'] = frame.peak
+                record['peakMemoryDelta'] = frame.peak - frame.memory
+                record['memoryDelta'] = current - frame.memory
+
+    def count(self, name: str, value: int = 1):
+        """
+        add value to the counter name, e.g. the bytes saved by a stage
+        """
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def report(self) -> dict:
+        """
+        the machine readable run report, stages in start order,
+        a summary aggregated by stage name and the counters
+        """
+        summary = {}
+        for record in self.records:
+            item = summary.setdefault(record['name'], {'calls': 0, 'wall': 0.0, 'cpu': 0.0})
+            item['calls'] += 1
+            item['wall'] += record.get('wall', 0.0)
+            item['cpu'] += record.get('cpu', 0.0)
+            if 'peakMemory' in record:
+                item['peakMemory'] = max(item.get('peakMemory', 0), record['peakMemory'])
+        return {'name': self.name, 'stages': self.records, 'summary': summary,
+                'counters': self.counters}
+
+    def save(self, jsonPath: str, cprofilePath: str = None):
+        """
+        write the run report to jsonPath and the cProfile stats to cprofilePath
+        """
+        with open(jsonPath, 'w', encoding='utf-8') as f:
+            json.dump(self.report(), f, indent=2, ensure_ascii=False)
+        if cprofilePath and self.profiler is not None:
+            self.profiler.dump_stats(cprofilePath)
+
+def stage(name: str):
+    """
+    record a stage into the active profile, do nothing without one
+    """
+    profile = _activeProfile.get()
+    if profile is None:
+        return contextlib.nullcontext()
+    return profile.stage(name)
+
+def count(name: str, value: int = 1):
+    """
+    add value to a counter of the active profile, do nothing without one
+    """
+    profile = _activeProfile.get()
+    if profile is not None:
+        profile.count(name, value)
+
+def timed(name: str = None):
+    """
+    decorator that records every call of the function as a stage
+    """
+    def decorator(func):
+        stageName = name or func.__name__
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            profile = _activeProfile.get()
+            if profile is None:
+                return func(*args, **kwargs)
+            with profile.stage(stageName):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
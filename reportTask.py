@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 22:41:05 2026
+@author: tao_jingfen
+
+Progress and cancel of one report run, e.g.
+    def callback(label, done, total):
+        print(label, done, total)
+    buildPurificationReport('demo.xlsx', 'D:\\demo', progress=callback)
+"""
+
+class ReportCancelled(Exception):
+    """
+    raised from a progress callback to stop the report between two sections
+    """
+
+class ReportProgress(object):
+    """
+    the sections of one report run reported to callback(label, done, total),
+    e.g. 'parse', 'cover', ..., 'hplc 2', 'numbering', 'save'
+
+    the callback is called when a section starts, with the number of
+    sections done so far and the number known so far, and once more with
+    'finished' at the end, it runs in the thread of the report and may raise
+    ReportCancelled to stop the run before a section, the report is already
+    saved when 'finished' is called, so it can no longer be cancelled then
+
+    --Args:
+        callback: the progress callback, None to report nothing
+        total: the number of sections known from the start
+    """
+    def __init__(self, callback=None, total: int = 0):
+        self.callback = callback
+        self.done = 0
+        self.total = total
+        self._started = False
+
+    def expect(self, sections: int):
+        """
+        add sections that are only known during the run, e.g. the HPLC runs
+        """
+        self.total += sections
+
+    def section(self, label: str):
+        """
+        the section label starts, the section before it is done
+        """
+        if self._started:
+            self.done += 1
+        self._started = True
+        if self.callback is not None:
+            self.callback(label, self.done, self.total)
+
+    def finish(self):
+        """
+        every section is done, a ReportCancelled of the callback is ignored
+        """
+        if self._started:
+            self.done += 1
+            self._started = False
+        if self.callback is not None:
+            try:
+                self.callback('finished', self.done, self.total)
+            except ReportCancelled:
+                pass
+
+def reportProgress(progress) -> ReportProgress:
+    """
+    progress as a ReportProgress, a callable or None is wrapped
+    """
+    return progress if isinstance(progress, ReportProgress) else ReportProgress(progress)
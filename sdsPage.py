@@ -7,187 +7,214 @@
 '''
 from pptx import Presentation
 import os
-import math
+import functools
 from pptx.util import Cm
 from pptx.util import Pt
 from pptx.enum.shapes import MSO_SHAPE
 from pptx.dml.color import RGBColor
-from pptx.enum.text import PP_ALIGN
 from pptx.enum.shapes import MSO_CONNECTOR
 
+from reportModel import SdsRun, SdsTable
+from templateCache import slideLayout, pageBottom
+from slideImage import addPicture
+from slideSkeleton import addSkeletonSlide
+from flowDiagram import flowDiagram
+from tableXml import writeTable, tableFrames, setRowHeights
+from pageLayout import rowHeight, paginate
+from tableSchema import SDS_SCHEMA
+from reportProfile import timed
+
 filePath = os.path.abspath(os.path.dirname(__file__))
+## the size of the gel picture on the slide
+GEL_PICTURE_SIZE = (Cm(9), Cm(5.82))
+SDS_HEADER_HEIGHT, SDS_ROW_HEIGHT = Cm(1.13), Cm(0.71)
+## the gel has 12 lanes besides the marker, the table of one page holds the
+## header, at most 12 lane rows and the marker row down to the bottom of the
+## slide number, see pageBottom
+SDS_LANES = 12
+SDS_TABLE_TOP = Cm(6.6)
+
+@functools.lru_cache(maxsize=None)
+def _asset(name: str) -> bytes:
+    """
+    the bytes of a picture shipped with autoReport, read once per process
+    """
+    with open(os.path.join(filePath, name), 'rb') as f:
+        return f.read()
 
-def purificationSdsPageMake(prs: str, supernatant: str,sdsList: list, sdsTableDict: dict) -> str:
+@timed()
+def purificationSdsPageMake(prs: str, supernatant: str, sdsRuns: list, sdsTables: dict, assetRoot: str = '', assets=None,
+                            flows: list = None) -> str:
     """
     Create protein SDS-PAGE page of purification auto-report PPT
     
     --Args:
         prs: presentation object loaded from *pptx* by template pptx
         supernatant: the supernatant volume(ml), e.g. "40"
-        sdsList: the list of every SDS-PAGE step info,
-        [stepName, SDSpictureName, SDSTableKeyName,SDSelnInfo,SDSConclusionInfo]
+        sdsRuns: SdsRun list of every SDS-PAGE step, see reportModel
+        SdsRun(step, picture, tableName, eln, conclusion)
         e.g. [
-            ['Protein A', 'SupernatantDialysis_SDS-PAGE.png', 'SupernatantDialysis','SDS_ELN','SDS_Conclusion'],
-            ['Dialysis', 'SEC_SDS-PAGE.png', 'SEC','SDS_ELN','SDS_Conclusion']
+            SdsRun('Protein A', 'SupernatantDialysis_SDS-PAGE.png', 'SupernatantDialysis','SDS_ELN','SDS_Conclusion'),
+            SdsRun('Dialysis', 'SEC_SDS-PAGE.png', 'SEC','SDS_ELN','SDS_Conclusion')
             ...
             ]
-        sdsTableDict:  the dict of SDS table info,
+        sdsTables:  {tableName: SdsTable} of SDS table info,
         e.g.
         {
-        'SupernatantDialysis': {
-            'Lane': ['S1', 'S2','1','2'],
-            'Protein name': ['WXXX-T6U9.E17-1.uIgG1 (supernatant)',
+        'SupernatantDialysis': SdsTable with
+            lanes: ['S1', 'S2','1','2'],
+            proteinNames: ['WXXX-T6U9.E17-1.uIgG1 (supernatant)',
                'WXXX-U9T6.E17-1.uIgG1 (supernatant)',
                'WXXX-T6U9.E17R-1.uIgG1',
                'WXXX-U9T6.E17R-1.uIgG1'],
-            'MW(kDa)': ['147',
+            mws: ['147',
                '148',
                '22+53+50+23',
-               '22+53+49+23']},
-        'SEC': {
-            'Lane': ['1', '2', '3'],
-            'Protein name': ['WXXX-T6U9.E17-1.uIgG1',
-               'WXXX-U9T6.E17-1.uIgG1',
-               'WXXX-T6U9.E17R-1.uIgG1'],
-            'MW(kDa)': ['147',
-               '148',
-               '148']},
-        'CEX': {
-            'Lane': ['1', '2'],
-            'Protein name': ['WXXX-T6U9.E17-1.uIgG1','WXXX-T6U9.E17R-1.uIgG1],
-            'MW(kDa)': ['147', '148', '22+53+49+23', '22+53+50+23']}}
+               '22+53+49+23'],
+        'SEC': SdsTable(...),
+        'CEX': SdsTable(...)}
+        assetRoot: the folder that the SDS pictures are relative to, e.g. the excel folder
+        assets: AssetPrefetch that already loads the SDS pictures, see assetPrefetch
+        flows: the indexes into sdsFlows of the runs to build, every run by default
     --Returns:
         prs：presentation object could be used to save pptx
         8 samples in SDS table each page at most
         more samples will generate another page
     """
+    sdsFlowList = sdsFlows(supernatant, sdsRuns, sdsTables)
+    if flows is not None:
+        sdsFlowList = [sdsFlowList[n] for n in flows]
+    for textList, sdsRun, sdsTable in sdsFlowList:
+        prs = sdsMake(prs,textList,sdsRun,sdsTable,assetRoot,assets)
+    return prs
+
+def sdsFlows(supernatant: str, sdsRuns: list, sdsTables: dict) -> list:
+    """
+    the step arrow texts, SdsRun and SdsTable of every SDS-PAGE page group,
+    the arrow of a run shows the steps of every run up to it
+
+    --Returns:
+        flows: [(textList, sdsRun, sdsTable), ...] of the runs with a picture
+    """
+    flows = []
     textList = [supernatant + 'mL Protein Supernatant']
-    for stepSds in sdsList:
-        if stepSds[0] == 'Supernatant':
+    for sdsRun in sdsRuns:
+        if sdsRun.step == 'Supernatant':
             vol = '13 μL on SDS-PAGE'
         else:
-            textList.append(stepSds[0])
+            textList.append(sdsRun.step)
             vol = '2 μg on SDS-PAGE'
-        if stepSds[1] == '-' or stepSds[1] == '':
+        if not sdsRun.hasPicture():
             continue
-        prs = sdsMake(prs,stepSds[0],textList + [vol,'Staining'],stepSds[1],sdsTableDict.get(stepSds[2],{}),stepSds[3],stepSds[4])
-    return prs
+        sdsTable = sdsTables.get(sdsRun.tableName)
+        if sdsTable is None:
+            sdsTable = SdsTable(sdsRun.tableName)
+        flows.append((textList + [vol,'Staining'], sdsRun, sdsTable))
+    return flows
 
-def sdsMake(prs,stepTitle,textList,SDS_Picture,SDS_TableDict,SDS_ELN,SDS_Conclusion):
+@timed()
+def sdsMake(prs,textList,sdsRun,sdsTable,assetRoot='',assets=None):
     """
     Create single protein SDS-PAGE page
     
     --Args:
         prs: presentation object loaded from *pptx* by template pptx
-        stepTitle: the step that show in the title, e.g. "Supernatant & Dialysis"
         textList: the textList use to generate step arrow,
         e.g. ['40mL Protein Supernatant', 'Protein A', 'Dialysis', '13 μL / 2 μg on SDS-PAGE', 'Staining']
-        SDS_Picture: the SDS-PAGE picture of this step, e.g. "SupernatantDialysis_SDS-PAGE.png"
-        SDS_TableDict:    
-        e.g. {
-            'Lane': ['S1', 'S2','1','2'],
-            'Protein name': ['WXXX-T6U9.E17-1.uIgG1 (supernatant)',
+        sdsRun: SdsRun of this step, see reportModel
+        sdsRun.step: the step that show in the title, e.g. "Supernatant & Dialysis"
+        sdsRun.picture: the SDS-PAGE picture of this step, e.g. "SupernatantDialysis_SDS-PAGE.png"
+        sdsRun.eln: the ELN info of SDS-PAGE setp, e.g. "WXBIOXXX/XXXX/20200103"
+        sdsRun.conclusion: the conclusion of SDS-PAGE that split by '|',
+        e.g. Expected reducing and non-reducing bands were visible from the gel.|Minor bands were observed in Lane # 1, 2, 3, 4. 
+        sdsTable: SdsTable of this step
+        e.g. lanes ['S1', 'S2','1','2'],
+            proteinNames ['WXXX-T6U9.E17-1.uIgG1 (supernatant)',
                'WXXX-U9T6.E17-1.uIgG1 (supernatant)',
                'WXXX-T6U9.E17R-1.uIgG1',
                'WXXX-U9T6.E17R-1.uIgG1'],
-            'MW(kDa)': ['147',
+            mws ['147',
                '148',
                '22+53+50+23',
-               '22+53+49+23']}
-        SDS_ELN: the ELN info of SDS-PAGE setp, e.g. "WXBIOXXX/XXXX/20200103"
-        SDS_Conclusion: the conclusion of SDS-PAGE that split by '|',
-        e.g. Expected reducing and non-reducing bands were visible from the gel.|Minor bands were observed in Lane # 1, 2, 3, 4. 
+               '22+53+49+23']
+        assetRoot: the folder that sdsRun.picture is relative to
+        assets: AssetPrefetch to take the picture from, None to read it here
     --Returns:
         prs：presentation object could be used to save pptx
-        12 samples in SDS_table each page at most
-        more samples will generate another page
+        SDS_LANES samples in SDS_table each page at most, fewer when long
+        protein names wrap and the table would pass the slide number
     """
-    tableRowNum = len(SDS_TableDict.get('Lane',[]))
-    for page in range(1,max(math.ceil(tableRowNum/12+1),2)):
-        slide = prs.slides.add_slide(prs.slide_layouts[3])
-        shapes = slide.shapes
-        title_shape = shapes.title
-        title_shape.text = 'Characterization'
-        subtitle = title_shape.text_frame.add_paragraph()
-        subtitle.text = 'SDS-PAGE Results – ' + stepTitle
-        subtitle.font.italic = True
-        subtitle.font.bold = False
-        left, top, width, height = Cm(2.3), Cm(3),Cm(31.5), Cm(4.28)
-        shape = shapes.add_shape(MSO_SHAPE.RIGHT_ARROW, left, top, width, height)
-        shape.shadow.inherit = False
-        shape.fill.solid()
-        shape.fill.fore_color.rgb = RGBColor(208,216,232)
-        shape.line.fill.background()
-        stepNumber = len(textList)
-        margin = round((27.9-stepNumber*3.6)/(stepNumber-1),2)
-        small_left, small_top,small_width, small_height = Cm(3), top+Cm(1.05), Cm(3.6), Cm(2.1)
-        for text in textList:
-            shape = shapes.add_shape(MSO_SHAPE.ROUNDED_RECTANGLE, small_left, small_top, small_width, small_height)
-            shape.fill.solid()
-            shape.fill.fore_color.rgb = RGBColor(79,129,189)
-            shape.line.color.rgb = RGBColor(255,255,255)
-            shape.line.width = Cm(0.07)
-            shape.shadow.inherit = False
-            shape.text = str(text)
-            shape.text_frame.paragraphs[0].font.size = Pt(14)
-            shape.text_frame.paragraphs[0].alignment = PP_ALIGN.CENTER
-            small_left = small_left + small_width + Cm(margin)
-        if page * 12 <= tableRowNum:
-                rows = 12
-        else:
-            rows = tableRowNum-(page-1)*12
-        laneList = SDS_TableDict['Lane'][(page-1)*12:(page-1)*12+rows] + ['M']
-        sdsPicture(shapes,SDS_Picture,laneList)
-        cols = len(SDS_TableDict.keys())
-        table = shapes.add_table(rows + 2, cols, Cm(16.6), Cm(6.6), Cm(14.2), Cm(1)).table
-        table.rows[0].height = Cm(1.13)
-        table.columns[0].width  = Cm(1.54)
-        table.columns[1].width = Cm(9.5)	 	 	 	 	 	 	 	 	 	 
-        table.columns[2].width = Cm(3.8)
-        table.cell(0, 0).text = 'Lane'
-        table.cell(0, 1).text = 'Protein name'
-        table.cell(0, 2).text = 'MW(kDa)'
-        for col in range(cols):
-            for row in range(1,rows+1):
-                table.rows[row].height = Cm(0.71)
-                table.cell(row,col).text = SDS_TableDict[table.cell(0, col).text][(page-1)*12+row-1]
-        table.rows[rows+1].height = Cm(0.71)
-        table.cell(rows+1,0).text = 'M'
-        table.cell(rows+1, 1).merge(table.cell(rows+1, cols-1))
-        table.cell(rows+1, 1).text = 'PageRuler™ Unstained Protein  Ladder'
-        for cell in table.iter_cells():
-            cell.margin_left = 0
-            cell.margin_right = 0
-            cell.margin_top = 0
-            cell.margin_bottom = 0
-            cell.vertical_anchor = 3 
-            for paragraph in cell.text_frame.paragraphs:
-                paragraph.font.size = Pt(14)
-                paragraph.alignment = PP_ALIGN.CENTER       
-        shape = shapes[0]
-        shape.left,shape.top,shape.width,shape.height = Cm(2),Cm(16.2),Cm(31.5),Cm(3) 
-        shape.text = 'Conclusion'
-        shape.text_frame.paragraphs[0].font.size = Pt(18)
-        shape.text_frame.paragraphs[0].font.bold = True
-        for text in SDS_Conclusion.split('|'):
-            new_paragraph = shape.text_frame.add_paragraph()
-            new_paragraph.text = text
-            new_paragraph.font.bold = False
-            new_paragraph.font.size = Pt(14)
-            new_paragraph.level = 1
-        shape = shapes.add_textbox(Cm(28.5), Cm(18.8), Cm(3), Cm(1.11))
-        shape.text = SDS_ELN
-        shape.text_frame.paragraphs[0].font.size = Pt(10)
+    tableRows = SDS_SCHEMA.laneRows(sdsTable)
+    heights = [rowHeight(row, SDS_SCHEMA.widths, SDS_ROW_HEIGHT) for row in tableRows]
+    capacity = pageBottom(prs, 3) - SDS_TABLE_TOP - SDS_HEADER_HEIGHT - SDS_ROW_HEIGHT
+    ## the gel picture is read once for all pages of the step
+    if assets is not None:
+        gelPicture = assets.sdsPicture(sdsRun.picture)
+    else:
+        with open(os.path.join(assetRoot,sdsRun.picture), 'rb') as f:
+            gelPicture = f.read()
+    for start, stop in paginate(heights, capacity, SDS_LANES):
+        laneList = sdsTable.lanes[start:stop] + ['M']
+        texts = [sdsRun.step, [str(text) for text in textList], laneList,
+                 tableRows[start:stop], sdsRun.conclusion.split('|'),
+                 sdsRun.eln, os.path.basename(sdsRun.picture)]
+        slide = addSkeletonSlide(prs, sdsSlide, None, texts, [gelPicture])
+        setRowHeights(tableFrames(slide)[0],
+                      [SDS_HEADER_HEIGHT] + heights[start:stop] + [SDS_ROW_HEIGHT])
     return prs
 
-def sdsPicture(shapes,picture,laneList):
+def sdsSlide(prs, structure, texts, pictures):
+    """
+    the SDS-PAGE slide builder, texts is [step, step arrow texts, lanes,
+    table rows, conclusions, eln, picture name], pictures is [gel picture],
+    the lane rows are one line high until setRowHeights
+    """
+    step, textList, laneList, pageRows, conclusions, eln, pictureName = texts
+    slide = prs.slides.add_slide(slideLayout(prs,3))
+    shapes = slide.shapes
+    title_shape = shapes.title
+    title_shape.text = 'Characterization'
+    subtitle = title_shape.text_frame.add_paragraph()
+    subtitle.text = 'SDS-PAGE Results – ' + step
+    subtitle.font.italic = True
+    subtitle.font.bold = False
+    flowDiagram.draw(shapes, textList, Cm(3))
+    sdsPicture(shapes,pictures[0],laneList,pictureName)
+    rows = len(pageRows)
+    cols = len(SDS_SCHEMA)
+    graphicFrame = shapes.add_table(rows + 2, cols, Cm(16.6), SDS_TABLE_TOP, Cm(14.2), Cm(1))
+    tableRows = [SDS_SCHEMA.labels] + list(pageRows)
+    ## the marker row, the name spans the other columns
+    tableRows.append(['M', 'PageRuler™ Unstained Protein  Ladder'] + [None] * (cols - 2))
+    writeTable(graphicFrame, SDS_SCHEMA.widths, [SDS_HEADER_HEIGHT] + [SDS_ROW_HEIGHT] * (rows + 1),
+               tableRows)
+    shape = shapes[0]
+    shape.left,shape.top,shape.width,shape.height = Cm(2),Cm(16.2),Cm(31.5),Cm(3) 
+    shape.text = 'Conclusion'
+    shape.text_frame.paragraphs[0].font.size = Pt(18)
+    shape.text_frame.paragraphs[0].font.bold = True
+    for text in conclusions:
+        new_paragraph = shape.text_frame.add_paragraph()
+        new_paragraph.text = text
+        new_paragraph.font.bold = False
+        new_paragraph.font.size = Pt(14)
+        new_paragraph.level = 1
+    shape = shapes.add_textbox(Cm(28.5), Cm(18.8), Cm(3), Cm(1.11))
+    shape.text = eln
+    shape.text_frame.paragraphs[0].font.size = Pt(10)
+
+@timed()
+def sdsPicture(shapes,picture,laneList,pictureName=''):
+    """
+    the gel picture with its marker, lanes and band arrows,
+    picture is the bytes of the gel picture named pictureName
+    """
     shape = shapes.add_shape(MSO_SHAPE.RECTANGLE, Cm(2.5), Cm(6.6), Cm(13.6), Cm(8.8))
     shape.shadow.inherit = False
     shape.fill.background()
     shape.line.color.rgb = RGBColor(56,93,138)
     shape.line.width = Cm(0.07)
-    markerPic = os.path.join(filePath,'marker.jpg')
-    shapes.add_picture(markerPic,Cm(2.7), Cm(7.8))
+    addPicture(shapes,_asset('marker.jpg'),'marker.jpg',Cm(2.7), Cm(7.8))
     shape = shapes.add_textbox(Cm(5.7), Cm(6.6), Cm(3.7), Cm(0.9))
     shape.text = 'Non-reducing'
     shape.text_frame.paragraphs[0].font.size = Pt(14)
@@ -203,13 +230,12 @@ def sdsPicture(shapes,picture,laneList):
     connector = shapes.add_connector(MSO_CONNECTOR.STRAIGHT,Cm(10),Cm(7.5),Cm(12.4),Cm(7.5))
     connector.line.color.rgb = RGBColor(0,0,0)
     connector.shadow.inherit = False
-    shapes.add_picture(picture,Cm(4.18),Cm(8.1),Cm(9),Cm(5.82))
+    addPicture(shapes,picture,pictureName,Cm(4.18),Cm(8.1),*GEL_PICTURE_SIZE)
     shape = shapes.add_textbox(Cm(3.3), Cm(14.5), Cm(10.3), Cm(0.9))
     shape.text = 'Gel info: NuPAGE, Novex 4-12% Bis-Tris Gel'
     shape.text_frame.paragraphs[0].font.size = Pt(16)
-    arrowPic = os.path.join(filePath,'arrow.png')
     for top in [Cm(8.56),Cm(10.1),Cm(11.3)]:
-        shapes.add_picture(arrowPic,Cm(12.95),top)
+        addPicture(shapes,_asset('arrow.png'),'arrow.png',Cm(12.95),top)
     shape = shapes.add_textbox(Cm(14), Cm(8.4), Cm(1.7), Cm(0.9))
     shape.text = '150 kDa'
     shape.text_frame.paragraphs[0].font.size = Pt(14)
@@ -274,5 +300,8 @@ if __name__ == '__main__':
                 'WXXX-T6U9.E17R-1.uIgG1'],
             'MW(kDa)': ['147', '148', '22+53+49+23', '22+53+50+23']}
     }
-    prs = purificationSdsPageMake(prs,supernatant,sdsList,sdsTableDict)
+    sdsRuns = [SdsRun(*stepSds) for stepSds in sdsList]
+    sdsTables = {name: SdsTable.fromDict(name, tableDict)
+                 for name, tableDict in sdsTableDict.items()}
+    prs = purificationSdsPageMake(prs,supernatant,sdsRuns,sdsTables)
     prs.save('purificationSdsPageTest.pptx')
\ No newline at end of file
@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 19:12:40 2026
+@author: tao_jingfen
+"""
+import io
+import zlib
+import hashlib
+from PIL import Image
+from pptx.opc.constants import RELATIONSHIP_TYPE as RT
+from pptx.opc.packuri import PackURI
+from pptx.parts.image import Image as PptxImage, ImagePart
+
+EMU_PER_INCH = 914400
+
+class MediaRegistry(object):
+    """
+    the image parts of one presentation package by sha1
+
+    python-pptx finds an existing image part by walking every relationship of
+    the package and hashing every image part again on each add_picture, the
+    registry hashes every picture once and maps it to its single image part,
+    so every later placement only adds a relationship to the slide
+
+    --Args:
+        package: the presentation package, e.g. prs.part.package
+    """
+    def __init__(self, package):
+        self.package = package
+        self._parts = {}        # sha1: ImagePart
+        self._sizes = {}        # (sha1, width, height): the scaled picture size
+        self._hashes = {}       # id(blob): (blob, sha1)
+        self._usedIndex = set()
+        for part in package.iter_parts():
+            if part.partname.startswith('/ppt/media/image') and part.partname.idx is not None:
+                self._usedIndex.add(part.partname.idx)
+            if isinstance(part, ImagePart):
+                self._parts.setdefault(part.sha1, part)
+        self._nextIndex = 1
+
+    def _sha1(self, blob: bytes) -> str:
+        cached = self._hashes.get(id(blob))
+        if cached is None or cached[0] is not blob:
+            cached = self._hashes[id(blob)] = (blob, hashlib.sha1(blob).hexdigest())
+        return cached[1]
+
+    def _partname(self, ext: str) -> PackURI:
+        """
+        the first free /ppt/media/image<n>.<ext>, as package.next_image_partname
+        """
+        while self._nextIndex in self._usedIndex:
+            self._nextIndex += 1
+        self._usedIndex.add(self._nextIndex)
+        return PackURI('/ppt/media/image%d.%s' % (self._nextIndex, ext))
+
+    def imagePart(self, blob: bytes, filename: str = None) -> ImagePart:
+        """
+        the image part of blob, created the first time the picture is seen
+        """
+        sha1 = self._sha1(blob)
+        part = self._parts.get(sha1)
+        if part is None:
+            image = PptxImage.from_blob(blob, filename)
+            part = ImagePart(self._partname(image.ext), image.content_type,
+                             self.package, blob, filename)
+            self._parts[sha1] = part
+        return part
+
+    def scale(self, blob: bytes, part: ImagePart, width, height) -> tuple:
+        """
+        ImagePart.scale, the native size of every picture is read once
+        """
+        if width is not None and height is not None:
+            return width, height
+        key = (self._sha1(blob), width, height)
+        size = self._sizes.get(key)
+        if size is None:
+            size = self._sizes[key] = part.scale(width, height)
+        return size
+
+def mediaRegistry(package) -> MediaRegistry:
+    """
+    the MediaRegistry of the package, kept on the package object itself
+    """
+    registry = getattr(package, '_mediaRegistry', None)
+    if registry is None:
+        registry = package._mediaRegistry = MediaRegistry(package)
+    return registry
+
+def addPicture(shapes, blob: bytes, descr: str, left, top, width=None, height=None):
+    """
+    add a picture from its bytes, nothing is written to the disk, the same
+    picture is stored once in the pptx however often it is placed
+
+    --Args:
+        shapes: the slide shapes to add the picture to
+        blob: the picture bytes, e.g. png or jpeg
+        descr: the picture description shown as alt text, python-pptx
+        only knows the file name of pictures added from a path
+        left, top, width, height: the picture position and size
+    --Returns:
+        picture: the added picture shape
+    """
+    slidePart = shapes.part
+    registry = mediaRegistry(slidePart.package)
+    imagePart = registry.imagePart(blob, descr)
+    rId = slidePart.relate_to(imagePart, RT.IMAGE)
+    width, height = registry.scale(blob, imagePart, width, height)
+    pic = shapes._add_pic_from_image_part(imagePart, rId, left, top, width, height)
+    pic.nvPicPr.cNvPr.set('descr', descr)
+    return shapes._shape_factory(pic)
+
+## PowerPoint compresses pictures to 220 ppi by default
+IMAGE_DPI = 220
+JPEG_QUALITY = 85
+## pictures smaller than this many bytes for each placed pixel are already compact
+COMPACT_BYTES_PER_PIXEL = 0.5
+
+def _packedSize(blob: bytes) -> int:
+    """
+    the size of blob deflated in the pptx zip
+    """
+    return len(zlib.compress(blob))
+
+def optimizeImage(blob: bytes, width: int, height: int, dpi: int = IMAGE_DPI,
+                  jpegQuality: int = JPEG_QUALITY) -> bytes:
+    """
+    Resample a picture to its placement size at dpi and recompress it
+
+    --Args:
+        blob: the picture bytes in any format Pillow reads, e.g. png, bmp, jpeg
+        width, height: the placement size in EMU, e.g. Cm(12), Cm(4)
+        dpi: the pixels per inch of the placed picture, None to keep the picture
+        jpegQuality: the quality of jpeg pictures, other pictures become png,
+        with a palette when the picture has at most 256 colors like most charts
+    --Returns:
+        the optimized picture bytes, or blob when it is a png or jpeg that is
+        already compact or not bigger in the pptx than the optimized one,
+        pictures are only scaled down and keep their aspect ratio
+    """
+    if not dpi:
+        return blob
+    try:
+        image = Image.open(io.BytesIO(blob))
+    except Exception:
+        return blob
+    sourceFormat = image.format
+    targetWidth = width / EMU_PER_INCH * dpi
+    targetHeight = height / EMU_PER_INCH * dpi
+    scale = max(targetWidth / image.width, targetHeight / image.height)
+    if sourceFormat in ('PNG', 'JPEG') and (scale >= 1 or
+            len(blob) < targetWidth * targetHeight * COMPACT_BYTES_PER_PIXEL):
+        return blob
+    try:
+        fewColors = image.getcolors(256) is not None
+        if image.mode not in ('RGB', 'RGBA', 'L'):
+            image = image.convert('RGBA' if image.mode in ('LA', 'PA') or
+                                  'transparency' in image.info else 'RGB')
+        if scale < 1:
+            size = (max(1, round(image.width * scale)), max(1, round(image.height * scale)))
+            image = image.resize(size, Image.LANCZOS)
+        stream = io.BytesIO()
+        if sourceFormat == 'JPEG':
+            image.convert('L' if image.mode == 'L' else 'RGB').save(
+                stream, 'JPEG', quality=jpegQuality, optimize=True)
+        else:
+            if fewColors and image.mode != 'L':
+                image = image.quantize(256)
+            image.save(stream, 'PNG', optimize=True)
+    except Exception:
+        return blob
+    optimized = stream.getvalue()
+    if sourceFormat in ('PNG', 'JPEG') and _packedSize(optimized) >= _packedSize(blob):
+        return blob
+    return optimized
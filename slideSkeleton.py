@@ -0,0 +1,222 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 21:05:47 2026
+@author: tao_jingfen
+"""
+import io
+import re
+import threading
+from collections import OrderedDict
+from xml.sax.saxutils import escape
+from lxml import etree
+from PIL import Image
+from pptx.oxml import parse_xml
+from pptx.opc.constants import CONTENT_TYPE as CT, RELATIONSHIP_TYPE as RT
+from pptx.parts.slide import SlidePart
+
+from templateCache import slideLayout
+from slideImage import MediaRegistry, mediaRegistry
+from reportProfile import count
+
+RENDER_BACKENDS = ('xml', 'pptx')
+## a text slot is recorded as its number between two private use characters
+_TOKEN = re.compile('\ue000(\\d+)\ue001')
+## a run that holds nothing but one slot, python-pptx writes no run for ''
+_TOKEN_RUN = re.compile('<a:r><a:t>\ue000(\\d+)\ue001</a:t></a:r>')
+_PICTURE = re.compile('r:embed="(rId\\d+)"')
+## texts python-pptx does not write as one plain run are built through python-pptx
+_NOT_PLAIN = re.compile('[\x00-\x1f\ue000\ue001]')
+
+class SlideSkeleton(object):
+    """
+    one kind of slide recorded once as an xml format string
+
+    build(prs, structure, texts, pictures) adds one slide through python-pptx,
+    it is run once with every text replaced by a token and every picture by
+    a placeholder png, the shape tree of that slide is kept with the tokens
+    and picture relationships as format fields and the slide is removed again,
+    every later slide of the same structure is a str.format of the skeleton
+
+    --Args:
+        prs: the presentation to record in, it is left as it was
+        build: the slide builder, texts and pictures may only change the text
+        of the slide, everything else has to follow from structure and the
+        number of texts and pictures
+        structure: the hashable layout of the slide, e.g. the table row count
+        texts: a nested list of the slide texts
+        pictures: the list of the picture bytes of the slide
+    """
+    def __init__(self, prs, build, structure, texts, pictures):
+        counter = iter(range(1 << 30))
+        tokenTexts = _mapTexts(texts, lambda text: '\ue000%d\ue001' % next(counter))
+        tokenPictures = [_placeholderPng(n) for n in range(len(pictures))]
+        package = prs.part.package
+        registry = getattr(package, '_mediaRegistry', None)
+        ## the placeholder pictures must not take image part names of the report
+        package._mediaRegistry = MediaRegistry(package)
+        try:
+            build(prs, structure, tokenTexts, tokenPictures)
+        finally:
+            package._mediaRegistry = registry
+        slides = prs.slides
+        slide = slides[-1]
+        self.layoutIndex = [layout.part for layout in prs.slide_layouts].index(slide.slide_layout.part)
+        placeholders = {blob: n for n, blob in enumerate(tokenPictures)}
+        ## the image relationships in the order the pictures were added
+        self.pictures = []
+        rIds = {}
+        for rId, rel in sorted(slide.part.rels.items(), key=lambda item: int(item[0][3:])):
+            if rel.reltype == RT.IMAGE:
+                blob = rel.target_part.blob
+                rIds[rId] = len(self.pictures)
+                self.pictures.append(placeholders.get(blob, blob))
+        xml = etree.tostring(slide._element, encoding='unicode')
+        sldId = slides._sldIdLst[-1]
+        slides._sldIdLst.remove(sldId)
+        prs.part.drop_rel(sldId.rId)
+        self.runs = []
+        xml = xml.replace('{', '{{').replace('}', '}}')
+        xml = _TOKEN_RUN.sub(lambda m: '{r[%d]}' % self._run(int(m.group(1))), xml)
+        xml = _TOKEN.sub(lambda m: '{t[%s]}' % m.group(1), xml)
+        self.template = _PICTURE.sub(lambda m: 'r:embed="{p[%d]}"' % rIds[m.group(1)], xml)
+
+    def _run(self, token: int) -> int:
+        self.runs.append(token)
+        return len(self.runs) - 1
+
+    def render(self, prs, texts: list, pictures: list):
+        """
+        add the slide with texts and pictures filled into the skeleton
+
+        --Returns:
+            slide: the new slide
+        """
+        values = [escape(text, {'"': '&quot;'}) for text in _flatTexts(texts)]
+        runs = ['<a:r><a:t>%s</a:t></a:r>' % values[token] if values[token] else ''
+                for token in self.runs]
+        presentationPart = prs.part
+        package = presentationPart.package
+        registry = mediaRegistry(package)
+        parts = [registry.imagePart(pictures[picture] if isinstance(picture, int) else picture)
+                 for picture in self.pictures]
+        ## python-pptx relates the layout as rId1 and then every new image part,
+        ## so the slide part is made like SlidePart.new but with the whole xml
+        partIds = {}
+        for part in parts:
+            partIds.setdefault(part, 'rId%d' % (len(partIds) + 2))
+        rIds = [partIds[part] for part in parts]
+        slidePart = SlidePart(presentationPart._next_slide_partname, CT.PML_SLIDE, package,
+                              parse_xml(self.template.format(t=values, r=runs, p=rIds)))
+        slidePart.relate_to(slideLayout(prs, self.layoutIndex).part, RT.SLIDE_LAYOUT)
+        for part in partIds:
+            slidePart.relate_to(part, RT.IMAGE)
+        prs.slides._sldIdLst.add_sldId(presentationPart.relate_to(slidePart, RT.SLIDE))
+        return slidePart.slide
+
+## the skeletons of the templates from templateCache by the content hash of
+## the template, the least recently used ones are dropped beyond the limits,
+## any other presentation keeps its skeletons on itself
+SKELETON_TEMPLATES = 4
+SKELETONS_PER_TEMPLATE = 256
+_skeletons = OrderedDict()
+_lock = threading.Lock()
+
+def _templateSkeletons(templateKey: str) -> OrderedDict:
+    """
+    the skeleton LRU of one template, called with _lock held
+    """
+    skeletons = _skeletons.get(templateKey)
+    if skeletons is None:
+        skeletons = _skeletons[templateKey] = OrderedDict()
+        while len(_skeletons) > SKELETON_TEMPLATES:
+            _skeletons.popitem(last=False)
+    else:
+        _skeletons.move_to_end(templateKey)
+    return skeletons
+
+def addSkeletonSlide(prs, build, structure, texts: list, pictures: list = ()):
+    """
+    Add the slide build(prs, structure, texts, pictures) adds, replayed from
+    its xml skeleton instead of building every shape through python-pptx
+
+    the skeleton is recorded the first time the build and structure are seen
+    for the template, the SKELETONS_PER_TEMPLATE last used ones are kept,
+    slides with texts that python-pptx writes differently from one plain
+    run, e.g. with line breaks, and presentations whose render backend is
+    'pptx' are built by build itself
+
+    --Args:
+        prs: presentation object loaded from *pptx* by template pptx
+        build: the slide builder, see SlideSkeleton
+        structure: the hashable layout of the slide besides the texts and pictures
+        texts: a nested list of the slide texts
+        pictures: the list of the picture bytes of the slide
+    --Returns:
+        slide: the new slide
+    """
+    if getattr(prs, '_renderBackend', 'xml') != 'xml' or \
+            any(_NOT_PLAIN.search(text) for text in _flatTexts(texts)):
+        build(prs, structure, texts, pictures)
+        return prs.slides[-1]
+    key = (build.__module__, build.__qualname__, structure, _shape(texts), len(pictures))
+    templateKey = getattr(prs, '_templateKey', None)
+    if templateKey is None:
+        skeletons = getattr(prs, '_skeletons', None)
+        if skeletons is None:
+            skeletons = prs._skeletons = {}
+        skeleton = skeletons.get(key)
+    else:
+        with _lock:
+            skeletons = _templateSkeletons(templateKey)
+            skeleton = skeletons.get(key)
+            if skeleton is not None:
+                skeletons.move_to_end(key)
+    if skeleton is None:
+        skeleton = SlideSkeleton(prs, build, structure, texts, pictures)
+        count('skeletonRecorded')
+        if templateKey is None:
+            skeletons[key] = skeleton
+        else:
+            with _lock:
+                skeletons = _templateSkeletons(templateKey)
+                skeletons[key] = skeleton
+                while len(skeletons) > SKELETONS_PER_TEMPLATE:
+                    skeletons.popitem(last=False)
+    count('skeletonReplayed')
+    return skeleton.render(prs, texts, pictures)
+
+def setRenderBackend(prs, backend: str):
+    """
+    'xml' replays slides from their skeletons, 'pptx' builds every shape through python-pptx
+    """
+    if backend not in RENDER_BACKENDS:
+        raise ValueError('渲染方式必须是xml或pptx')
+    prs._renderBackend = backend
+    return prs
+
+## texts are nested lists or tuples, anything else is one text
+def _mapTexts(texts, function):
+    if not isinstance(texts, (list, tuple)):
+        return function(texts)
+    return [_mapTexts(item, function) for item in texts]
+
+def _flatTexts(texts) -> list:
+    if not isinstance(texts, (list, tuple)):
+        return [str(texts)]
+    return [text for item in texts for text in _flatTexts(item)]
+
+def _shape(texts):
+    """
+    the nesting and the lengths of texts, texts of another shape need another skeleton
+    """
+    if not isinstance(texts, (list, tuple)):
+        return None
+    return tuple(_shape(item) for item in texts)
+
+def _placeholderPng(n: int) -> bytes:
+    """
+    a distinct 1x1 png that stands for the n-th picture while recording
+    """
+    stream = io.BytesIO()
+    Image.new('RGB', (1, 1), (n % 256, n // 256 % 256, 77)).save(stream, 'PNG')
+    return stream.getvalue()
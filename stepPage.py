@@ -6,237 +6,198 @@
 '''
 
 from pptx import Presentation
-import math
 from pptx.util import Cm
 from pptx.util import Pt
-from pptx.enum.shapes import MSO_SHAPE
-from pptx.dml.color import RGBColor
-from pptx.enum.text import PP_ALIGN
 import os
 
-def purificationStepPageMake(prs: str, stepsDict: dict) -> str:
+from reportModel import StepTable
+from templateCache import slideLayout, pageBottom
+from slideSkeleton import addSkeletonSlide
+from reportProfile import timed
+from tableXml import writeTable, tableFrames, setRowHeights
+from pageLayout import rowHeight
+from tableSchema import STEP_SCHEMA, AFFINITY_SCHEMA
+
+STEP_HEADER_HEIGHT, STEP_ROW_HEIGHT = Cm(1.54), Cm(1.05)
+## the step tables are stacked from below the two line slide title, which
+## overflows its placeholder, down to the bottom of the slide number, every
+## table under its Cm(1.11) step title
+STEP_TOP = Cm(2.8)
+STEP_TITLE_HEIGHT, STEP_GAP = Cm(1.11), Cm(0.1)
+
+@timed()
+def purificationStepPageMake(prs: str, steps: list) -> str:
     """
     Create the every step protein purification info page of purification auto-report PPT
     
     --Args:
         prs: presentation object loaded from *pptx* by template pptx
-        stepsDict: every step protein purification info Dict,
-        e.g. {
-        1: {'PurificationStep': 'Protein A & Ni',
-        'WXXX-hPro1.His - P1': 
-        {
-            'No':'1',
-            'Concentration': 'XXX',
-            'Volume': 'XXX',
-            'Amount': 'XXX',
-            'Yield': 'XXX',
-            'Buffer': 'XXX',
-            'Purity by SEC-HPLC': 'XXX',
-            'Supernatant':'XXX',
-            'MW':'XXX',
-            'PI': 'XXX',
-            'Comments': 'XXX'
-        },
-        'WXXX-hPro1.His - P2': 
-        {
-            'No':'1',
-            'Concentration': 'XXX',
-            'Volume': 'XXX',
-            'Amount': 'XXX',
-            'Yield': 'XXX',
-            'Buffer': 'XXX',
-            'Purity by SEC-HPLC': 'XXX',
-            'Supernatant':'XXX',
-            'MW':'XXX',
-            'PI': 'XXX',
-            'Comments': 'XXX'
-        },
-        'WXXX-BMK1': 
-        {
-            'No':'2',
-            'Concentration': 'XXX',
-            'Volume': 'XXX',
-            'Amount': 'XXX',
-            'Yield': 'XXX',
-            'Buffer': 'XXX',
-            'Purity by SEC-HPLC': 'XXX',
-            'Supernatant':'XXX',
-            'MW':'XXX',
-            'PI': 'XXX',
-            'Comments': 'XXX'
-        }
-        },
-        2: {'PurificationStep': 'Dialysis',
-        'WXXX-hPro1.His - P1': {},
-        'WXXX-hPro1.His - P2': {},
-        'WXXX-BMK1': {} }
-        ...}
+        steps: StepTable list of every purification step, see reportModel
+        e.g. [
+        StepTable('1', 'Protein A & Ni'):
+        [StepResult(Protein('1', 'WXXX-hPro1.His - P1'), 
+                    ('0.32', '1.50', '0.48', '12.06', 'PBS', '99.62%', 
+                     'NA', '40', '147', '6.32', 'Three steps')),
+         StepResult(Protein('1', 'WXXX-hPro1.His - P2'), (...)),
+         StepResult(Protein('2', 'WXXX-BMK1'), (...))],
+        StepTable('2', 'Dialysis'): [...],
+        ...]
     --Returns:
         prs?presentation object could be used to save pptx
-        2 purification steps with 5  each page at most
-        more will generate another page
+        the tables are stacked on the slides in step order, see stepLayout
     """
-    site = 1
-#    if stepsDict == {}:
-#        prs = stepTableMake(prs,1,'Protein A',{},site)
-#    else:
-    for n in stepsDict.keys():
-        step = stepsDict[n].get('PurificationStep','')
-        stepInfo = stepsDict.get(n,{})
-        stepSampleNum = len(stepInfo.keys())-1
-        if site == 1:
-            prs = stepTableMake(prs,n,step,stepInfo,site)
-            if stepSampleNum <= 5:
-                site = 2
-        else:
-            if stepSampleNum <= 5:
-                prs = stepTableMake(prs,n,step,stepInfo,site)
-                site = 1
-            else:
-                site = 1
-                prs = stepTableMake(prs,n,step,stepInfo,site)
+    tables = []
+    for stepTable in steps:
+        affinity = stepTable.isAffinity()
+        schema = AFFINITY_SCHEMA if affinity else STEP_SCHEMA
+        rows = schema.stepRows(stepTable)
+        widths = schema.widths
+        heights = [rowHeight(schema.labels, widths, STEP_HEADER_HEIGHT)] + \
+            [rowHeight(row, widths, STEP_ROW_HEIGHT) for row in rows]
+        tables.append((affinity, str(stepTable.no) + '. ' + stepTable.name, rows, heights))
+    for page in stepLayout([heights for _, _, _, heights in tables], pageBottom(prs, 2)):
+        structure, texts, geometry = [], [], []
+        for index, top, start, stop in page:
+            affinity, title, rows, heights = tables[index]
+            structure.append(affinity)
+            texts.append([title, rows[start:stop]])
+            geometry.append((top, heights[:1] + heights[1 + start:1 + stop]))
+        ## the skeleton only depends on the tables and their row counts
+        slide = addSkeletonSlide(prs, stepSlide, tuple(structure), texts)
+        arrangeSteps(slide, geometry)
     return prs
-        
-def stepTableMake(prs,n,step,stepInfo,site):
+
+def arrangeSteps(slide, geometry: list):
+    """
+    Place the step titles and tables of a step slide at their tops and set
+    the row heights of the tables
+
+    --Args:
+        slide: the step slide, see stepSlide
+        geometry: the (top of the step title, [header height, row heights...])
+        of every table on the slide
+    """
+    for graphicFrame, (top, heights) in zip(tableFrames(slide), geometry):
+        ## the step title textbox is added right before its table
+        graphicFrame.getprevious().y = top
+        graphicFrame.y = top + STEP_TITLE_HEIGHT
+        setRowHeights(graphicFrame, heights)
+
+def stepLayout(tables: list, bottom: int) -> list:
+    """
+    Plan the step slides over all step tables, keeping the step order
+
+    every slide starts at a table row, from there the tables are stacked
+    whole while they fit, the first one that does not fit either starts
+    the next slide or is split with its first rows filling the slide, the
+    plan with the fewest slides and then the fewest split tables is taken,
+    so a table that fits on a slide is only split when that saves a slide,
+    a split table repeats its title and header on the next slide
+
+    --Args:
+        tables: the [header height, row heights...] of every step table
+        bottom: where the tables of a slide have to end, see pageBottom
+    --Returns:
+        pages: [[(table index, top, first row, stop row), ...], ...] the
+        tables of every slide, top is the top of the step title
+    """
+    end = (len(tables), 0)
+    ## (slides, splits, tables of the slide, next slide start) of every
+    ## slide start, planned from the last table backwards
+    plans = {end: (0, 0, None, None)}
+    starts = [(index, start) for index, heights in enumerate(tables)
+              for start in range(max(len(heights) - 1, 1))]
+    for slideStart in reversed(starts):
+        best = None
+        for page, nextStart, splits in _slideOptions(tables, bottom, slideStart):
+            slides, nextSplits = plans[nextStart][:2]
+            plan = (slides + 1, splits + nextSplits, page, nextStart)
+            if best is None or plan[:2] < best[:2]:
+                best = plan
+        plans[slideStart] = best
+    pages = []
+    slideStart = (0, 0)
+    while slideStart != end:
+        _, _, page, slideStart = plans[slideStart]
+        pages.append(page)
+    return pages
+
+def _slideOptions(tables: list, bottom: int, slideStart: tuple) -> list:
+    """
+    the ways to fill one slide from slideStart, the slide either ends before
+    the first table that does not fit or splits it
+
+    --Returns:
+        options: [(tables of the slide, next slide start, split count), ...]
+        with the slide ending before the table first
+    """
+    index, start = slideStart
+    page, top = [], STEP_TOP
+    while index < len(tables):
+        headerHeight, heights = tables[index][0], tables[index][1:]
+        stop, end = start, top + STEP_TITLE_HEIGHT + headerHeight
+        while stop < len(heights) and end + heights[stop] <= bottom:
+            end += heights[stop]
+            stop += 1
+        if stop == len(heights) and end <= bottom:
+            page.append((index, top, start, stop))
+            index, start, top = index + 1, 0, end + STEP_GAP
+            continue
+        options = [(page, (index, start), 0)] if page else []
+        if not page and stop == start:
+            ## not even one row fits on an empty slide, it takes the slide
+            stop = min(start + 1, len(heights))
+        if stop > start or not page:
+            nextStart = (index, stop) if stop < len(heights) else (index + 1, 0)
+            options.append((page + [(index, top, start, stop)], nextStart,
+                            int(stop < len(heights))))
+        return options
+    return [(page, (index, start), 0)]
+
+def stepSlide(prs, structure, texts, pictures):
+    """
+    the step slide builder, structure is whether every table on the slide is
+    an affinity table and texts is [title, cell list of every table row] of
+    every table, the tables are stacked one line per row until arrangeSteps
+    """
+    slide = prs.slides.add_slide(slideLayout(prs,2))
+    shapes = slide.shapes
+    title_shape = shapes.title
+    title_shape.text = 'Characterization'
+    subtitle = title_shape.text_frame.add_paragraph()
+    subtitle.text = 'Steps '
+    subtitle.font.italic = True 
+    subtitle1 = subtitle.add_run()
+    subtitle1.text = '- Protein Purification Summary'
+    subtitle1.font.bold = False
+    subtitle1.font.italic = True
+    top = STEP_TOP
+    for affinity, (title, rows) in zip(structure, texts):
+        heights = [STEP_HEADER_HEIGHT] + [STEP_ROW_HEIGHT] * len(rows)
+        stepTableMake(shapes, title, rows, affinity, heights, top)
+        top += STEP_TITLE_HEIGHT + sum(heights) + STEP_GAP
+
+@timed()
+def stepTableMake(shapes, title, rows, affinity, heights, top):
     """
     Create the protein purification info table
     
     --Args:
-        prs: presentation object loaded from *pptx* by template pptx
-        n: the number of the step, e.g. 1, 2, 3, start from 1
-        step: the step name, e.g. 'Protein A & Ni'
-        stepInfo: the step detailed info dict 
-        e.g.
-        {'PurificationStep': ,
-        'WXXX-hPro1.His - P1': 
-        {
-            'No':'1',
-            'Concentration': 'XXX',
-            'Volume': 'XXX',
-            'Amount': 'XXX',
-            'Yield': 'XXX',
-            'Buffer': 'XXX',
-            'Purity by SEC-HPLC': 'XXX',
-            'Supernatant':'XXX',
-            'MW':'XXX',
-            'PI': 'XXX',
-            'Comments': 'XXX'
-        },
-        'WXXX-hPro1.His - P2': 
-        {
-            'No':'1',
-            'Concentration': 'XXX',
-            'Volume': 'XXX',
-            'Amount': 'XXX',
-            'Yield': 'XXX',
-            'Buffer': 'XXX',
-            'Purity by SEC-HPLC': 'XXX',
-            'Supernatant':'XXX',
-            'MW':'XXX',
-            'PI': 'XXX',
-            'Comments': 'XXX'
-        },
-        'WXXX-BMK1': 
-        {
-            'No':'2',
-            'Concentration': 'XXX',
-            'Volume': 'XXX',
-            'Amount': 'XXX',
-            'Yield': 'XXX',
-            'Buffer': 'XXX',
-            'Purity by SEC-HPLC': 'XXX',
-            'Supernatant':'XXX',
-            'MW':'XXX',
-            'PI': 'XXX',
-            'Comments': 'XXX'
-        }
-        },
-        2: {'PurificationStep': 'Dialysis',
-        'WXXX-hPro1.His - P1': {},
-        'WXXX-hPro1.His - P2': {},
-        'WXXX-BMK1': {} }
-        ...}
-        site: the site that place the table, 1 or 2
-    --Returns:
-        prs: presentation object could be used to save pptx
+        shapes: the shapes of the step slide
+        title: the step title, e.g. '1. Protein A & Ni'
+        rows: the No, Protein Name and column values of every protein
+        affinity: Protein A and Ni steps have no Recovery column
+        heights: the header and row heights
+        top: the top of the step title
     """
-    if site == 1:
-        slide= prs.slides.add_slide(prs.slide_layouts[2])
-        shapes = slide.shapes
-        title_shape = shapes.title
-        title_shape.text = 'Characterization'
-        subtitle = title_shape.text_frame.add_paragraph()
-        subtitle.text = 'Steps '
-        subtitle.font.italic = True 
-        subtitle1 = subtitle.add_run()
-        subtitle1.text = '- Protein Purification Summary'
-        subtitle1.font.bold = False
-        subtitle1.font.italic = True
-        top = Cm(2.8)
-    else:
-        slide = prs.slides[-1]
-        shapes = slide.shapes
-        top = Cm(10.8)
-    shape = shapes.add_textbox(Cm(2.2), top, Cm(8.65), Cm(1.11))
-    if 'Protein A' in step or 'Ni' in step:
-        column = 11
-    else:
-        column = 12
-    table = shapes.add_table(max(1,len(stepInfo.keys())), column, Cm(0.6), top + Cm(1.11), Cm(34.38), Cm(6.8)).table  
-    shape.text = str(n) +'. ' + step
+    shape = shapes.add_textbox(Cm(2.2), top, Cm(8.65), STEP_TITLE_HEIGHT)
+    schema = AFFINITY_SCHEMA if affinity else STEP_SCHEMA
+    graphicFrame = shapes.add_table(len(rows) + 1, len(schema), Cm(0.6), top + STEP_TITLE_HEIGHT, Cm(34.38), Cm(6.8))
+    shape.text = title
     shape.text_frame.paragraphs[0].font.size = Pt(20) 
-    table.rows[0].height = Cm(1.54)
-    table.columns[0].width  = Cm(1.4)
-    table.columns[1].width = Cm(6.94)	 	 	 	 	 	 	 	 	 	 
-    table.columns[2].width = Cm(3.58)
-    table.columns[3].width = Cm(2.24)
-    table.columns[4].width = Cm(2.45)
-    table.columns[5].width = Cm(2.05)
-    table.cell(0, 0).text = 'No'
-    table.cell(0, 1).text = 'Protein Name'
-    table.cell(0, 2).text = 'Concentration (mg/ml)'
-    table.cell(0, 3).text = 'Volume (ml)'
-    table.cell(0, 4).text = 'Amount (mg)'
-    table.cell(0, 5).text = 'Yield (mg/L)'
-    table.cell(0, 6).text = 'Buffer'
-    table.cell(0, 7).text = 'Purity by SEC-HPLC (%)'
-    table.cell(0, 8).text = 'Supernatant (mL)'
-    if 'Protein A' in step or 'Ni' in step:
-        table.columns[6].width = Cm(4.23)
-        table.columns[7].width = Cm(3.98)
-        table.columns[8].width = Cm(3.32)
-        table.columns[9].width = Cm(1.07)
-        table.columns[10].width = Cm(3.16)
-        table.cell(0, 9).text = 'PI'
-        table.cell(0, 10).text = 'Comments'
-    else: 
-        table.columns[6].width = Cm(1.89)
-        table.columns[7].width = Cm(3.87)
-        table.columns[8].width = Cm(3.23)
-        table.columns[9].width = Cm(2.93)
-        table.columns[10].width = Cm(1.07)
-        table.columns[11].width = Cm(2.89)
-        table.cell(0, 9).text = 'Recovery(%)'
-        table.cell(0, 10).text = 'PI'
-        table.cell(0, 11).text = 'Comments'
-    for row,proteinName in enumerate(list(stepInfo.keys())[1:]):
-        table.rows[row+1].height = Cm(1.05)
-        table.cell(row+1,0).text = str(stepInfo[proteinName].get('No',''))
-        table.cell(row+1,1).text = str(proteinName)
-        for col in range(2,column):
-            colName = table.cell(0, col).text.split('(')[0].strip()
-            table.cell(row+1,col).text = \
-            str(stepInfo[proteinName].get(colName,''))
-    for cell in table.iter_cells():
-        cell.margin_left = 0
-        cell.margin_right = 0
-        cell.margin_top = 0
-        cell.margin_bottom = 0
-        cell.vertical_anchor = 3
-        for paragraph in cell.text_frame.paragraphs:
-            paragraph.font.size = Pt(14)
-            paragraph.alignment = PP_ALIGN.CENTER            
-    return prs
+    rows = [schema.labels] + list(rows)
+    ## 14pt, centered in both directions, no margins
+    writeTable(graphicFrame, schema.widths, list(heights), rows)
 
 if __name__ == '__main__':
     filePath = os.path.abspath(os.path.dirname(__file__))
@@ -404,5 +365,6 @@ if __name__ == '__main__':
     'Recovery': 'NA',
     'MW': '147',
     'Comments': 'Two steps'}}}
-    prs = purificationStepPageMake(prs, stepsDict)
+    steps = [StepTable.fromDict(str(n), stepDict) for n, stepDict in stepsDict.items()]
+    prs = purificationStepPageMake(prs, steps)
     prs.save('purificationStepPageTest.pptx')
\ No newline at end of file
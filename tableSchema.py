@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 23:02:51 2026
+@author: tao_jingfen
+"""
+from operator import attrgetter
+from pptx.util import Cm
+
+## the columns taken from StepResult.protein instead of StepResult.values
+PROTEIN_FIELDS = {'No': attrgetter('protein.no'), 'Protein Name': attrgetter('protein.name')}
+
+class Column(object):
+    """
+    one table column, e.g. Column('Volume (ml)', Cm(2.24), 'Volume')
+
+    --Attributes:
+        label: the header text of the column
+        width: the column width in EMU
+        field: where the cells come from, a field of StepTable, a key of
+        PROTEIN_FIELDS or a column attribute of SdsTable
+    """
+    __slots__ = ('label', 'width', 'field')
+
+    def __init__(self, label: str, width: int, field: str):
+        self.label = label
+        self.width = width
+        self.field = field
+
+    def __repr__(self):
+        return 'Column(%r, %r, %r)' % (self.label, self.width, self.field)
+
+class TableSchema(object):
+    """
+    the columns of one kind of page table, the header, widths and the
+    source of every cell are looked up once for the whole table and the
+    rows are built column by column index
+    """
+    __slots__ = ('columns', 'labels', 'widths', 'fields')
+
+    def __init__(self, columns: list):
+        self.columns = tuple(columns)
+        self.labels = [column.label for column in self.columns]
+        self.widths = [column.width for column in self.columns]
+        self.fields = [column.field for column in self.columns]
+
+    def __len__(self):
+        return len(self.columns)
+
+    def stepRows(self, stepTable) -> list:
+        """
+        the cell texts of every StepResult of stepTable, '' where the table
+        has no such field
+
+        --Args:
+            stepTable: StepTable, see reportModel
+        --Returns:
+            rows: [[cell, ...], ...] one list of len(self) texts for every result
+        """
+        getters = [PROTEIN_FIELDS.get(field) or _valueGetter(stepTable.fieldIndex(field))
+                   for field in self.fields]
+        return [[getter(result) for getter in getters] for result in stepTable]
+
+    def laneRows(self, sdsTable) -> list:
+        """
+        the cell texts of every lane of the columnar sdsTable
+
+        --Args:
+            sdsTable: SdsTable, see reportModel, every field is a column list
+        --Returns:
+            rows: [[cell, ...], ...] one list of len(self) str for every lane
+        """
+        columns = [getattr(sdsTable, field) for field in self.fields]
+        return [[str(text) for text in row] for row in zip(*columns)]
+
+def _valueGetter(index):
+    """
+    the getter of StepResult.values[index], '' for a field the table does not have
+    """
+    if index is None:
+        return lambda result: ''
+    return lambda result: result.values[index]
+
+## the final summary table
+FINAL_SCHEMA = TableSchema([
+    Column('No', Cm(1.23), 'No'),
+    Column('Protein Name', Cm(6.18), 'Protein Name'),
+    Column('Concentration (mg/ml)', Cm(3.58), 'Concentration'),
+    Column('Volume (ml)', Cm(2.17), 'Volume'),
+    Column('Amount (mg)', Cm(2.37), 'Amount'),
+    Column('Yield (mg/L)', Cm(1.99), 'Yield'),
+    Column('Buffer', Cm(1.88), 'Buffer'),
+    Column('Purity by SEC-HPLC (%)', Cm(3.85), 'Purity by SEC-HPLC'),
+    Column('Supernatant (mL)', Cm(3.21), 'Supernatant'),
+    Column('MW (kDa)', Cm(1.78), 'MW'),
+    Column('PI', Cm(1.47), 'PI'),
+    Column('Comments', Cm(3.89), 'Comments')])
+## the table of a step with recovery
+STEP_SCHEMA = TableSchema([
+    Column('No', Cm(1.4), 'No'),
+    Column('Protein Name', Cm(6.94), 'Protein Name'),
+    Column('Concentration (mg/ml)', Cm(3.58), 'Concentration'),
+    Column('Volume (ml)', Cm(2.24), 'Volume'),
+    Column('Amount (mg)', Cm(2.45), 'Amount'),
+    Column('Yield (mg/L)', Cm(2.05), 'Yield'),
+    Column('Buffer', Cm(1.89), 'Buffer'),
+    Column('Purity by SEC-HPLC (%)', Cm(3.87), 'Purity by SEC-HPLC'),
+    Column('Supernatant (mL)', Cm(3.23), 'Supernatant'),
+    Column('Recovery(%)', Cm(2.93), 'Recovery'),
+    Column('PI', Cm(1.07), 'PI'),
+    Column('Comments', Cm(2.89), 'Comments')])
+## Protein A and Ni steps have no Recovery column
+AFFINITY_SCHEMA = TableSchema([
+    Column('No', Cm(1.4), 'No'),
+    Column('Protein Name', Cm(6.94), 'Protein Name'),
+    Column('Concentration (mg/ml)', Cm(3.58), 'Concentration'),
+    Column('Volume (ml)', Cm(2.24), 'Volume'),
+    Column('Amount (mg)', Cm(2.45), 'Amount'),
+    Column('Yield (mg/L)', Cm(2.05), 'Yield'),
+    Column('Buffer', Cm(4.23), 'Buffer'),
+    Column('Purity by SEC-HPLC (%)', Cm(3.98), 'Purity by SEC-HPLC'),
+    Column('Supernatant (mL)', Cm(3.32), 'Supernatant'),
+    Column('PI', Cm(1.07), 'PI'),
+    Column('Comments', Cm(3.16), 'Comments')])
+## the SDS-PAGE lane table
+SDS_SCHEMA = TableSchema([
+    Column('Lane', Cm(1.54), 'lanes'),
+    Column('Protein name', Cm(9.5), 'proteinNames'),
+    Column('MW(kDa)', Cm(3.8), 'mws')])
@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 20:36:18 2026
+@author: tao_jingfen
+"""
+import re
+from xml.sax.saxutils import escape
+from pptx.oxml import parse_xml
+from pptx.oxml.ns import nsdecls, qn
+from pptx.util import Pt
+
+## control characters python-pptx writes as _xHHHH_, tab, line feed and
+## vertical tab are kept
+_CONTROL_CHARS = re.compile('[\x00-\x08\x0c\x0e-\x1f]')
+
+def _runsXml(text: str) -> str:
+    """
+    the runs of one paragraph, a vertical tab is a line break like python-pptx
+    """
+    runs = []
+    for n, segment in enumerate(text.split('\v')):
+        if n:
+            runs.append('<a:br/>')
+        if segment:
+            segment = _CONTROL_CHARS.sub(lambda m: '_x%04X_' % ord(m.group(0)), segment)
+            runs.append('<a:r><a:t>%s</a:t></a:r>' % escape(segment))
+    return ''.join(runs)
+
+def cellXml(text: str, fontSize: int = Pt(14), attrs: str = '') -> str:
+    """
+    the a:tc of a table cell without margins, centered in both directions
+    with every paragraph in fontSize, as the page tables are styled
+
+    --Args:
+        text: the cell text, '\\n' starts a new paragraph
+        fontSize: the font size in EMU, e.g. Pt(14)
+        attrs: the extra a:tc attributes, e.g. ' gridSpan="2"'
+    """
+    pPr = '<a:pPr algn="ctr"><a:defRPr sz="%d"/></a:pPr>' % fontSize.centipoints
+    paragraphs = ''.join('<a:p>%s%s</a:p>' % (pPr, _runsXml(line))
+                         for line in str(text).split('\n'))
+    return ('<a:tc%s><a:txBody><a:bodyPr/><a:lstStyle/>%s</a:txBody>'
+            '<a:tcPr marL="0" marR="0" marT="0" marB="0" anchor="ctr"/></a:tc>'
+            % (attrs, paragraphs))
+
+def writeTable(graphicFrame, widths: list, heights: list, rows: list,
+               fontSize: int = Pt(14)):
+    """
+    Replace the grid and every row of a table with styled cells in one operation
+
+    the cells are the same as setting cell.text and then the margins,
+    vertical_anchor, font size and alignment of every cell and paragraph
+    through python-pptx, but the whole a:tbl is built as one xml string,
+    the table style of the table is kept
+
+    --Args:
+        graphicFrame: the table graphic frame, e.g. shapes.add_table(...)
+        widths: the column widths in EMU
+        heights: the row heights in EMU
+        rows: the cell text lists of every row, None means the cell is
+        merged into the cell on its left
+        fontSize: the font size of every paragraph
+    --Returns:
+        table: the python-pptx table of the new a:tbl
+    """
+    if len(rows) != len(heights):
+        raise ValueError('表格行数和行高数量不一致')
+    xml = ['<a:tbl %s><a:tblGrid>' % nsdecls('a')]
+    xml.extend('<a:gridCol w="%d"/>' % width for width in widths)
+    xml.append('</a:tblGrid>')
+    for height, cells in zip(heights, rows):
+        if len(cells) != len(widths):
+            raise ValueError('表格列数和列宽数量不一致')
+        xml.append('<a:tr h="%d">' % height)
+        for col, text in enumerate(cells):
+            if text is None:
+                xml.append(cellXml('', fontSize, ' hMerge="1"'))
+                continue
+            span = 1
+            while col + span < len(cells) and cells[col + span] is None:
+                span += 1
+            xml.append(cellXml(text, fontSize, ' gridSpan="%d"' % span if span > 1 else ''))
+        xml.append('</a:tr>')
+    xml.append('</a:tbl>')
+    tbl = parse_xml(''.join(xml))
+    oldTbl = graphicFrame._element.graphic.graphicData.tbl
+    tbl.insert(0, oldTbl.tblPr)
+    oldTbl.getparent().replace(oldTbl, tbl)
+    graphicFrame.width = sum(widths)
+    graphicFrame.height = sum(heights)
+    return graphicFrame.table
+
+def tableFrames(slide) -> list:
+    """
+    the p:graphicFrame elements of the tables of slide in the order they were added
+    """
+    return [frame for frame in slide.shapes._spTree.iter(qn('p:graphicFrame'))
+            if frame.graphic.graphicData.tbl is not None]
+
+def setRowHeights(graphicFrame, heights: list):
+    """
+    Set the row heights of a table and fit its frame to them, the same as
+    writing the table with these heights
+
+    the slide skeletons are recorded for a row count, the heights that
+    depend on how the texts wrap are set on every slide afterwards
+
+    --Args:
+        graphicFrame: the p:graphicFrame element of the table, see tableFrames
+        heights: the row heights in EMU
+    """
+    rows = graphicFrame.graphic.graphicData.tbl.tr_lst
+    if len(rows) != len(heights):
+        raise ValueError('表格行数和行高数量不一致')
+    for tr, height in zip(rows, heights):
+        tr.h = height
+    graphicFrame.cy = sum(heights)
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 16:31:55 2026
+@author: tao_jingfen
+"""
+import os
+import io
+import copy
+import threading
+from pptx import Presentation
+from pptx.util import Cm
+
+from diskCache import contentHash
+
+class TemplateCache(object):
+    """
+    parse every template pptx once and hand out independent copies
+
+    the parsed presentation is kept as a prototype, every job gets a deep
+    copy of its package, which is much cheaper than unzipping and parsing
+    the template again, the template is parsed again when the file changes,
+    every copy is tagged with the content hash of the template so copies of
+    the same template share their slide skeletons, see slideSkeleton
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._prototypes = {}
+
+    def _prototype(self, templatePath: str) -> tuple:
+        templatePath = os.path.abspath(templatePath)
+        stat = os.stat(templatePath)
+        key = (templatePath, stat.st_mtime, stat.st_size)
+        prototype = self._prototypes.get(templatePath)
+        if prototype is None or prototype[0] != key:
+            with open(templatePath, 'rb') as f:
+                content = f.read()
+            prs = Presentation(io.BytesIO(content))
+            prototype = (key, prs, prs.slide_layouts[1].placeholders[0], contentHash(content))
+            self._prototypes[templatePath] = prototype
+        return prototype
+
+    def presentation(self, templatePath: str) -> Presentation:
+        """
+        return a new presentation object of the template
+        """
+        with self._lock:
+            _, prs, _, digest = self._prototype(templatePath)
+            prs = copy.deepcopy(prs)
+        prs._templateKey = digest
+        return prs
+
+    def numberPlaceholder(self, templatePath: str):
+        """
+        the slide number placeholder of layout 1 of the template,
+        only its properties are read by clone_placeholder, so the one of the
+        prototype serves every copy
+        """
+        with self._lock:
+            return self._prototype(templatePath)[2]
+
+templateCache = TemplateCache()
+
+def slideLayout(prs: Presentation, index: int):
+    """
+    prs.slide_layouts[index] resolved once for each presentation,
+    the layout list is kept on the presentation object itself
+    """
+    layouts = getattr(prs, '_layoutList', None)
+    if layouts is None:
+        layouts = prs._layoutList = list(prs.slide_layouts)
+    return layouts[index]
+
+## the idx of the slide number placeholder of every layout of the template
+NUMBER_PLACEHOLDER = 12
+## how far the tables of a page may reach below the slide number box
+PAGE_TOLERANCE = Cm(0.1)
+
+def _placeholder(prs: Presentation, index: int, idx: int):
+    placeholder = slideLayout(prs, index).placeholders.get(idx=idx)
+    if placeholder is None:
+        raise ValueError('模板版式%d没有编号为%d的占位符' % (index, idx))
+    return placeholder
+
+def placeholderTop(prs: Presentation, index: int, idx: int) -> int:
+    """
+    the top of the placeholder idx of layout index in EMU, e.g. where the
+    table of the final page starts
+    """
+    return _placeholder(prs, index, idx).top
+
+def pageBottom(prs: Presentation, index: int) -> int:
+    """
+    where the tables of a slide of layout index have to end in EMU, the
+    bottom edge of the slide number placeholder plus PAGE_TOLERANCE, the
+    number sits in the right corner of its box and the tables may share
+    its band as they did before the pages were measured
+    """
+    placeholder = _placeholder(prs, index, NUMBER_PLACEHOLDER)
+    return placeholder.top + placeholder.height + PAGE_TOLERANCE
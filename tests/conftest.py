@@ -0,0 +1,12 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 23:58:14 2026
+@author: tao_jingfen
+"""
+import os
+import sys
+import tempfile
+
+## the tests cache into a folder of their own, set before diskCache is imported
+os.environ['AUTOREPORT_CACHE'] = tempfile.mkdtemp(prefix='autoReportTest')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
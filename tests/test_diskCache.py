@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 23:12:40 2026
+@author: tao_jingfen
+"""
+import os
+import stat
+import pytest
+
+from diskCache import DiskCache, CACHE_ROOT, _userName
+
+def testCacheRootIsPerUser():
+    assert os.path.basename(CACHE_ROOT) == _userName()
+
+@pytest.mark.skipif(os.name != 'posix', reason='posix file modes')
+def testCacheDirectoriesArePrivate(tmp_path):
+    root = str(tmp_path / 'user')
+    cache = DiskCache('hplc', root=root)
+    cache.put('key', b'value')
+    for directory in (root, cache.directory):
+        assert stat.S_IMODE(os.stat(directory).st_mode) & 0o077 == 0
+
+def testMemoizeBuildsOnceAndRebuildsBrokenEntries(tmp_path):
+    cache = DiskCache('values', root=str(tmp_path))
+    calls = []
+    def build():
+        calls.append(1)
+        return {'value': len(calls)}
+    assert cache.memoize('key', build) == {'value': 1}
+    assert cache.memoize('key', build) == {'value': 1}
+    assert len(calls) == 1
+    cache.put('key', b'not a pickle')
+    assert cache.memoize('key', build) == {'value': 2}
+    assert len(calls) == 2
+
+def testEvictRemovesLeastRecentlyUsed(tmp_path):
+    cache = DiskCache('values', maxBytes=350, root=str(tmp_path))
+    for n, key in enumerate(('a', 'b', 'c')):
+        cache.put(key, bytes(100))
+        os.utime(cache._path(key), (n, n))
+    ## the get of a makes b the least recently used entry
+    assert cache.get('a') == bytes(100)
+    cache.put('d', bytes(100))
+    assert [key for key in 'abcd' if cache.get(key) is not None] == ['a', 'c', 'd']
+
+def testValueLargerThanTheCacheIsNotStored(tmp_path):
+    cache = DiskCache('values', maxBytes=10, root=str(tmp_path))
+    cache.put('key', bytes(11))
+    assert cache.get('key') is None
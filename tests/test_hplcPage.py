@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 09:12:40 2026
+@author: tao_jingfen
+"""
+import io
+import re
+import zipfile
+import fitz
+import docx
+from PIL import Image
+
+from hplcPage import pdf2pic, word2pic
+
+def _png(size: tuple, color: tuple) -> bytes:
+    stream = io.BytesIO()
+    Image.new('RGB', size, color).save(stream, 'PNG')
+    return stream.getvalue()
+
+def _size(blob: bytes) -> tuple:
+    return Image.open(io.BytesIO(blob)).size
+
+def _injection(doc, sampleName: str, logoSize: tuple = (100, 40)):
+    ## every report has its own logo and chromatogram objects
+    shade = len(doc) * 10
+    page = doc.new_page(width=595, height=900)
+    for n, text in enumerate(['Report', 'Sample Name:', sampleName, 'Injection']):
+        page.insert_text((40, 40 + n * 48), text, fontsize=10)
+    page.insert_image(fitz.Rect(450, 20, 550, 60), stream=_png(logoSize, (200, shade, 0)))
+    page.insert_image(fitz.Rect(200, 300, 560, 420), stream=_png((120, 40), (0, shade, 200)))
+
+def _pdf(build) -> bytes:
+    doc = fitz.open()
+    build(doc)
+    content = doc.tobytes()
+    doc.close()
+    return content
+
+def testChromatogramIsTheSecondPictureOfEveryInjection():
+    ## the logo of the second injection is larger than its chromatogram
+    content = _pdf(lambda doc: (_injection(doc, 'S1'), _injection(doc, 'S2', (600, 400))))
+    picList = pdf2pic(content)
+    assert [name for name, _ in picList] == ['S1', 'S2']
+    assert [_size(blob) for _, blob in picList] == [(120, 40), (120, 40)]
+
+def testPageWithoutChromatogramIsSkipped():
+    def build(doc):
+        page = doc.new_page(width=595, height=900)
+        for n, text in enumerate(['Sequence summary', 'Injections: 2', 'Operator']):
+            page.insert_text((40, 40 + n * 48), text, fontsize=10)
+        _injection(doc, 'S1')
+        _injection(doc, 'S2')
+    picList = pdf2pic(_pdf(build))
+    assert [name for name, _ in picList] == ['S1', 'S2']
+
+def _docx(tables: list) -> bytes:
+    """
+    an HPLC docx with a table and two pictures for every sample, tables is
+    [[row cell texts...], ...] with merges [(row, col, row, col), ...]
+    """
+    document = docx.Document()
+    for n, (rows, merges) in enumerate(tables):
+        table = document.add_table(len(rows), max(len(row) for row in rows))
+        for top, left, bottom, right in merges:
+            table.cell(top, left).merge(table.cell(bottom, right))
+        for r, row in enumerate(rows):
+            for c, text in enumerate(row):
+                if text:
+                    table.cell(r, c).text = text
+        document.add_picture(io.BytesIO(_png((120, 40), (0, n * 10, 200))))
+        document.add_picture(io.BytesIO(_png((60, 20), (200, n * 10, 0))))
+    stream = io.BytesIO()
+    document.save(stream)
+    return stream.getvalue()
+
+def _docxSampleNames(content: bytes) -> list:
+    """
+    the sample names as the python-docx cell API reads them
+    """
+    names = []
+    for table in docx.Document(io.BytesIO(content)).tables:
+        sampleName = None
+        for row in table.rows[:5]:
+            cells = row.cells
+            for n in range(min(5, len(cells) - 1)):
+                if cells[n].text == 'Sample name:':
+                    sampleName = cells[n + 1].text
+        names.append(sampleName)
+    return names
+
+def testWordSampleNameByGridColumn():
+    content = _docx([
+        ## the label right of a cell spanning 5 columns is in the 6th column
+        ([['Sample name:', 'S1', '', '', '', '', ''],
+          ['Comment', '', '', '', '', 'Sample name:', 'X']], [(1, 0, 1, 4)]),
+        ## the label spans two columns
+        ([['Sample name:', '', 'S2'], ['Vial', '1', '']], [(0, 0, 0, 1)]),
+        ## a vertically merged cell reads as the cell above
+        ([['Method', 'Sample name:', 'S3'], ['', 'Vial', '2']], [(0, 0, 1, 0)])])
+    picList = word2pic(content)
+    assert [name for name, _ in picList] == _docxSampleNames(content) == ['S1', 'S2', 'S3']
+    assert [_size(blob) for _, blob in picList] == [(120, 40)] * 3
+
+def testWordAbsolutePictureTarget():
+    content = _docx([([['Sample name:', 'S1']], [])])
+    source, stream = zipfile.ZipFile(io.BytesIO(content)), io.BytesIO()
+    with zipfile.ZipFile(stream, 'w') as target:
+        for name in source.namelist():
+            data = source.read(name)
+            if name == 'word/_rels/document.xml.rels':
+                data = re.sub(rb'Target="media/', b'Target="/word/media/', data)
+                assert b'"/word/media/' in data
+            target.writestr(name, data)
+    picList = word2pic(stream.getvalue())
+    assert [(name, _size(blob)) for name, blob in picList] == [('S1', (120, 40))]
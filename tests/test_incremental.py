@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 00:00:12 2026
+@author: tao_jingfen
+"""
+import io
+import zipfile
+from openpyxl import load_workbook
+
+from makeDemoData import makeWorkbook
+from reportPipeline import purificationReport, buildPurificationReport
+from reportProfile import RunProfile
+import reportManifest
+
+def _parts(deck: bytes) -> dict:
+    """
+    the bytes of every part of a pptx, the zip timestamps differ between runs
+    """
+    with zipfile.ZipFile(io.BytesIO(deck)) as deckZip:
+        return {name: deckZip.read(name) for name in deckZip.namelist()}
+
+def testIncrementalRebuildEqualsFullBuild(tmp_path):
+    folder = str(tmp_path)
+    excelPath = makeWorkbook(folder, proteins=6, steps=3, sdsTables=2, hplcFormat='mixed',
+                             gelSize=(320, 200), chromSize=(300, 100))
+    purificationReport(excelPath, prefetchJobs=0, incremental=False)
+    ## step 1 has an HPLC file, steps 2 and 3 have SDS pictures
+    wb = load_workbook(excelPath)
+    ws = wb['SDS_HPLC']
+    ws.cell(2, 9).value = 'Changed HPLC conclusion.'
+    ws.cell(4, 6).value = 'Changed SDS conclusion.|Second line'
+    wb.save(excelPath)
+    profile = RunProfile(memory=False)
+    reportPath = purificationReport(excelPath, profile=profile, prefetchJobs=0)
+    assert profile.counters.get('groupsReused', 0) > 0
+    with open(reportPath, 'rb') as f:
+        incremental = _parts(f.read())
+    full = _parts(buildPurificationReport(excelPath, folder, prefetchJobs=0))
+    assert sorted(incremental) == sorted(full)
+    assert [name for name in full if incremental[name] != full[name]] == []
+    slides = b''.join(full[name] for name in full if name.startswith('ppt/slides/slide'))
+    assert b'Changed HPLC conclusion.' in slides
+    assert b'Changed SDS conclusion.' in slides
+
+def testReportVersionCoversTheAssets(tmp_path, monkeypatch):
+    monkeypatch.setattr(reportManifest, 'filePath', str(tmp_path))
+    for name in ('page.py', 'marker.jpg', 'arrow.png', 'purificationTemplate.pptx'):
+        (tmp_path / name).write_bytes(b'1')
+    versions = {reportManifest._reportVersion()}
+    for name in ('marker.jpg', 'arrow.png', 'purificationTemplate.pptx'):
+        (tmp_path / name).write_bytes(b'2')
+        versions.add(reportManifest._reportVersion())
+    assert len(versions) == 4
@@ -0,0 +1,19 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 23:58:40 2026
+@author: tao_jingfen
+"""
+from pageLayout import paginate
+
+def testRowsFillEveryPageInOrder():
+    assert paginate([1, 1, 1, 1, 1], 2) == [(0, 2), (2, 4), (4, 5)]
+
+def testOversizedRowGetsItsOwnPage():
+    assert paginate([1, 5, 1], 3) == [(0, 1), (1, 2), (2, 3)]
+    assert paginate([5], 3) == [(0, 1)]
+
+def testMaxRows():
+    assert paginate([1] * 5, 100, maxRows=2) == [(0, 2), (2, 4), (4, 5)]
+
+def testNoRowsIsOneEmptyPage():
+    assert paginate([], 3) == [(0, 0)]
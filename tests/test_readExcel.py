@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 00:20:36 2026
+@author: tao_jingfen
+"""
+import io
+import pytest
+from openpyxl import Workbook
+
+import readExcel
+from readExcel import excel2Dict, readWorkbook, normalizeNumeric, groupSteps
+from diskCache import DiskCache
+from makeDemoData import SHEET1_TITLE, SHEET2_TITLE, SHEET3_TITLE
+
+def _workbook(sheet1Rows: list = ()) -> bytes:
+    wb = Workbook()
+    wb.active.append(SHEET1_TITLE)
+    for row in sheet1Rows:
+        wb.active.append(row)
+    wb.create_sheet('SDS_HPLC').append(SHEET2_TITLE)
+    wb.create_sheet('SDS_Table').append(SHEET3_TITLE)
+    content = io.BytesIO()
+    wb.save(content)
+    return content.getvalue()
+
+def testDefaultDateIsNotCached(tmp_path, monkeypatch):
+    cache = DiskCache('excel', root=str(tmp_path))
+    content = _workbook()
+    monkeypatch.setattr(readExcel.time, 'strftime', lambda fmt, t: '04/13/2020')
+    assert excel2Dict(content, cache).date == '04/13/2020'
+    monkeypatch.setattr(readExcel.time, 'strftime', lambda fmt, t: '04/14/2020')
+    data = excel2Dict(content, cache)
+    assert data.date == '04/14/2020'
+    assert data.projectName == 'project'
+
+def _row(concentration, proteinNo: int = 1, stepNo: int = 1, step: str = 'Protein A') -> list:
+    return ['WBP0001', '04/13/2020', stepNo, step, proteinNo, 'P%d' % proteinNo,
+            concentration, 2, 3, '', 'PBS', '95.00%', 'NA', 40, '147', 7.1, '']
+
+def testNormalizeNumericFormatsAndKeepsBlanks():
+    sheet1 = readWorkbook(io.BytesIO(_workbook([_row('1.5'), _row('')])))[0]
+    values = normalizeNumeric(sheet1)
+    assert sheet1['Concentration (mg/ml)'].tolist() == ['1.50', '']
+    assert sheet1['Yield (mg/L)'].tolist() == ['', '']
+    assert values['Volume (ml)'].tolist() == [2.0, 2.0]
+
+def testNormalizeNumericReportsTheWorksheetRow():
+    ## row 3 of the worksheet is blank and skipped, the bad cell is in row 5
+    rows = [_row(1, 1), [None] * len(SHEET1_TITLE), _row(2, 2), _row('1.2mg', 3)]
+    sheet1 = readWorkbook(io.BytesIO(_workbook(rows)))[0]
+    assert sheet1.attrs['excelRows'] == [2, 4, 5]
+    with pytest.raises(ValueError, match=r'Concentration \(mg/ml\) \(row 5\): 1\.2mg'):
+        normalizeNumeric(sheet1)
+
+def testGroupSteps():
+    rows = [_row(1, 1, 1, 'Protein A'), _row(2, 2, 1, 'Protein A'),
+            _row(3, 2, 2, 'SEC'), _row(4, 1, 2, 'Desalting'),
+            _row(5, 1, 3, 'CEX'), _row(6, 3, 1, 'Protein A')]
+    sheet1 = readWorkbook(io.BytesIO(_workbook(rows)))[0]
+    values = normalizeNumeric(sheet1)
+    final, processList, steps = groupSteps(sheet1.iloc[:, 2:], values)
+    assert [(step.no, step.name, len(step)) for step in steps] == \
+        [('1', 'Protein A', 3), ('2', 'SEC & Desalting', 2), ('3', 'CEX', 1)]
+    ## the last step of every protein, sorted by protein No
+    assert [(result.protein.name, result.values[0]) for result in final] == \
+        [('P1', '5.00'), ('P2', '3.00'), ('P3', '6.00')]
+    assert list(final.numbers['Concentration']) == [5.0, 3.0, 6.0]
+    assert processList == [['Protein # 1', 'Protein A', 'Desalting', 'CEX', 'Filtration & Storage'],
+                           ['Protein # 2', 'Protein A', 'SEC', 'Filtration & Storage'],
+                           ['Protein # 3', 'Protein A', 'Filtration & Storage']]
@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 00:34:51 2026
+@author: tao_jingfen
+"""
+import io
+import random
+from PIL import Image
+from pptx.util import Inches
+
+from slideImage import optimizeImage, IMAGE_DPI
+
+def _picture(size: tuple, fmt: str, mode: str = 'RGB') -> bytes:
+    """
+    a noise picture, noise is not compact in any format
+    """
+    rnd = random.Random(1)
+    image = Image.frombytes('RGB', size, rnd.randbytes(size[0] * size[1] * 3)).convert(mode)
+    stream = io.BytesIO()
+    image.save(stream, fmt)
+    return stream.getvalue()
+
+def _open(blob: bytes) -> Image.Image:
+    return Image.open(io.BytesIO(blob))
+
+def testLargePictureIsResampledToItsPlacement():
+    blob = _picture((1200, 400), 'PNG')
+    image = _open(optimizeImage(blob, Inches(1.5), Inches(0.5)))
+    assert image.format == 'PNG'
+    assert image.size == (round(1.5 * IMAGE_DPI), round(0.5 * IMAGE_DPI))
+
+def testJpegStaysJpeg():
+    blob = _picture((1200, 800), 'JPEG')
+    image = _open(optimizeImage(blob, Inches(1.5), Inches(1)))
+    assert image.format == 'JPEG'
+    assert image.size == (round(1.5 * IMAGE_DPI), round(1 * IMAGE_DPI))
+
+def testSmallPictureIsKept():
+    blob = _picture((100, 50), 'PNG')
+    assert optimizeImage(blob, Inches(2), Inches(1)) is blob
+
+def testBitmapBecomesPng():
+    blob = _picture((100, 50), 'BMP', 'L')
+    image = _open(optimizeImage(blob, Inches(2), Inches(1)))
+    assert image.format == 'PNG'
+    assert image.size == (100, 50)
+
+def testUnreadablePictureOrNoDpiIsKept():
+    blob = _picture((1200, 400), 'PNG')
+    assert optimizeImage(blob, Inches(1.5), Inches(0.5), dpi=None) is blob
+    assert optimizeImage(b'not a picture', Inches(1), Inches(1)) == b'not a picture'
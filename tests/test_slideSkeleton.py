@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 00:51:26 2026
+@author: tao_jingfen
+"""
+import io
+import zipfile
+
+from makeDemoData import makeWorkbook
+from readExcel import excel2Dict
+from reportPipeline import purificationPresentation
+
+def _parts(prs) -> dict:
+    stream = io.BytesIO()
+    prs.save(stream)
+    with zipfile.ZipFile(stream) as deckZip:
+        return {name: deckZip.read(name) for name in deckZip.namelist()}
+
+def _build(excelPath: str, folder: str, backend: str, edit=None) -> dict:
+    data = excel2Dict(excelPath, cache=None)
+    if edit is not None:
+        edit(data)
+    return _parts(purificationPresentation(data, folder, prefetchJobs=0, renderBackend=backend))
+
+def _oddTexts(data):
+    """
+    texts the skeletons must escape, drop or leave to the python-pptx builder
+    """
+    results = data.final.results
+    results[0].protein.name = 'A&B <x> "q" \'s\' {0}'
+    results[1].values = tuple('' for value in results[1].values)
+    results[2].protein.name = 'two\nlines'
+    data.hplcRuns[0].conclusion = '|a & b|'
+    data.sdsRuns[-1].eln = ''
+    data.sdsRuns[-1].step = 'S\nT'
+    data.process[0][1] = '{x}'
+    data.process[1][2] = 'a\nb\x07c'
+
+def _assertSameParts(xml: dict, pptx: dict):
+    assert sorted(xml) == sorted(pptx)
+    assert [name for name in pptx if xml[name] != pptx[name]] == []
+
+def testXmlAndPptxBackendsGiveTheSameReport(tmp_path):
+    folder = str(tmp_path)
+    excelPath = makeWorkbook(folder, proteins=14, steps=4, sdsTables=2, hplcFormat='mixed',
+                             gelSize=(320, 200), chromSize=(300, 100))
+    _assertSameParts(_build(excelPath, folder, 'xml'), _build(excelPath, folder, 'pptx'))
+    _assertSameParts(_build(excelPath, folder, 'xml', _oddTexts),
+                     _build(excelPath, folder, 'pptx', _oddTexts))
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 23:59:05 2026
+@author: tao_jingfen
+"""
+from pptx.util import Cm
+
+from templateCache import templateCache, pageBottom
+from reportPipeline import TEMPLATE_PATH
+from stepPage import stepLayout, STEP_TOP, STEP_TITLE_HEIGHT, STEP_GAP
+
+BOTTOM = pageBottom(templateCache.presentation(TEMPLATE_PATH), 2)
+HEADER, ROW = Cm(1.54), Cm(1.05)
+
+def _table(rows: int, rowHeight: int = ROW) -> list:
+    return [HEADER] + [rowHeight] * rows
+
+def _end(tables: list, entry: tuple) -> int:
+    index, top, start, stop = entry
+    heights = tables[index]
+    return top + STEP_TITLE_HEIGHT + heights[0] + sum(heights[1 + start:1 + stop])
+
+def testTablesStackOnOneSlide():
+    tables = [_table(3), _table(2)]
+    pages = stepLayout(tables, BOTTOM)
+    assert pages == [[(0, STEP_TOP, 0, 3),
+                      (1, _end(tables, (0, STEP_TOP, 0, 3)) + STEP_GAP, 0, 2)]]
+
+def testTwoFiveRowTablesShareASlide():
+    tables = [_table(5), _table(5)]
+    pages = stepLayout(tables, BOTTOM)
+    assert pages == [[(0, STEP_TOP, 0, 5),
+                      (1, _end(tables, (0, STEP_TOP, 0, 5)) + STEP_GAP, 0, 5)]]
+
+def testTableThatFitsASlideIsNotSplit():
+    tables = [_table(5), _table(8)]
+    pages = stepLayout(tables, BOTTOM)
+    assert pages == [[(0, STEP_TOP, 0, 5)], [(1, STEP_TOP, 0, 8)]]
+
+def testTallTableIsSplitAcrossSlides():
+    tables = [_table(2), _table(30)]
+    pages = stepLayout(tables, BOTTOM)
+    assert pages[0][0] == (0, STEP_TOP, 0, 2)
+    parts = [entry for page in pages for entry in page if entry[0] == 1]
+    assert len(parts) > 1
+    ## the rows continue where the last slide stopped, at the top of a new slide
+    assert [(start, stop) for _, _, start, stop in parts] == \
+        list(zip([0] + [stop for _, _, _, stop in parts[:-1]], [stop for _, _, _, stop in parts]))
+    assert parts[-1][3] == 30
+    assert all(top == STEP_TOP for _, top, _, _ in parts[1:])
+    for page in pages:
+        assert all(_end(tables, entry) <= BOTTOM for entry in page)
+
+def testRowTallerThanASlide():
+    tables = [_table(1), _table(1, Cm(20)), _table(1)]
+    pages = stepLayout(tables, BOTTOM)
+    assert pages == [[(0, STEP_TOP, 0, 1)], [(1, STEP_TOP, 0, 1)], [(2, STEP_TOP, 0, 1)]]
+
+def testEmptyStepKeepsItsTitleAndHeader():
+    tables = [_table(0), _table(1)]
+    pages = stepLayout(tables, BOTTOM)
+    assert pages == [[(0, STEP_TOP, 0, 0),
+                      (1, STEP_TOP + STEP_TITLE_HEIGHT + HEADER + STEP_GAP, 0, 1)]]
+
+def testSplitOnlyWhenItSavesASlide():
+    ## three 6 row tables do not fit two to a slide, stacked whole they take
+    ## three slides, splitting the second one fits them on two
+    tables = [_table(6)] * 3
+    pages = stepLayout(tables, BOTTOM)
+    assert len(pages) == 2
+    assert [index for index, _, _, _ in pages[0]] == [0, 1]
+    assert [index for index, _, _, _ in pages[1]] == [1, 2]
+    (_, _, start, split), (_, top, rest, stop) = pages[0][1], pages[1][0]
+    assert (start, split, rest, stop, top) == (0, split, split, 6, STEP_TOP)
+    assert 0 < split < 6
+    for page in pages:
+        assert all(_end(tables, entry) <= BOTTOM for entry in page)
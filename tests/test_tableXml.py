@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 00:42:07 2026
+@author: tao_jingfen
+"""
+import pytest
+from pptx import Presentation
+from pptx.util import Cm, Pt
+from pptx.enum.text import PP_ALIGN, MSO_ANCHOR
+from pptx.oxml.ns import qn
+
+from tableXml import writeTable, tableFrames, setRowHeights
+
+def _table(rows: list, cols: int):
+    prs = Presentation()
+    slide = prs.slides.add_slide(prs.slide_layouts[6])
+    return slide, slide.shapes.add_table(len(rows), cols, 0, 0, Cm(4) * cols, Cm(1) * len(rows))
+
+def _texts(cell) -> list:
+    return [t.text for t in cell._tc.iter(qn('a:t'))]
+
+def testCellsAreStyledLikePythonPptx():
+    rows = [['No', 'Protein Name', 'Buffer'], ['1', 'P1 & <P2>', 'PBS\n20mM His']]
+    _, frame = _table(rows, 3)
+    table = writeTable(frame, [Cm(2), Cm(5), Cm(3)], [Cm(1), Cm(2)], rows, Pt(12))
+    for r, row in enumerate(rows):
+        for c, text in enumerate(row):
+            cell = table.cell(r, c)
+            assert cell.text == text
+            assert (cell.margin_left, cell.margin_right, cell.margin_top, cell.margin_bottom) == (0, 0, 0, 0)
+            assert cell.vertical_anchor == MSO_ANCHOR.MIDDLE
+            for paragraph in cell.text_frame.paragraphs:
+                assert paragraph.alignment == PP_ALIGN.CENTER
+                assert paragraph.font.size == Pt(12)
+    assert [column.width for column in table.columns] == [Cm(2), Cm(5), Cm(3)]
+    assert (frame.width, frame.height) == (Cm(10), Cm(3))
+
+def testTextIsEscapedLikePythonPptx():
+    text = 'a\x01b\vc'
+    _, frame = _table([[text]], 1)
+    expected = frame.table.cell(0, 0)
+    expected.text = text
+    expectedRuns = _texts(expected)
+    table = writeTable(frame, [Cm(4)], [Cm(1)], [[text]])
+    assert _texts(table.cell(0, 0)) == expectedRuns
+    assert len(table.cell(0, 0)._tc.findall('.//' + qn('a:br'))) == 1
+
+def testNoneMergesIntoTheCellOnItsLeft():
+    rows = [['Sample', None, None, 'MW'], ['1', '2', '3', '4']]
+    _, frame = _table(rows, 4)
+    table = writeTable(frame, [Cm(2)] * 4, [Cm(1)] * 2, rows)
+    assert table.cell(0, 0).is_merge_origin
+    assert table.cell(0, 0).span_width == 3
+    assert [table.cell(0, c).is_spanned for c in range(4)] == [False, True, True, False]
+
+def testSizeMismatchRaises():
+    _, frame = _table([['a']], 1)
+    with pytest.raises(ValueError):
+        writeTable(frame, [Cm(4)], [Cm(1), Cm(1)], [['a']])
+    with pytest.raises(ValueError):
+        writeTable(frame, [Cm(4)], [Cm(1)], [['a', 'b']])
+
+def testSetRowHeights():
+    slide, frame = _table([['a'], ['b']], 1)
+    frames = tableFrames(slide)
+    assert frames == [frame._element]
+    setRowHeights(frames[0], [Cm(1.5), Cm(2)])
+    assert [row.height for row in frame.table.rows] == [Cm(1.5), Cm(2)]
+    assert frame.height == Cm(3.5)
+    with pytest.raises(ValueError):
+        setRowHeights(frames[0], [Cm(1)])